@@ -0,0 +1,56 @@
+import argparse
+import os
+import sys
+
+# always draw to the dummy video driver so that results do not depend on the display
+os.environ['SDL_VIDEODRIVER'] = 'dummy'
+
+from src.Benchmark import DEFAULT_REPEATS, DEFAULT_THRESHOLD, SCENARIOS, entity_lines, load_baseline, regressions, \
+    report_lines, run_scenario, save_baseline
+
+
+main_dir = os.path.split(os.path.abspath(__file__))[0]
+
+
+def run_benchmarks() -> int:
+    parser = argparse.ArgumentParser(description='Space Frenzy benchmarks')
+    parser.add_argument('scenarios', nargs='*', metavar='SCENARIO',
+                        help=f'scenarios to run, default all of {", ".join(SCENARIOS)}')
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS,
+                        help='runs per scenario, the minimum of each timing is reported')
+    parser.add_argument('--vector-physics', action='store_true', help='benchmark the numpy physics backend')
+    parser.add_argument('--save-baseline', metavar='PATH', help='save the results as the baseline')
+    parser.add_argument('--baseline', metavar='PATH', help='fail if the results regress from the baseline')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, metavar='PERCENT',
+                        help='regression from the baseline that fails the run')
+    parser.add_argument('--entities', action='store_true',
+                        help='compare the memory per entity and the update throughput, instead of the scenarios')
+    args = parser.parse_args()
+
+    if args.entities:
+        print('\n'.join(entity_lines(main_dir)))
+        return 0
+
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f'unknown scenarios: {", ".join(unknown)}')
+    results = []
+    for name in args.scenarios or SCENARIOS:
+        result = run_scenario(main_dir, SCENARIOS[name], args.repeats, vector_physics=args.vector_physics)
+        print('\n'.join(report_lines([result])))
+        results.append(result)
+
+    if args.save_baseline is not None:
+        save_baseline(args.save_baseline, results)
+    if args.baseline is not None:
+        found = regressions(results, load_baseline(args.baseline), args.threshold)
+        if found:
+            print(f'regressions past {args.threshold}%:')
+            print('\n'.join(found))
+            return 1
+        print(f'no regressions past {args.threshold}%')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(run_benchmarks())
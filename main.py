@@ -1,4 +1,11 @@
+import time
+
+# the process start, as near as can be measured, for the startup report.  Importing pygame is most of the startup
+start_time = time.perf_counter()
+
+import argparse
 import os
+from src.NetworkProtocol import DEFAULT_PORT, MAXIMUM_ARENA_SIZE
 from src.SpaceFrenzyEngine import SpaceFrenzyEngine
 
 
@@ -6,8 +13,152 @@ main_dir = os.path.split(os.path.abspath(__file__))[0]
 
 
 def load_game():
-    engine = SpaceFrenzyEngine(main_dir)
-    engine.start()
+    parser = argparse.ArgumentParser(description='Space Frenzy')
+    parser.add_argument('--headless', type=int, metavar='FRAMES',
+                        help='simulate up to FRAMES frames without a window, as fast as possible')
+    parser.add_argument('--seed', type=int, help='seed for the random number generator')
+    parser.add_argument('--delta-time', type=int, metavar='MS', help='fixed delta time per frame in ms')
+    parser.add_argument('--vector-physics', action='store_true',
+                        help='integrate asteroids and bullets in a batched numpy step (requires numpy)')
+    parser.add_argument('--profile', action='store_true', help='record per-phase frame timings')
+    parser.add_argument('--profile-overlay', action='store_true', help='show the frame profiler over the game')
+    parser.add_argument('--profile-export', metavar='PATH',
+                        help='export the frame profile on exit, as json if PATH ends in .json otherwise csv')
+    parser.add_argument('--physics-rate', type=int, metavar='HZ',
+                        help='step the simulation at a fixed rate, independent of the render rate')
+    parser.add_argument('--render-rate', type=int, default=SpaceFrenzyEngine.FRAME_RATE, metavar='HZ',
+                        help='maximum frames drawn per second')
+    parser.add_argument('--adaptive-render-rate', action='store_true',
+                        help='lower the render rate to a divisor of --render-rate when frames cost too much')
+    parser.add_argument('--no-background-pause', action='store_true',
+                        help='keep playing at a low frame rate when the window loses focus, rather than pausing')
+    parser.add_argument('--arena', metavar='WIDTHxHEIGHT',
+                        help='play in an arena larger than the screen, with a camera that follows the spacecraft')
+    parser.add_argument('--pipelined', action='store_true',
+                        help='simulate each frame on a worker thread while the previous frame is drawn')
+    parser.add_argument('--no-asteroid-collisions', action='store_true', help='asteroids pass through each other')
+    parser.add_argument('--record', metavar='PATH', help='record the input of each game for replay')
+    parser.add_argument('--rewind', type=int, metavar='SECONDS',
+                        help='keep the last SECONDS of the game, and rewind through them while BACKSPACE is held')
+    parser.add_argument('--save-state', metavar='PATH', help='save the game to PATH with F5, and load it with F9')
+    parser.add_argument('--replay', metavar='PATH', help='replay a recorded game as fast as possible')
+    parser.add_argument('--render', action='store_true', help='show the replay in a window')
+    parser.add_argument('--asset-cache', metavar='PATH',
+                        help='read the rendered images from a packed cache file, written on the first run')
+    parser.add_argument('--startup-report', action='store_true',
+                        help='print the time to each startup milestone once the first frame is drawn')
+    parser.add_argument('--batch', type=int, metavar='GAMES',
+                        help='run GAMES bot driven headless games per parameter set across a process pool.  '
+                             'Games are seeded from --seed upwards and limited to --headless frames')
+    parser.add_argument('--sweep', action='append', default=[], metavar='NAME=V1,V2',
+                        help='batch asteroid generator values to sweep, a MINIMUM_ or MAXIMUM_ constant of the '
+                             'generation period, diameter or speed, or MAXIMUM_LEVEL')
+    parser.add_argument('--processes', type=int, help='batch worker processes, default one per core')
+    parser.add_argument('--script', metavar='PATH', help='drive the batch games with a recorded input log')
+    parser.add_argument('--batch-output', metavar='PATH', help='stream each batch game result to a csv file')
+    parser.add_argument('--serve', type=int, nargs='?', const=DEFAULT_PORT, metavar='PORT',
+                        help=f'run a network game server, on port {DEFAULT_PORT} by default')
+    parser.add_argument('--connect', metavar='HOST[:PORT]', help='join a network game')
+    parser.add_argument('--network-test', type=int, metavar='CLIENTS',
+                        help='run a server and CLIENTS bot clients on localhost for --headless frames, then report '
+                             'the bandwidth per client and the server tick cost')
+    args = parser.parse_args()
+
+    if args.delta_time is not None and args.headless is None and args.batch is None:
+        # simulated time ignores the frame rate, so a game in a window would run unpaced
+        parser.error('--delta-time requires --headless or --batch')
+
+    if args.batch is not None:
+        # only imported for a batch, like the network modules, so that multiprocessing does not slow every start
+        from src.BatchRunner import TUNABLE_PARAMETERS, sweep
+        parameter_values = {}
+        for option in args.sweep:
+            name, _, values = option.partition('=')
+            if name not in TUNABLE_PARAMETERS or not values:
+                parser.error(f'invalid --sweep {option}')
+            parameter_values[name] = [int(value) for value in values.split(',')]
+        try:
+            parameter_sets = sweep(parameter_values)
+        except ValueError as error:
+            parser.error(f'invalid --sweep: {error}')
+        run_batch(args, parameter_sets)
+        return
+
+    if args.record is not None and (args.rewind is not None or args.save_state is not None):
+        parser.error('a recorded game cannot be rewound or loaded, as the input log would no longer replay it')
+
+    arena_size = None
+    if args.arena is not None:
+        width, _, height = args.arena.partition('x')
+        if not (width.isdigit() and height.isdigit()):
+            parser.error(f'invalid --arena {args.arena}')
+        arena_size = (int(width), int(height))
+
+    # the network modules are only imported when used, so that they do not add to the startup of a local game.
+    # a network game is played in the space on screen unless an arena size is given
+    network_arena_size = arena_size or (SpaceFrenzyEngine.SCREEN_WIDTH, SpaceFrenzyEngine.SPACE_HEIGHT)
+    if (args.serve is not None or args.network_test is not None) and max(network_arena_size) > MAXIMUM_ARENA_SIZE:
+        parser.error(f'a network arena is at most {MAXIMUM_ARENA_SIZE} pixels wide and high')
+    if args.serve is not None:
+        from src.NetworkServer import NetworkServer
+        print('\n'.join(NetworkServer(main_dir, args.serve, seed=args.seed, arena_size=network_arena_size)
+                         .run().lines()))
+        return
+    if args.connect is not None:
+        from src.NetworkClient import NetworkClient
+        host, _, port = args.connect.partition(':')
+        print('\n'.join(NetworkClient(main_dir, (host, int(port) if port else DEFAULT_PORT)).run().lines()))
+        return
+    if args.network_test is not None:
+        from src.NetworkTest import run_network_test
+        server_report, client_reports = run_network_test(main_dir, args.network_test, args.headless or 1800,
+                                                         args.seed, network_arena_size)
+        print('\n'.join(server_report.lines()))
+        for client_report in client_reports:
+            print('\n'.join(client_report.lines()))
+        return
+
+    headless = args.headless is not None or (args.replay is not None and not args.render)
+    engine = SpaceFrenzyEngine(main_dir, headless=headless, seed=args.seed,
+                               delta_time=args.delta_time, vector_physics=args.vector_physics,
+                               profile=args.profile, profile_overlay=args.profile_overlay,
+                               profile_export=args.profile_export, record=args.record,
+                               physics_rate=args.physics_rate, render_rate=args.render_rate,
+                               asteroid_collisions=not args.no_asteroid_collisions,
+                               asset_cache=args.asset_cache, adaptive_render_rate=args.adaptive_render_rate,
+                               pause_in_background=not args.no_background_pause, arena_size=arena_size,
+                               rewind_seconds=args.rewind, save_state=args.save_state, pipelined=args.pipelined,
+                               startup_time=start_time if args.startup_report else None)
+    if args.replay is not None:
+        print(engine.replay(args.replay))
+    elif args.headless is not None:
+        print(engine.run_simulation(args.headless))
+    else:
+        engine.start()
+
+
+def run_batch(args: argparse.Namespace, parameter_sets: list[dict[str, int]]):
+    from src.BatchRunner import DEFAULT_MAX_FRAMES, BatchGame, BatchReport, BatchRunner
+    base_seed = args.seed if args.seed is not None else 0
+    max_frames = args.headless if args.headless is not None else DEFAULT_MAX_FRAMES
+    # every parameter set plays the same seeds so that the sets are compared on the same games
+    games = [BatchGame(base_seed + index, parameters, max_frames, args.script)
+             for parameters in parameter_sets for index in range(args.batch)]
+    engine_options = {'vector_physics': args.vector_physics, 'physics_rate': args.physics_rate,
+                      'asteroid_collisions': not args.no_asteroid_collisions, 'asset_cache': args.asset_cache}
+    if args.delta_time is not None:
+        engine_options['delta_time'] = args.delta_time
+    report = BatchReport(args.batch_output)
+    runner = BatchRunner(main_dir, args.processes, engine_options)
+    try:
+        for completed, result in enumerate(runner.run(games), 1):
+            report.add(result)
+            print(f'{completed}/{len(games)} seed {result.seed} level {result.level} destroyed '
+                  f'{result.asteroids_destroyed} survived {result.survival_time / 1000:.1f}s {result.parameters}')
+    finally:
+        # the games completed before a failure are still reported
+        report.close()
+        print('\n'.join(report.lines()))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,112 @@
+import os
+import struct
+import tempfile
+
+import pygame
+
+from .Asteroid import Asteroid
+from .AsteroidGenerator import AsteroidGenerator
+from .Hud import Hud
+from .RotationTable import RotationTable
+from .SpaceCraftBullet import SpaceCraftBullet
+
+# cache file layout, little endian:
+#   header: magic, version, modification time of the spacecraft image (ns), rotation step, rotated image count,
+#           largest asteroid diameter, length of the images that follow
+#   images: the original spacecraft image, the rotated spacecraft images, then the asteroid images from 1 pixel
+#           diameter upwards.  Each is width, height then the RGB pixels
+_MAGIC = b'SFAB'
+_VERSION = 2
+_HEADER = struct.Struct('<4sHqdHHQ')
+_IMAGE = struct.Struct('<HH')
+
+
+class AssetBundle:
+    # every image and the font that the game uses, loaded once when the display is initialised and converted to the
+    # display format.  Images are shared through the class caches, so later bundles in the process reuse them.
+    # with a cache path the rendered images are read from one packed file, written the first time, rather than
+    # loaded, rotated and drawn.  The cache is rebuilt when the spacecraft image or the asteroid sizes change
+    def __init__(self, main_dir: str, cache_path: str = None):
+        spacecraft_path = os.path.join(main_dir, 'assets', 'spacecraft.png')
+        self._spacecraft = None
+        if cache_path is not None and os.path.exists(cache_path):
+            self._spacecraft = _read_cache(cache_path, spacecraft_path)
+        if self._spacecraft is None:
+            self._spacecraft = RotationTable.from_file(spacecraft_path)
+            # fragments can be smaller than the minimum diameter so start from 1
+            Asteroid.preload_images(1, AsteroidGenerator.MAXIMUM_DIAMETER)
+            if cache_path is not None:
+                _write_cache(cache_path, spacecraft_path, self._spacecraft)
+        self._bullet_image = SpaceCraftBullet.get_image()
+        self._font = pygame.font.Font(None, Hud.FONT_SIZE)
+
+    @property
+    def spacecraft(self) -> RotationTable:
+        return self._spacecraft
+
+    @property
+    def font(self) -> pygame.font.Font:
+        return self._font
+
+
+def _write_cache(path: str, spacecraft_path: str, spacecraft: RotationTable):
+    images = [spacecraft.original_image, *(spacecraft.image(index) for index in range(len(spacecraft))),
+              *(Asteroid.get_image(diameter) for diameter in range(1, AsteroidGenerator.MAXIMUM_DIAMETER + 1))]
+    body = b''.join(_IMAGE.pack(*image.get_size()) + pygame.image.tobytes(image, 'RGB') for image in images)
+    # written to a temporary file that is then moved into place, so that a reader, e.g. another batch worker
+    # starting on a cold cache, never sees a partly written cache
+    descriptor, temporary_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'wb') as file:
+            file.write(_HEADER.pack(_MAGIC, _VERSION, os.stat(spacecraft_path).st_mtime_ns, spacecraft.step,
+                                    len(spacecraft), AsteroidGenerator.MAXIMUM_DIAMETER, len(body)))
+            file.write(body)
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.remove(temporary_path)
+        raise
+
+
+def _read_cache(path: str, spacecraft_path: str) -> RotationTable | None:
+    # the spacecraft rotation table, with the asteroid images installed, or None if the cache is out of date,
+    # truncated or corrupt, in which case the images are rendered again
+    with open(path, 'rb') as file:
+        data = file.read()
+    try:
+        images = _unpack_images(data, spacecraft_path)
+    except (struct.error, ValueError):
+        return None
+    if images is None:
+        return None
+
+    rotations = len(images) - 1 - AsteroidGenerator.MAXIMUM_DIAMETER
+    for image in images[:1 + rotations]:
+        image.set_colorkey((0, 0, 0))
+    for diameter, image in enumerate(images[1 + rotations:], 1):
+        image.set_colorkey((0, 0, 0), pygame.RLEACCEL)
+        Asteroid.set_image(diameter, image)
+    return RotationTable.register(spacecraft_path,
+                                  RotationTable(images[0], RotationTable.ROTATION_STEP, images[1:1 + rotations]))
+
+
+def _unpack_images(data: bytes, spacecraft_path: str) -> list[pygame.Surface] | None:
+    # the images in the cache, or None if it is out of date.  Raises struct.error or ValueError when corrupt
+    if len(data) < _HEADER.size:
+        return None
+    magic, version, modified, step, rotations, maximum_diameter, length = _HEADER.unpack_from(data)
+    if (magic != _MAGIC or version != _VERSION or modified != os.stat(spacecraft_path).st_mtime_ns
+            or step != RotationTable.ROTATION_STEP or maximum_diameter != AsteroidGenerator.MAXIMUM_DIAMETER
+            or length != len(data) - _HEADER.size):
+        return None
+
+    offset = _HEADER.size
+    images = []
+    for _ in range(1 + rotations + maximum_diameter):
+        width, height = _IMAGE.unpack_from(data, offset)
+        offset += _IMAGE.size
+        image = pygame.image.frombytes(data[offset:offset + (width * height * 3)], (width, height), 'RGB').convert()
+        offset += width * height * 3
+        images.append(image)
+    if offset != len(data):
+        raise ValueError('asset cache length does not match its images')
+    return images
@@ -1,33 +1,55 @@
 import math  # todo: is it better to import only the objects needed, rather than the whole package?
 
 import pygame
+from .Position import Position
 from .Projectile import Projectile
+from .Velocity import Velocity
 
 
 class Asteroid(Projectile):
-    def __init__(self, position: dict[str, float], velocity: dict[str, float], direction: float, diameter: int,
+    COLOUR = (0, 255, 0)
+    _images = {}  # diameter -> image, shared by every asteroid in the process
+    _masks = {}  # diameter -> collision mask of the image
+
+    def __init__(self, position: Position, velocity: Velocity, direction: float, diameter: int,
                  containing_rect: pygame.Rect):
         super().__init__(position, velocity, direction)
-        self._active = False  # flags that the asteroid is not fully on screen yet
-        self._radius = diameter / 2
-        self._area = math.pi * (self._radius ** 2)
-        self._energy = (self.area * ((self._velocity['horizontal'] ** 2) + (self._velocity['vertical'] ** 2))) / 2
-        self._containing_rect = containing_rect
-        self._top_edge = pygame.Rect(self._containing_rect.left, self._containing_rect.top,
-                                     self._containing_rect.width, 1)
-        self._right_edge = pygame.Rect(self._containing_rect.right, self._containing_rect.top,
-                                       1, self._containing_rect.height)
-        self._bottom_edge = pygame.Rect(self._containing_rect.left, self._containing_rect.bottom,
-                                        self._containing_rect.width, 1)
-        self._left_edge = pygame.Rect(self._containing_rect.left, self._containing_rect.top,
-                                      1, self._containing_rect.height)
-        surface = pygame.Surface((diameter, diameter))
-        surface.set_colorkey((0, 0, 0))
-        pygame.draw.circle(surface, (0, 255, 0), (self._radius, self._radius), self._radius)
-        self.image = surface
-        self.rect = self.image.get_rect()
-        self.rect.centerx = self._position['x']
-        self.rect.centery = self._position['y']
+        self.handle = None  # set by the generator while the asteroid is registered
+        self._containing_rect = None
+        self._set_shape(diameter, containing_rect)
+
+    @staticmethod
+    def get_image(diameter: int) -> pygame.Surface:
+        # sprites share the image, so it must not be drawn on
+        image = Asteroid._images.get(diameter)
+        if image is None:
+            radius = diameter / 2
+            image = pygame.Surface((diameter, diameter))
+            pygame.draw.circle(image, Asteroid.COLOUR, (radius, radius), radius)
+            if pygame.display.get_surface() is not None:
+                image = image.convert()
+            image.set_colorkey((0, 0, 0), pygame.RLEACCEL)
+            Asteroid._images[diameter] = image
+        return image
+
+    @staticmethod
+    def set_image(diameter: int, image: pygame.Surface):
+        # install a prepared image, e.g. read from a cache
+        Asteroid._images[diameter] = image
+        Asteroid._masks.pop(diameter, None)
+
+    @staticmethod
+    def get_mask(diameter: int) -> pygame.mask.Mask:
+        mask = Asteroid._masks.get(diameter)
+        if mask is None:
+            mask = pygame.mask.from_surface(Asteroid.get_image(diameter))
+            Asteroid._masks[diameter] = mask
+        return mask
+
+    @staticmethod
+    def preload_images(minimum_diameter: int, maximum_diameter: int):
+        for diameter in range(minimum_diameter, maximum_diameter + 1):
+            Asteroid.get_mask(diameter)
 
     @property
     def active(self) -> bool:
@@ -45,32 +67,95 @@ class Asteroid(Projectile):
     def energy(self) -> float:
         return self._energy
 
+    def set_velocity(self, horizontal: float, vertical: float):
+        super().set_velocity(horizontal, vertical)
+        self._energy = (self.area * ((self._velocity.horizontal ** 2) + (self._velocity.vertical ** 2))) / 2
+
+    def activate(self):
+        self._active = True
+
     def update(self, delta_time: int):
         super().update(delta_time)
         # no collision detection on first activation as the trailing edge of the asteroid
         # collides with the edge of the screen causing it to reflect
         if self._active:
             if self._top_edge.colliderect(self.rect) or self._bottom_edge.colliderect(self.rect):
-                self._velocity['vertical'] *= -1
+                self._velocity.vertical *= -1
             if self._left_edge.colliderect(self.rect) or self._right_edge.colliderect(self.rect):
-                self._velocity['horizontal'] *= -1
+                self._velocity.horizontal *= -1
+            if not self._containing_rect.colliderect(self.rect):
+                self._return_inside()
         elif self._containing_rect.contains(self.rect):
             self._active = True
 
+    def _return_inside(self):
+        # a long step, e.g. a far asteroid updated at a reduced rate, can carry the asteroid past an edge without
+        # touching it.  Head back inside
+        rect = self.rect
+        velocity = self._velocity
+        if (rect.right <= self._containing_rect.left and velocity.horizontal < 0) or (
+                rect.left >= self._containing_rect.right and velocity.horizontal > 0):
+            velocity.horizontal *= -1
+        # vertical is +ve up
+        if (rect.bottom <= self._containing_rect.top and velocity.vertical > 0) or (
+                rect.top >= self._containing_rect.bottom and velocity.vertical < 0):
+            velocity.vertical *= -1
+
+    def _set_shape(self, diameter: int, containing_rect: pygame.Rect):
+        # also used to reset pooled instances, so the edges are only rebuilt when the containing rect changes
+        self._active = False  # flags that the asteroid is not fully on screen yet
+        self._radius = diameter / 2
+        self._area = math.pi * (self._radius ** 2)
+        self._energy = (self.area * ((self._velocity.horizontal ** 2) + (self._velocity.vertical ** 2))) / 2
+        if containing_rect != self._containing_rect:
+            self._containing_rect = containing_rect
+            self._top_edge = pygame.Rect(self._containing_rect.left, self._containing_rect.top,
+                                         self._containing_rect.width, 1)
+            self._right_edge = pygame.Rect(self._containing_rect.right, self._containing_rect.top,
+                                           1, self._containing_rect.height)
+            self._bottom_edge = pygame.Rect(self._containing_rect.left, self._containing_rect.bottom,
+                                            self._containing_rect.width, 1)
+            self._left_edge = pygame.Rect(self._containing_rect.left, self._containing_rect.top,
+                                          1, self._containing_rect.height)
+        self.image = Asteroid.get_image(diameter)
+        self.mask = Asteroid.get_mask(diameter)
+        self.rect.size = self.image.get_size()
+        self.rect.centerx = self._position.x
+        self.rect.centery = self._position.y
+
 
 class AsteroidPrimary(Asteroid):
-    def __init__(self, position: dict[str, float], velocity: dict[str, float], direction: float, diameter: int,
+    def __init__(self, position: Position, velocity: Velocity, direction: float, diameter: int,
                  containing_rect: pygame.Rect):
         super().__init__(position, velocity, direction, diameter, containing_rect)
-        self._fragments = []
+        self._fragment_count = 0  # fragments of this asteroid that have not been destroyed
 
     @property
-    def fragments(self) -> list[Asteroid]:
-        return self._fragments
+    def fragment_count(self) -> int:
+        return self._fragment_count
+
+    def add_fragment(self):
+        self._fragment_count += 1
+
+    def set_fragment_count(self, count: int):
+        # e.g. restoring a saved game state
+        self._fragment_count = count
+
+    def remove_fragment(self) -> int:
+        # returns the fragments remaining
+        self._fragment_count -= 1
+        return self._fragment_count
 
 
 class AsteroidFragment(Asteroid):
-    def __init__(self, position: dict[str, float], velocity: dict[str, float], direction: float, diameter: int,
+    def __init__(self, position: Position, velocity: Velocity, direction: float, diameter: int,
                  containing_rect: pygame.Rect, primary_asteroid: AsteroidPrimary):
         super().__init__(position, velocity, direction, diameter, containing_rect)
         self.primary_asteroid = primary_asteroid
+
+    def reset(self, position: Position, velocity: Velocity, direction: float, diameter: int,
+              containing_rect: pygame.Rect, primary_asteroid: AsteroidPrimary):
+        # reuse a pooled fragment, same arguments as the constructor
+        self._set_motion(position, velocity, direction)
+        self._set_shape(diameter, containing_rect)
+        self.primary_asteroid = primary_asteroid
@@ -2,6 +2,11 @@ import math
 import random
 import pygame.time
 from .Asteroid import Asteroid, AsteroidFragment, AsteroidPrimary
+from .GameClock import GameClock
+from .ObjectPool import ObjectPool
+from .Position import Position
+from .SlotMap import SlotMap
+from .Velocity import Velocity
 
 
 class AsteroidGenerator:
@@ -14,9 +19,11 @@ class AsteroidGenerator:
     MINIMUM_SPEED = 150  # pixels/s
     MAXIMUM_SPEED = 250  # pixels/s
     MINIMUM_AREA = ((MINIMUM_DIAMETER / 2) ** 2) * math.pi
+    FRAGMENT_POOL_SIZE = 512  # released fragments kept for reuse
 
     def __init__(self, display_surface: pygame.Surface, display_rect: pygame.Rect,
-                 draw_group: pygame.sprite.Group, update_group: pygame.sprite.Group):
+                 draw_group: pygame.sprite.Group, update_group: pygame.sprite.Group,
+                 clock: GameClock = None, rng: random.Random = None):
         self._draw_group = draw_group
         self._update_group = update_group
         self._display_surface = display_surface
@@ -28,10 +35,13 @@ class AsteroidGenerator:
         self._asteroid_level_count = self._level
         self._asteroids_destroyed_level_count = 0  # asteroids destroyed in the current level
         self._asteroids_destroyed_total_count = 0  # asteroids destroyed in total
-        self._asteroids = []  # the primary asteroids & fragments active in this level
+        self._asteroids = SlotMap()  # the primary asteroids & fragments active in this level
         self._prev_generation_time = 0  # the previous time a primary asteroid was generated
         self._time_to_next_generation = 0  # time until the next primary asteroid is generated
-        random.seed()
+        # an injected clock and random number generator allow simulations to be repeated exactly
+        self._clock = clock if clock is not None else GameClock()
+        self._random = rng if rng is not None else random.Random()
+        self._fragment_pool = ObjectPool(AsteroidFragment, AsteroidGenerator.FRAGMENT_POOL_SIZE)
 
     @property
     def level(self) -> int:
@@ -54,18 +64,93 @@ class AsteroidGenerator:
         return self._time_to_next_generation
 
     @property
-    def asteroids(self) -> list[Asteroid]:
-        return self._asteroids.copy()
+    def asteroids(self) -> SlotMap:
+        # not a copy, so asteroids must not be removed while iterating
+        return self._asteroids
+
+    @property
+    def asteroid_count(self) -> int:
+        return len(self._asteroids)
+
+    @property
+    def fragment_pool(self) -> ObjectPool:
+        return self._fragment_pool
+
+    @property
+    def random(self) -> random.Random:
+        return self._random
+
+    @property
+    def counters(self) -> tuple[int, float, int, int, int, int, int]:
+        # the level and generation schedule, as saved with a game state: level, level generation period, asteroids
+        # generated in the level, destroyed in the level, destroyed in total, previous generation time and time to
+        # the next generation
+        return (self._level, self._level_generation_period, self._asteroid_level_count,
+                self._asteroids_destroyed_level_count, self._asteroids_destroyed_total_count,
+                self._prev_generation_time, self._time_to_next_generation)
+
+    def set_counters(self, level: int, level_generation_period: float, asteroid_level_count: int,
+                     asteroids_destroyed_level_count: int, asteroids_destroyed_total_count: int,
+                     prev_generation_time: int, time_to_next_generation: int):
+        self._level = level
+        self._level_generation_period = level_generation_period
+        self._asteroid_level_count = asteroid_level_count
+        self._asteroids_destroyed_level_count = asteroids_destroyed_level_count
+        self._asteroids_destroyed_total_count = asteroids_destroyed_total_count
+        self._prev_generation_time = prev_generation_time
+        self._time_to_next_generation = time_to_next_generation
+
+    def clear(self):
+        # release every asteroid, e.g. before restoring a saved game state
+        for asteroid in self._asteroids:
+            asteroid.handle = None
+            if isinstance(asteroid, AsteroidFragment):
+                asteroid.primary_asteroid = None
+            self.release(asteroid)
+        self._asteroids = SlotMap()
+
+    def restore_asteroid(self, position: Position, velocity: Velocity, direction: float, diameter: int,
+                         active: bool, primary_asteroid: AsteroidPrimary = None, registered: bool = True) -> Asteroid:
+        # add a saved asteroid without the generation rules.  A fragment of primary_asteroid when given.  A primary
+        # that is not registered has been destroyed, and only counts its remaining fragments.  The images are
+        # shared by diameter, so nothing is rasterized
+        if primary_asteroid is None:
+            asteroid = AsteroidPrimary(position, velocity, direction, diameter, self._display_rect)
+        else:
+            asteroid = self._fragment_pool.acquire(position, velocity, direction, diameter, self._display_rect,
+                                                   primary_asteroid)
+        if active:
+            asteroid.activate()
+        if registered:
+            asteroid.handle = self._asteroids.insert(asteroid)
+            asteroid.add(self._draw_group, self._update_group)
+        return asteroid
+
+    def set_level(self, level: int):
+        # start the level on the next update instead of level 1, e.g. to benchmark a late level.  Call before the
+        # first update of the game
+        self._level = level - 1
+        self._asteroid_level_count = level - 1
+
+    def spawn(self) -> AsteroidPrimary:
+        # generate a primary asteroid outside of the level's schedule, e.g. to benchmark a crowded space
+        return self._generate()
 
     def remove(self, asteroid: Asteroid):
-        self._asteroids.remove(asteroid)
+        self._asteroids.remove(asteroid.handle)
+        asteroid.handle = None
         if isinstance(asteroid, AsteroidFragment):
-            asteroid.primary_asteroid.fragments.remove(asteroid)
-            if len(asteroid.primary_asteroid.fragments) == 0:
+            if asteroid.primary_asteroid.remove_fragment() == 0:
                 self._asteroids_destroyed_level_count += 1
                 self._asteroids_destroyed_total_count += 1
             asteroid.primary_asteroid = None
 
+    def release(self, asteroid: Asteroid):
+        # call once the asteroid has been removed.  Fragments are returned to the pool for reuse
+        asteroid.kill()
+        if isinstance(asteroid, AsteroidFragment):
+            self._fragment_pool.release(asteroid)
+
     def fragment(self, asteroid: Asteroid):
         if isinstance(asteroid, AsteroidFragment):
             primary_asteroid = asteroid.primary_asteroid
@@ -75,23 +160,21 @@ class AsteroidGenerator:
         remaining_energy = asteroid.energy
         while remaining_area > (AsteroidGenerator.MINIMUM_AREA * 1.25):  # factor in reduction by 20%
             # generate new asteroids up to 80% of the original size
-            new_area = random.randint(int(AsteroidGenerator.MINIMUM_AREA), int(asteroid.area * 0.8))
+            new_area = self._random.randint(int(AsteroidGenerator.MINIMUM_AREA), int(asteroid.area * 0.8))
             remaining_area = remaining_area - new_area
             new_diameter = math.sqrt(new_area / math.pi) * 2  # todo: use squared values for speed?
-            new_energy = random.randint(0, int(remaining_energy * 0.8))
+            new_energy = self._random.randint(0, int(remaining_energy * 0.8))
             remaining_energy = remaining_energy - new_energy
             new_speed = math.sqrt(2 * new_energy / new_area)
-            new_rotation = random.randint(-180, 180)
-            new_velocity = {
-                'horizontal': new_speed * math.sin(math.radians(new_rotation)),
-                'vertical': new_speed * math.cos(math.radians(new_rotation))
-            }
+            new_rotation = self._random.randint(-180, 180)
+            new_velocity = Velocity(new_speed * math.sin(math.radians(new_rotation)),
+                                    new_speed * math.cos(math.radians(new_rotation)))
             new_position = asteroid.position.copy()
 
-            new_asteroid = AsteroidFragment(new_position, new_velocity, new_rotation, int(new_diameter),
-                                            self._display_rect, primary_asteroid)
-            self._asteroids.append(new_asteroid)
-            primary_asteroid.fragments.append(new_asteroid)
+            new_asteroid = self._fragment_pool.acquire(new_position, new_velocity, new_rotation, int(new_diameter),
+                                                       self._display_rect, primary_asteroid)
+            new_asteroid.handle = self._asteroids.insert(new_asteroid)
+            primary_asteroid.add_fragment()
             new_asteroid.add(self._draw_group, self._update_group)
 
     def update(self):
@@ -102,7 +185,7 @@ class AsteroidGenerator:
         # -number of asteroids per level = level
 
         # level complete
-        elapsed_time = pygame.time.get_ticks() - self._prev_generation_time
+        elapsed_time = self._clock.get_ticks() - self._prev_generation_time
         self._time_to_next_generation = self._level_generation_period - elapsed_time
         if self._asteroid_level_count == self._level and len(self._asteroids) == 0:
             self._level += 1
@@ -115,52 +198,44 @@ class AsteroidGenerator:
             )
             self._level_generation_period = AsteroidGenerator.MAXIMUM_GENERATION_PERIOD - period_reduction
             self._generate()
-            self._prev_generation_time = pygame.time.get_ticks()
+            self._prev_generation_time = self._clock.get_ticks()
             self._asteroid_level_count = 1
             self._asteroids_destroyed_level_count = 0
         elif ((elapsed_time > self._level_generation_period or len(self._asteroids) == 0)
               and self._asteroid_level_count < self._level):
             self._generate()
-            self._prev_generation_time = pygame.time.get_ticks()
+            self._prev_generation_time = self._clock.get_ticks()
             self._asteroid_level_count += 1
 
-    def _generate(self):
+    def _generate(self) -> AsteroidPrimary:
         # generation process
         # -select random diameter between min and max
         # -select random position off-screen such that the asteroid is just off the screen
         # -select random position on-screen, get calculate velocity between that point and asteroid center point
         # -create asteroid
 
-        diameter = random.randint(AsteroidGenerator.MINIMUM_DIAMETER, AsteroidGenerator.MAXIMUM_DIAMETER)
+        diameter = self._random.randint(AsteroidGenerator.MINIMUM_DIAMETER, AsteroidGenerator.MAXIMUM_DIAMETER)
         # top=0, right=1, bottom=2, left=3
         # could use an outer rectangle to get values, as for inner_rect
-        location = random.randint(0, 3)
+        location = self._random.randint(0, 3)
         if location == 0:
-            position = {
-                'x': random.randint(0, self._display_rect.width + (diameter * 2)) - diameter,
-                'y': -(diameter / 2)
-            }
+            position = Position(self._random.randint(0, self._display_rect.width + (diameter * 2)) - diameter,
+                                -(diameter / 2))
         elif location == 1:
-            position = {
-                'x': self._display_rect.width + (diameter / 2),
-                'y': random.randint(0, self._display_rect.height + (diameter * 2)) - diameter
-            }
+            position = Position(self._display_rect.width + (diameter / 2),
+                                self._random.randint(0, self._display_rect.height + (diameter * 2)) - diameter)
         elif location == 2:
-            position = {
-                'x': random.randint(0, self._display_rect.width + (diameter * 2)) - diameter,
-                'y': self._display_rect.height + (diameter / 2)
-            }
+            position = Position(self._random.randint(0, self._display_rect.width + (diameter * 2)) - diameter,
+                                self._display_rect.height + (diameter / 2))
         else:  # location == 3
-            position = {
-                'x': -(diameter / 2),
-                'y': random.randint(0, self._display_rect.height + (diameter * 2)) - diameter
-            }
+            position = Position(-(diameter / 2),
+                                self._random.randint(0, self._display_rect.height + (diameter * 2)) - diameter)
         # use inner rect such that the asteroid is guaranteed to fully appear
         inner_rect = pygame.Rect(diameter, diameter, self._display_rect.width - (diameter * 2),
                                  self._display_rect.height - (diameter * 2))
         target_point = {
-            'x': random.randint(inner_rect.left, inner_rect.right),
-            'y': random.randint(inner_rect.top, inner_rect.bottom)
+            'x': self._random.randint(inner_rect.left, inner_rect.right),
+            'y': self._random.randint(inner_rect.top, inner_rect.bottom)
         }
         # target_point = {
         #     'x': random.randint(diameter, self._display_surface.get_width() - diameter),
@@ -168,11 +243,11 @@ class AsteroidGenerator:
         # }
         # vector in y-axis +ve up
         targeting_vector = {
-            'x': target_point['x'] - position['x'],
-            'y': position['y'] - target_point['y']
+            'x': target_point['x'] - position.x,
+            'y': position.y - target_point['y']
         }
         magnitude = math.sqrt(targeting_vector['x'] ** 2 + targeting_vector['y'] ** 2)
-        speed = random.randint(AsteroidGenerator.MINIMUM_SPEED, AsteroidGenerator.MAXIMUM_SPEED)
+        speed = self._random.randint(AsteroidGenerator.MINIMUM_SPEED, AsteroidGenerator.MAXIMUM_SPEED)
         if targeting_vector['x'] > 0 and targeting_vector['y'] > 0:
             targeting_rotation_rad = math.asin(targeting_vector['x'] / magnitude)
         elif targeting_vector['x'] > 0 and targeting_vector['y'] < 0:
@@ -181,12 +256,10 @@ class AsteroidGenerator:
             targeting_rotation_rad = math.asin(targeting_vector['x'] / magnitude)
         else:  # targeting_vector['x'] < 0 and targeting_vector['y'] < 0
             targeting_rotation_rad = -math.acos(targeting_vector['y'] / magnitude)
-        velocity = {
-            'horizontal': speed * math.sin(targeting_rotation_rad),
-            'vertical': speed * math.cos(targeting_rotation_rad)
-        }
+        velocity = Velocity(speed * math.sin(targeting_rotation_rad), speed * math.cos(targeting_rotation_rad))
 
         asteroid = AsteroidPrimary(position, velocity, math.degrees(targeting_rotation_rad), diameter,
                                    self._display_rect)
-        self._asteroids.append(asteroid)
+        asteroid.handle = self._asteroids.insert(asteroid)
         asteroid.add(self._draw_group, self._update_group)
+        return asteroid
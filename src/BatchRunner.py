@@ -0,0 +1,157 @@
+import csv
+import math
+import multiprocessing
+import os
+from dataclasses import asdict, dataclass, field
+from itertools import product
+
+from .AsteroidGenerator import AsteroidGenerator
+from .Bot import Bot
+from .SpaceFrenzyEngine import SpaceFrenzyEngine
+
+# the AsteroidGenerator constants that can be overridden per game
+TUNABLE_PARAMETERS = ('MINIMUM_GENERATION_PERIOD', 'MAXIMUM_GENERATION_PERIOD', 'MINIMUM_DIAMETER',
+                      'MAXIMUM_DIAMETER', 'MINIMUM_SPEED', 'MAXIMUM_SPEED', 'MAXIMUM_LEVEL')
+DEFAULT_MAX_FRAMES = 36000  # 10 minutes of simulated time at 60 frames/s
+
+
+@dataclass
+class BatchGame:
+    seed: int
+    parameters: dict[str, int] = field(default_factory=dict)  # AsteroidGenerator constant -> value
+    max_frames: int = DEFAULT_MAX_FRAMES
+    input_log: str | None = None  # played back instead of the bot
+
+
+@dataclass
+class BatchResult:
+    seed: int
+    parameters: dict[str, int]
+    frames: int
+    survival_time: int  # ms of simulated time
+    level: int
+    asteroids_destroyed: int
+    game_over: bool
+    frame_mean: float  # ms of wall time per frame
+    frame_p99: float  # ms
+
+
+def sweep(parameter_values: dict[str, list[int]]) -> list[dict[str, int]]:
+    # every combination of the values, e.g. {'MINIMUM_SPEED': [100, 150]} -> [{'MINIMUM_SPEED': 100}, ...].
+    # raises ValueError if any combination is invalid
+    names = list(parameter_values)
+    parameter_sets = [dict(zip(names, values)) for values in product(*(parameter_values[name] for name in names))]
+    for parameters in parameter_sets:
+        check_parameters(parameters)
+    return parameter_sets
+
+
+def check_parameters(parameters: dict[str, int]):
+    # raises ValueError for an unknown parameter, or a minimum above its maximum once the overrides are applied,
+    # which the generator would fail on mid-game
+    unknown = set(parameters) - set(TUNABLE_PARAMETERS)
+    if unknown:
+        raise ValueError(f'unknown parameters: {", ".join(sorted(unknown))}')
+    for name in TUNABLE_PARAMETERS:
+        if not name.startswith('MINIMUM_'):
+            continue
+        maximum_name = 'MAXIMUM_' + name[len('MINIMUM_'):]
+        minimum = parameters.get(name, getattr(AsteroidGenerator, name))
+        maximum = parameters.get(maximum_name, getattr(AsteroidGenerator, maximum_name))
+        if minimum > maximum:
+            raise ValueError(f'{name} {minimum} is more than {maximum_name} {maximum}')
+
+
+def run_game(main_dir: str, game: BatchGame, engine_options: dict) -> BatchResult:
+    # runs in a worker process, which runs one game at a time, so the generator constants can be overridden for the
+    # duration of the game.  They are restored afterwards for the next game in the process
+    check_parameters(game.parameters)
+    overridden = {name: getattr(AsteroidGenerator, name) for name in (*game.parameters, 'MINIMUM_AREA')}
+    try:
+        for name, value in game.parameters.items():
+            setattr(AsteroidGenerator, name, value)
+        AsteroidGenerator.MINIMUM_AREA = ((AsteroidGenerator.MINIMUM_DIAMETER / 2) ** 2) * math.pi
+        # keep every frame so that the frame cost covers the whole game
+        engine = SpaceFrenzyEngine(main_dir, headless=True, seed=game.seed, profile=True,
+                                   profile_capacity=game.max_frames, **engine_options)
+        result = engine.run_simulation(game.max_frames, Bot(game.input_log))
+    finally:
+        for name, value in overridden.items():
+            setattr(AsteroidGenerator, name, value)
+    frame = engine.profiler.summary()['frame']
+    return BatchResult(game.seed, game.parameters, result.frames, result.simulation_time, result.level,
+                       result.asteroids_destroyed_total, result.game_over, frame['mean'], frame['p99'])
+
+
+def _run_game(arguments: tuple[str, BatchGame, dict]) -> BatchResult:
+    return run_game(*arguments)
+
+
+class BatchRunner:
+    # runs independent headless games across a pool of processes and yields each result as soon as its game ends,
+    # in completion order.  engine_options are passed to every SpaceFrenzyEngine, e.g. vector_physics
+    def __init__(self, main_dir: str, processes: int = None, engine_options: dict = None):
+        self._main_dir = main_dir
+        self._processes = processes if processes is not None else os.cpu_count()
+        self._engine_options = engine_options if engine_options is not None else {}
+
+    def run(self, games: list[BatchGame]):
+        # the games are checked up front, as a game failing in a worker ends the whole batch
+        for game in games:
+            check_parameters(game.parameters)
+        with multiprocessing.Pool(self._processes) as pool:
+            yield from pool.imap_unordered(_run_game, [(self._main_dir, game, self._engine_options)
+                                                       for game in games])
+
+
+class BatchReport:
+    # aggregates results per parameter set as they arrive, and optionally streams each result to a csv file
+    def __init__(self, path: str = None):
+        self._groups = {}  # parameter set -> results
+        self._file = None
+        self._writer = None
+        if path is not None:
+            self._file = open(path, 'w', newline='')
+            self._writer = csv.DictWriter(self._file, fieldnames=[*TUNABLE_PARAMETERS,
+                                                                  *(name for name in BatchResult.__dataclass_fields__
+                                                                    if name != 'parameters')])
+            self._writer.writeheader()
+
+    def add(self, result: BatchResult):
+        self._groups.setdefault(tuple(sorted(result.parameters.items())), []).append(result)
+        if self._writer is not None:
+            row = asdict(result)
+            self._writer.writerow({**row.pop('parameters'), **row})
+            self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+    def summary(self) -> list[dict]:
+        # one row per parameter set, in the order the sets first completed
+        rows = []
+        for parameters, results in self._groups.items():
+            count = len(results)
+            rows.append({
+                'parameters': dict(parameters),
+                'games': count,
+                'level_mean': sum(result.level for result in results) / count,
+                'level_max': max(result.level for result in results),
+                'destroyed_mean': sum(result.asteroids_destroyed for result in results) / count,
+                'survival_mean': sum(result.survival_time for result in results) / count / 1000,  # s
+                'game_over_rate': sum(result.game_over for result in results) / count,
+                'frame_mean': sum(result.frame_mean for result in results) / count,
+                'frame_p99': max(result.frame_p99 for result in results),
+            })
+        return rows
+
+    def lines(self) -> list[str]:
+        lines = [f'{"games":>5} {"level":>6} {"max":>4} {"destroyed":>9} {"survival s":>10} {"over":>5} '
+                 f'{"frame ms":>8} {"p99 ms":>7}  parameters']
+        for row in self.summary():
+            parameters = ' '.join(f'{name}={value}' for name, value in row['parameters'].items()) or 'defaults'
+            lines.append(f'{row["games"]:>5} {row["level_mean"]:>6.2f} {row["level_max"]:>4} '
+                         f'{row["destroyed_mean"]:>9.2f} {row["survival_mean"]:>10.1f} {row["game_over_rate"]:>5.2f} '
+                         f'{row["frame_mean"]:>8.3f} {row["frame_p99"]:>7.3f}  {parameters}')
+        return lines
@@ -0,0 +1,326 @@
+import gc
+import json
+import random
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from typing import Callable
+
+import pygame
+
+from .Asteroid import AsteroidPrimary
+from .FrameProfiler import FrameProfiler
+from .InputLog import KeyState
+from .Position import Position
+from .ProjectileGroup import ProjectileGroup
+from .SpaceCraftBullet import SpaceCraftBullet
+from .SpaceFrenzyEngine import SpaceFrenzyEngine
+from .Velocity import Velocity
+
+# the metrics compared against a baseline.  Timings are compared on the mean and the median of the frame time, the
+# tail is too noisy to fail a run on and is only reported.  Allocations are compared on the bytes allocated per
+# frame and on the garbage collections, which run after a fixed number of net container allocations
+COMPARED_TIMINGS = ('mean', 'p50')
+DEFAULT_THRESHOLD = 20  # % regression from the baseline that fails the run
+# runs per scenario.  Each timing is the minimum over the runs, as the least disturbed by the machine
+DEFAULT_REPEATS = 3
+# the entity comparison.  Entities constructed and updated, updates of each, and spacecraft updates
+ENTITY_COUNT = 2000
+ENTITY_UPDATES = 200
+SPACE_CRAFT_UPDATES = 20000
+
+
+@dataclass
+class Scenario:
+    name: str
+    frames: int
+    # prepares the new game, then gives the key events and key state for each frame
+    setup: Callable[[SpaceFrenzyEngine], None]
+    control: Callable[[SpaceFrenzyEngine, int], tuple[list[pygame.event.Event], KeyState]]
+    seed: int = 1
+    engine_options: dict = field(default_factory=dict)  # in addition to those of the run
+
+
+@dataclass
+class BenchmarkResult:
+    scenario: str
+    frames: int
+    timings: dict[str, dict[str, float]]  # phase or 'frame' -> statistic -> ms
+    counts: dict[str, float]  # entity count -> max over the run
+    gc_collections: int  # garbage collections of any generation during the run
+    frame_allocated: float  # mean bytes allocated by a frame above the memory in use when it started
+    net_allocated: int  # bytes still allocated after the run, a leak shows as growth
+
+
+_NO_KEYS = KeyState(0)
+_FIRE_DOWN = pygame.event.Event(pygame.KEYDOWN, key=pygame.K_x)
+_FIRE_UP = pygame.event.Event(pygame.KEYUP, key=pygame.K_x)
+
+
+def _no_setup(engine: SpaceFrenzyEngine):
+    pass
+
+
+def _no_input(engine: SpaceFrenzyEngine, frame: int) -> tuple[list[pygame.event.Event], KeyState]:
+    return [], _NO_KEYS
+
+
+def _start_level_50(engine: SpaceFrenzyEngine):
+    engine.asteroid_generator.set_level(50)
+
+
+def _spawn_level_50(engine: SpaceFrenzyEngine, frame: int) -> tuple[list[pygame.event.Event], KeyState]:
+    # the level starts with one asteroid, spawn the rest of the level over the following frames
+    if 0 < frame < 50:
+        engine.asteroid_generator.spawn()
+    return [], _NO_KEYS
+
+
+def _create_fragments(engine: SpaceFrenzyEngine):
+    # shatter primary asteroids placed at random on screen until there are 500 fragments, as if each had been shot
+    asteroid_generator = engine.asteroid_generator
+    arena_rect = engine.arena_rect
+    rng = random.Random(1)
+    while asteroid_generator.asteroid_count < 500:
+        primary = asteroid_generator.spawn()
+        primary.position.x = rng.randint(arena_rect.left + 50, arena_rect.right - 50)
+        primary.position.y = rng.randint(arena_rect.top + 50, arena_rect.bottom - 50)
+        asteroid_generator.fragment(primary)
+        asteroid_generator.remove(primary)
+        asteroid_generator.release(primary)
+
+
+def _fire_continuously(engine: SpaceFrenzyEngine, frame: int) -> tuple[list[pygame.event.Event], KeyState]:
+    # turn while tapping fire every other frame, 30 bullets/s at 60 frames/s
+    return [_FIRE_DOWN] if frame % 2 == 0 else [_FIRE_UP], KeyState.from_keys([pygame.K_RIGHT])
+
+
+def _place_at_corner(engine: SpaceFrenzyEngine):
+    engine.space_craft.set_position(engine.arena_rect.left, engine.arena_rect.top)
+
+
+def _fill_arena(engine: SpaceFrenzyEngine):
+    # 2000 primary asteroids spread over the arena, most of them far from the view
+    asteroid_generator = engine.asteroid_generator
+    arena_rect = engine.arena_rect
+    rng = random.Random(1)
+    while asteroid_generator.asteroid_count < 2000:
+        primary = asteroid_generator.spawn()
+        primary.position.x = rng.randint(arena_rect.left + 100, arena_rect.right - 100)
+        primary.position.y = rng.randint(arena_rect.top + 100, arena_rect.bottom - 100)
+        # far asteroids are not updated every frame, so place the rect and the previous position as well
+        primary.rect.center = (primary.position.x, primary.position.y)
+        primary.previous_position = (primary.position.x, primary.position.y)
+        primary.activate()
+
+
+def _fly(engine: SpaceFrenzyEngine, frame: int) -> tuple[list[pygame.event.Event], KeyState]:
+    # thrust so the camera scrolls
+    return [], KeyState.from_keys([pygame.K_UP])
+
+
+def _turn(engine: SpaceFrenzyEngine, frame: int) -> tuple[list[pygame.event.Event], KeyState]:
+    # stationary at the corner the spacecraft stays wrapped, and turning rotates both sprites
+    return [], KeyState.from_keys([pygame.K_RIGHT])
+
+
+SCENARIOS = {scenario.name: scenario for scenario in (
+    Scenario('idle_level_1', 600, _no_setup, _no_input),
+    Scenario('level_50_spawn', 600, _start_level_50, _spawn_level_50),
+    Scenario('fragments_500', 300, _create_fragments, _no_input),
+    Scenario('continuous_fire', 600, _no_setup, _fire_continuously),
+    Scenario('corner_wrap', 600, _place_at_corner, _turn),
+    Scenario('arena_2000', 600, _fill_arena, _fly, engine_options={'arena_size': (10000, 10000)}),
+)}
+
+
+def run_scenario(main_dir: str, scenario: Scenario, repeats: int = DEFAULT_REPEATS,
+                 **engine_options) -> BenchmarkResult:
+    # the game is drawn, to the dummy video driver when there is no display, so every phase is measured.
+    # simulated time makes every run of a scenario identical.  Scenarios run for all of their frames, the game
+    # carries on after game over.  The timed runs are followed by an untimed run that traces the allocations
+    summaries = []
+    gc_collections = None
+    for _ in range(repeats):
+        engine = _start_scenario(main_dir, scenario, engine_options, profile=True)
+        collections = sum(generation['collections'] for generation in gc.get_stats())
+        for frame in range(scenario.frames):
+            key_events, key_state = scenario.control(engine, frame)
+            engine.step_simulation(key_events, key_state)
+        collections = sum(generation['collections'] for generation in gc.get_stats()) - collections
+        gc_collections = collections if gc_collections is None else min(gc_collections, collections)
+        summaries.append(engine.profiler.summary())
+        frames = engine.profiler.frames
+        engine.close()
+    frame_allocated, net_allocated = _trace_allocations(main_dir, scenario, engine_options)
+    # each statistic is the minimum over the runs rather than taken from a single run, so that one disturbed
+    # frame in the fastest run does not move its tail
+    timings = {name: {statistic: min(summary[name][statistic] for summary in summaries)
+                      for statistic in summaries[0][name]}
+               for name in (*FrameProfiler.PHASES, 'frame')}
+    return BenchmarkResult(scenario.name, frames, timings,
+                           {name: summaries[0][name]['max'] for name in FrameProfiler.COUNTS},
+                           gc_collections, frame_allocated, net_allocated)
+
+
+def _start_scenario(main_dir: str, scenario: Scenario, engine_options: dict, profile: bool) -> SpaceFrenzyEngine:
+    engine = SpaceFrenzyEngine(main_dir, delta_time=SpaceFrenzyEngine.SIMULATION_DELTA_TIME, profile=profile,
+                               profile_capacity=scenario.frames, **{**engine_options, **scenario.engine_options})
+    engine.new_simulation(scenario.seed)
+    scenario.setup(engine)
+    gc.collect()
+    return engine
+
+
+def _trace_allocations(main_dir: str, scenario: Scenario, engine_options: dict) -> tuple[float, int]:
+    # the mean bytes allocated by a frame, measured as its peak traced memory above the memory in use when it
+    # started, and the bytes still allocated after the run.  Tracing slows the game, so it is not timed
+    engine = _start_scenario(main_dir, scenario, engine_options, profile=False)
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    allocated = 0
+    for frame in range(scenario.frames):
+        key_events, key_state = scenario.control(engine, frame)
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        engine.step_simulation(key_events, key_state)
+        allocated += tracemalloc.get_traced_memory()[1] - before
+    engine.close()
+    gc.collect()
+    net_allocated = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    return allocated / scenario.frames, net_allocated
+
+
+def save_baseline(path: str, results: list[BenchmarkResult]):
+    with open(path, 'w') as file:
+        json.dump({result.scenario: asdict(result) for result in results}, file, indent=1)
+
+
+def load_baseline(path: str) -> dict[str, BenchmarkResult]:
+    with open(path) as file:
+        return {name: BenchmarkResult(**result) for name, result in json.load(file).items()}
+
+
+def regressions(results: list[BenchmarkResult], baseline: dict[str, BenchmarkResult],
+                threshold: float = DEFAULT_THRESHOLD) -> list[str]:
+    # a description of each metric that is worse than the baseline by more than threshold %.  Scenarios missing
+    # from the baseline are not compared
+    found = []
+    limit = 1 + (threshold / 100)
+    for result in results:
+        base = baseline.get(result.scenario)
+        if base is None:
+            continue
+        for statistic in COMPARED_TIMINGS:
+            current = result.timings['frame'][statistic]
+            previous = base.timings['frame'][statistic]
+            if current > previous * limit:
+                found.append(f'{result.scenario}: frame {statistic} {current:.3f} ms, baseline {previous:.3f} ms '
+                             f'({((current / previous) - 1) * 100:+.0f}%)')
+        if result.frame_allocated > base.frame_allocated * limit:
+            found.append(f'{result.scenario}: {result.frame_allocated:.0f} bytes allocated per frame, '
+                         f'baseline {base.frame_allocated:.0f}')
+        # garbage collections are counted, so allow one extra for scenarios that barely allocate
+        if result.gc_collections > (base.gc_collections * limit) + 1:
+            found.append(f'{result.scenario}: {result.gc_collections} garbage collections, '
+                         f'baseline {base.gc_collections}')
+    return found
+
+
+def report_lines(results: list[BenchmarkResult]) -> list[str]:
+    lines = []
+    for result in results:
+        counts = ' '.join(f'{name}: {int(value)}' for name, value in result.counts.items())
+        lines.append(f'{result.scenario}  frames: {result.frames}  {counts}  gc: {result.gc_collections}  '
+                     f'allocated/frame: {result.frame_allocated:.0f} B  net allocated: {result.net_allocated} B')
+        lines.append(f'  {"phase":<10} {"mean":>7} {"p50":>7} {"p90":>7} {"p99":>7} {"max":>7} ms')
+        for name, stats in result.timings.items():
+            lines.append(f'  {name:<10} {stats["mean"]:>7.3f} {stats["p50"]:>7.3f} {stats["p90"]:>7.3f} '
+                         f'{stats["p99"]:>7.3f} {stats["max"]:>7.3f}')
+    return lines
+
+
+def _dict_motion(index: int) -> tuple[dict[str, float], dict[str, float]]:
+    # the position and velocity as they were held before Position and Velocity, string keyed dicts
+    return {'x': float(index), 'y': float(index)}, {'horizontal': 50.0, 'vertical': -25.0}
+
+
+def _slots_motion(index: int) -> tuple[Position, Velocity]:
+    return Position(float(index), float(index)), Velocity(50.0, -25.0)
+
+
+def _update_dict_motion(motions: list[tuple[dict[str, float], dict[str, float]]], delta_time: int):
+    # Projectile.update as it was, with the copy of the position taken every update
+    for position, velocity in motions:
+        previous_position = position.copy()
+        position['x'] = previous_position['x'] + (velocity['horizontal'] * (delta_time / 1000))
+        position['y'] = previous_position['y'] - (velocity['vertical'] * (delta_time / 1000))
+
+
+def _update_slots_motion(motions: list[tuple[Position, Velocity]], delta_time: int):
+    for position, velocity in motions:
+        previous_position = (position.x, position.y)
+        position.x = previous_position[0] + (velocity.horizontal * (delta_time / 1000))
+        position.y = previous_position[1] - (velocity.vertical * (delta_time / 1000))
+
+
+def _traced_bytes(create: Callable[[int], object]) -> tuple[float, list]:
+    # mean bytes allocated per created object, and the objects
+    gc.collect()
+    tracemalloc.start()
+    objects = [create(index) for index in range(ENTITY_COUNT)]
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return allocated / ENTITY_COUNT, objects
+
+
+def _updates_per_second(update: Callable[[], None], updates: int) -> float:
+    # entity updates/s, of the best of three runs
+    best = None
+    for _ in range(3):
+        start = time.perf_counter()
+        update()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return updates / best
+
+
+def entity_lines(main_dir: str) -> list[str]:
+    # memory per entity and update throughput.  The motion representation is compared with the string keyed dicts
+    # it replaced, then the entities that hold it are measured as they are now.  Bytes are traced allocations per
+    # constructed object, including its position and velocity
+    delta_time = SpaceFrenzyEngine.SIMULATION_DELTA_TIME
+    lines = [f'{ENTITY_COUNT} entities, {ENTITY_UPDATES} updates each, {SPACE_CRAFT_UPDATES} spacecraft updates',
+             f'  {"":<16} {"bytes":>8} {"updates/s":>12}']
+    for name, create, update in (('dict motion', _dict_motion, _update_dict_motion),
+                                 ('slots motion', _slots_motion, _update_slots_motion)):
+        allocated, motions = _traced_bytes(create)
+        rate = _updates_per_second(lambda: [update(motions, delta_time) for _ in range(ENTITY_UPDATES)],
+                                   ENTITY_COUNT * ENTITY_UPDATES)
+        lines.append(f'  {name:<16} {allocated:>8.0f} {rate:>12,.0f}')
+
+    engine = SpaceFrenzyEngine(main_dir, headless=True)
+    engine.new_simulation(1)  # the images are converted to the display format
+    arena_rect = engine.arena_rect
+    rng = random.Random(1)
+    for name, create in (
+            ('asteroid', lambda index: AsteroidPrimary(Position(rng.uniform(0, arena_rect.width), 0),
+                                                       Velocity(rng.uniform(-50, 50), rng.uniform(-50, 50)),
+                                                       rng.uniform(-180, 180), 40, arena_rect)),
+            ('bullet', lambda index: SpaceCraftBullet(Position(rng.uniform(0, arena_rect.width), 0),
+                                                      Velocity(0, 0), rng.uniform(-180, 180)))):
+        allocated, entities = _traced_bytes(create)
+        group = ProjectileGroup(*entities)
+        rate = _updates_per_second(lambda: [group.update(delta_time) for _ in range(ENTITY_UPDATES)],
+                                   ENTITY_COUNT * ENTITY_UPDATES)
+        group.empty()
+        lines.append(f'  {name:<16} {allocated:>8.0f} {rate:>12,.0f}')
+
+    space_craft = engine.space_craft
+    key_state = KeyState.from_keys([pygame.K_UP, pygame.K_RIGHT])
+    rate = _updates_per_second(lambda: [space_craft.update(delta_time, [], key_state)
+                                        for _ in range(SPACE_CRAFT_UPDATES)], SPACE_CRAFT_UPDATES)
+    lines.append(f'  {"spacecraft":<16} {"":>8} {rate:>12,.0f}')
+    engine.close()
+    return lines
@@ -0,0 +1,59 @@
+import math
+
+import pygame
+
+from .AsteroidGenerator import AsteroidGenerator
+from .InputLog import InputReplay, KeyState
+from .SpaceCraft import SpaceCraft
+
+
+class Bot:
+    # scripted player for headless simulations.  Turns toward the nearest asteroid and taps fire at a fixed period,
+    # without thrust, so results only depend on the seed and the asteroid generation.
+    # with an input log the recorded keys are played back instead, frame by frame, and nothing is pressed once the
+    # log is exhausted
+    FIRE_PERIOD = 6  # frames between presses of the fire key
+    AIM_TOLERANCE = 3  # degrees either side of the target within which the bot stops turning
+
+    def __init__(self, input_log: str = None, fire_period: int = FIRE_PERIOD):
+        self._script = iter(InputReplay(input_log)) if input_log is not None else None
+        self._fire_period = fire_period
+        self._frames = 0
+
+    def control(self, space_craft: SpaceCraft,
+                asteroid_generator: AsteroidGenerator) -> tuple[list[pygame.event.Event], KeyState]:
+        # the key events and key state for the next frame
+        frame = self._frames
+        self._frames += 1
+        if self._script is not None:
+            _, key_events, key_state = next(self._script, (0, [], KeyState(0)))
+            return key_events, key_state
+
+        keys = []
+        target = self._nearest_asteroid(space_craft, asteroid_generator)
+        if target is not None:
+            position = space_craft.position
+            bearing = math.degrees(math.atan2(target.position.x - position.x, position.y - target.position.y))
+            difference = ((bearing - space_craft.rotation + 180) % 360) - 180
+            if difference < -Bot.AIM_TOLERANCE:
+                keys.append(pygame.K_LEFT)
+            elif difference > Bot.AIM_TOLERANCE:
+                keys.append(pygame.K_RIGHT)
+        key_events = []
+        if frame % self._fire_period == 0:
+            key_events.append(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_x))
+        elif frame % self._fire_period == 1:
+            key_events.append(pygame.event.Event(pygame.KEYUP, key=pygame.K_x))
+        return key_events, KeyState.from_keys(keys)
+
+    @staticmethod
+    def _nearest_asteroid(space_craft: SpaceCraft, asteroid_generator: AsteroidGenerator):
+        position = space_craft.position
+        nearest = None
+        nearest_distance = 0
+        for asteroid in asteroid_generator.asteroids:
+            distance = ((asteroid.position.x - position.x) ** 2) + ((asteroid.position.y - position.y) ** 2)
+            if nearest is None or distance < nearest_distance:
+                nearest = asteroid
+                nearest_distance = distance
+        return nearest
@@ -0,0 +1,30 @@
+import pygame
+
+from .Position import Position
+
+
+class Camera:
+    # the view of an arena larger than the screen.  The view is centered on the followed position, but never shows
+    # beyond the arena edges.  Sprites outside the view are culled before drawing
+    def __init__(self, view_size: tuple[int, int], arena_rect: pygame.Rect):
+        self._arena_rect = arena_rect
+        self._view = pygame.Rect((0, 0), view_size)
+        self._view.center = arena_rect.center
+        self._view.clamp_ip(arena_rect)
+
+    @property
+    def view(self) -> pygame.Rect:
+        # in arena coordinates
+        return self._view
+
+    @property
+    def offset(self) -> tuple[int, int]:
+        return self._view.topleft
+
+    def follow(self, position: Position):
+        self._view.center = (position.x, position.y)
+        self._view.clamp_ip(self._arena_rect)
+
+    def visible(self, sprites: list[pygame.sprite.Sprite]) -> list[pygame.sprite.Sprite]:
+        # the sprites in view, in order
+        return [sprites[index] for index in self._view.collidelistall([sprite.rect for sprite in sprites])]
@@ -1,8 +1,14 @@
+import math
+
 import pygame
 
 from .Asteroid import Asteroid
 from .AsteroidGenerator import AsteroidGenerator
+from .Projectile import Projectile
 from .SpaceCraft import SpaceCraft
+from .SpaceCraftBullet import SpaceCraftBullet
+from .SpatialHash import SpatialHash
+from .SweepAndPrune import SweepAndPrune
 
 
 def _check_asteroid_rect_collision(asteroid: Asteroid, rect: pygame.Rect) -> bool:
@@ -18,46 +24,183 @@ def _check_asteroid_rect_collision(asteroid: Asteroid, rect: pygame.Rect) -> boo
     return False
 
 
+def _check_sprite_mask_collision(sprite: pygame.sprite.Sprite, other: pygame.sprite.Sprite) -> bool:
+    # pixel accurate test of the sprites' cached masks, for sprites whose bounding rects are known to overlap
+    offset = (other.rect.left - sprite.rect.left, other.rect.top - sprite.rect.top)
+    return sprite.mask.overlap(other.mask, offset) is not None
+
+
+def _time_of_impact(asteroid: Asteroid, bullet: SpaceCraftBullet) -> float | None:
+    # continuous collision detection.  Both bodies move in a straight line from their previous to current position
+    # during the update, so in the asteroid's frame the bullet moves along a segment.  Returns the earliest fraction
+    # of the update, 0 to 1, at which the bullet touches the asteroid, or None if it does not
+    if not asteroid.active:
+        return None
+    asteroid_previous_x, asteroid_previous_y = asteroid.previous_position
+    bullet_previous_x, bullet_previous_y = bullet.previous_position
+    start_x = bullet_previous_x - asteroid_previous_x
+    start_y = bullet_previous_y - asteroid_previous_y
+    motion_x = (bullet.position.x - asteroid.position.x) - start_x
+    motion_y = (bullet.position.y - asteroid.position.y) - start_y
+    reach = asteroid.radius + (SpaceCraftBullet.DIAMETER / 2)
+    # solve |start + motion * t| = reach for the smallest t
+    c = (start_x ** 2) + (start_y ** 2) - (reach ** 2)
+    if c <= 0:
+        return 0.0  # touching at the start of the update
+    a = (motion_x ** 2) + (motion_y ** 2)
+    b = 2 * ((start_x * motion_x) + (start_y * motion_y))
+    discriminant = (b ** 2) - (4 * a * c)
+    # no solution when not moving relative to each other, moving apart or passing wide
+    if a > 0 and b < 0 and discriminant >= 0:
+        time = (-b - math.sqrt(discriminant)) / (2 * a)
+        if time <= 1:
+            return time
+    # the swept test uses a circle for the bullet, so keep the end of update test against its rect as well
+    if _check_asteroid_rect_collision(asteroid, bullet.rect):
+        return 1.0
+    return None
+
+
+def _collide_asteroids(first: Asteroid, second: Asteroid):
+    # elastic collision of two circles with mass proportional to area, conserving momentum and kinetic energy
+    normal_x = second.position.x - first.position.x
+    normal_y = second.position.y - first.position.y
+    distance_squared = (normal_x ** 2) + (normal_y ** 2)
+    if distance_squared == 0 or distance_squared > (first.radius + second.radius) ** 2:
+        return  # not touching, or concentric e.g. fragments of the same asteroid, so there is no normal
+    distance = math.sqrt(distance_squared)
+    normal_x /= distance
+    normal_y /= distance
+    # velocity vertical axis is +ve up, the screen axis is +ve down
+    first_velocity = first.velocity
+    second_velocity = second.velocity
+    closing_speed = (((first_velocity.horizontal - second_velocity.horizontal) * normal_x)
+                     - ((first_velocity.vertical - second_velocity.vertical) * normal_y))
+    if closing_speed <= 0:
+        return  # already separating
+    impulse = (2 * closing_speed) / ((1 / first.area) + (1 / second.area))
+    first_change = impulse / first.area
+    second_change = impulse / second.area
+    first.set_velocity(first_velocity.horizontal - (first_change * normal_x),
+                       first_velocity.vertical + (first_change * normal_y))
+    second.set_velocity(second_velocity.horizontal + (second_change * normal_x),
+                        second_velocity.vertical - (second_change * normal_y))
+
+
+def _swept_rect(projectile: Projectile) -> pygame.Rect:
+    # bounding rect of the projectile over the update
+    previous_x, previous_y = projectile.previous_position
+    rect = projectile.rect
+    return rect.union(rect.move(round(previous_x - projectile.position.x),
+                                round(previous_y - projectile.position.y)))
+
+
 class CollisionManager:
-    def __init__(self, space_craft: SpaceCraft, asteroid_generator: AsteroidGenerator, display_rect: pygame.Rect):
-        self._space_craft = space_craft
+    def __init__(self, space_craft: SpaceCraft, asteroid_generator: AsteroidGenerator, display_rect: pygame.Rect,
+                 asteroid_collisions: bool = True):
+        self._space_crafts = [space_craft]
+        self._destroyed = set()  # spacecraft that have been hit
         # todo: explicitly called destructor, or context manager, to release these references
         self._asteroid_generator = asteroid_generator
         self._display_rect = display_rect
         self._game_over = False
+        # cells the size of the largest asteroid keep each asteroid in at most 4 cells
+        self._spatial_hash = SpatialHash(AsteroidGenerator.MAXIMUM_DIAMETER)
+        self._asteroid_collisions = asteroid_collisions
+        self._sweep_and_prune = SweepAndPrune()
+        self._focus_rect = None
+
+    def set_focus(self, rect: pygame.Rect | None):
+        # with a focus rect, e.g. around the camera view of a large arena, bullets are removed once they leave it and
+        # only the asteroids in it can be hit by bullets or the spacecraft.  Asteroids collide with each other anywhere
+        self._focus_rect = rect
 
     @property
     def game_over(self):
+        # a spacecraft has been hit
         return self._game_over
 
+    @property
+    def destroyed(self) -> set[SpaceCraft]:
+        return self._destroyed
+
+    def set_game_over(self, game_over: bool):
+        # e.g. restoring a saved game state.  A single player game is over once its spacecraft has been hit
+        self._game_over = game_over
+        self._destroyed = set(self._space_crafts) if game_over else set()
+
+    def add_space_craft(self, space_craft: SpaceCraft):
+        # another spacecraft in the same space, e.g. a player of a network game.  Bullets hit any spacecraft
+        self._space_crafts.append(space_craft)
+
+    def remove_space_craft(self, space_craft: SpaceCraft):
+        self._space_crafts.remove(space_craft)
+        self._destroyed.discard(space_craft)
+
     def update(self):
-        for bullet in self._space_craft.bullets.copy():
-            # bullet-edge collisions
-            if not self._display_rect.colliderect(bullet.rect):
-                self._space_craft.bullets.remove(bullet)
-                bullet.kill()
-        for bullet in self._space_craft.bullets.copy():
-            # asteroid-bullet collisions
-            collision = False
-            for asteroid in self._asteroid_generator.asteroids:
-                if collision:
-                    break
-                if _check_asteroid_rect_collision(asteroid, bullet.rect):
-                    # fragment before removing otherwise primary asteroid is garbage collected
-                    self._asteroid_generator.fragment(asteroid)
-                    self._asteroid_generator.remove(asteroid)
-                    asteroid.kill()
-                    self._space_craft.bullets.remove(bullet)
-                    bullet.kill()
-                    collision = True
-        for bullet in self._space_craft.bullets.copy():
-            # bullet-spacecraft collisions
-            for r in self._space_craft.collision_rects:
-                if r.colliderect(bullet.rect):
-                    self._game_over = True
-
-        # asteroid-spacecraft collisions
-        for asteroid in self._asteroid_generator.asteroids:
-            for rect in self._space_craft.collision_rects:
-                if _check_asteroid_rect_collision(asteroid, rect):
-                    self._game_over = True
+        # broad phase.  Inactive asteroids cannot collide, which includes fragments created during this update, so
+        # the grid is built once per update.  Asteroids destroyed during this update are no longer alive.
+        # asteroids are added over their swept rect, inflated as the circle can overhang an odd diameter rect by half
+        # a pixel and the bullet by its radius
+        asteroids = self._asteroid_generator.asteroids
+        space_crafts = self._space_crafts
+        self._spatial_hash.clear()
+        focus_rect = self._focus_rect
+        for asteroid in asteroids:
+            if asteroid.active and (focus_rect is None or focus_rect.colliderect(asteroid.rect)):
+                self._spatial_hash.insert(asteroid, _swept_rect(asteroid).inflate(4, 4))
+
+        # asteroid-bullet collisions.  Every bullet and asteroid pair that meets during the update is found, then
+        # resolved in time of impact order so the earliest hit wins, and a bullet or asteroid is only hit once.
+        # the handles are kept as a destroyed fragment can be reused from the pool by a later fragmentation
+        impacts = []
+        for space_craft in space_crafts:
+            for bullet_index, bullet in enumerate(space_craft.bullets):
+                for asteroid_index, asteroid in enumerate(self._spatial_hash.query(_swept_rect(bullet))):
+                    time = _time_of_impact(asteroid, bullet)
+                    if time is not None:
+                        impacts.append((time, bullet_index, asteroid_index, bullet, bullet.handle, asteroid,
+                                        asteroid.handle, space_craft))
+        impacts.sort(key=lambda impact: impact[:3])
+        for _, _, _, bullet, bullet_handle, asteroid, asteroid_handle, space_craft in impacts:
+            if bullet_handle not in space_craft.bullets or asteroid_handle not in asteroids:
+                continue
+            # fragment before removing otherwise primary asteroid is garbage collected
+            self._asteroid_generator.fragment(asteroid)
+            self._asteroid_generator.remove(asteroid)
+            self._asteroid_generator.release(asteroid)
+            space_craft.remove_bullet(bullet)
+
+        # bullet-edge collisions.  After asteroid collisions so a bullet can hit an asteroid on its way out
+        bounds = self._display_rect if focus_rect is None else focus_rect
+        for space_craft in space_crafts:
+            for bullet in [bullet for bullet in space_craft.bullets if not bounds.colliderect(bullet.rect)]:
+                space_craft.remove_bullet(bullet)
+
+        if self._asteroid_collisions:
+            # asteroid-asteroid collisions.  Only between active asteroids, those entering space pass through
+            for first, second in self._sweep_and_prune.pairs(
+                    [asteroid for asteroid in asteroids if asteroid.active]):
+                _collide_asteroids(first, second)
+
+        # spacecraft collisions are pixel accurate, but the masks are only tested when the bounding rect of the
+        # spacecraft overlaps the bullet, or the circle of the asteroid
+        for space_craft in space_crafts:
+            collision_sprites = space_craft.collision_sprites
+            for owner in space_crafts:
+                for bullet in owner.bullets:
+                    # bullet-spacecraft collisions
+                    for sprite in collision_sprites:
+                        if sprite.rect.colliderect(bullet.rect) and _check_sprite_mask_collision(sprite, bullet):
+                            self._destroy(space_craft)
+
+            # asteroid-spacecraft collisions
+            for sprite in collision_sprites:
+                for asteroid in self._spatial_hash.query(sprite.rect):
+                    if (asteroid.alive() and _check_asteroid_rect_collision(asteroid, sprite.rect)
+                            and _check_sprite_mask_collision(sprite, asteroid)):
+                        self._destroy(space_craft)
+
+    def _destroy(self, space_craft: SpaceCraft):
+        self._destroyed.add(space_craft)
+        self._game_over = True
@@ -0,0 +1,116 @@
+from typing import Hashable
+
+import pygame
+
+
+class Compositor:
+    # draws sprites to the display surface and pushes only the regions that changed.
+    # a sprite that has not moved or changed image since the last draw adds nothing, otherwise its previous and current
+    # rects are dirty, as is the previous rect of a sprite that is no longer drawn.  Overlapping dirty rects are merged,
+    # then each region is restored from the background and every sprite overlapping it is redrawn clipped to it, in
+    # order.  When the dirty area passes the threshold the whole area is redrawn and the display flipped instead.
+    # sprite rects can be in world coordinates, drawn offset by the camera, in which case a camera move redraws
+    # everything.  Overlays are always in screen coordinates
+    FULL_SCREEN_THRESHOLD = 0.5  # fraction of the drawing area
+
+    def __init__(self, surface: pygame.Surface, background: pygame.Surface, clip_rect: pygame.Rect,
+                 full_screen_threshold: float = FULL_SCREEN_THRESHOLD):
+        self._surface = surface
+        self._background = background
+        self._clip_rect = clip_rect  # sprites are only drawn within this rect
+        self._full_screen_threshold = full_screen_threshold
+        self._drawn = {}  # sprite or key -> (clipped rect, image, screen rect) when last drawn
+        self._redraw_all = True  # nothing has been drawn yet
+        self._rects_pushed = 0
+        self._pixels_pushed = 0
+
+    @property
+    def rects_pushed(self) -> int:
+        # rects passed to the display in the last draw
+        return self._rects_pushed
+
+    @property
+    def pixels_pushed(self) -> int:
+        return self._pixels_pushed
+
+    def invalidate(self):
+        # the next draw redraws and pushes everything, e.g. after the window has been exposed
+        self._redraw_all = True
+
+    def draw(self, sprites: list[pygame.sprite.Sprite], dirty_rects: list[pygame.Rect] = (),
+             offset: tuple[int, int] = (0, 0), overlays: list[pygame.sprite.Sprite] = ()):
+        # dirty_rects are regions outside the clip rect that have already been drawn, e.g. the hud.
+        # offset is the top left of the view in the coordinates of the sprite rects.  Overlays are drawn last
+        offset_x, offset_y = offset
+        if offset_x or offset_y:
+            placed = [(sprite, sprite.image, sprite.rect.move(-offset_x, -offset_y)) for sprite in sprites]
+        else:
+            placed = [(sprite, sprite.image, sprite.rect) for sprite in sprites]
+        placed.extend((sprite, sprite.image, sprite.rect) for sprite in overlays)
+        self.draw_placed(placed, dirty_rects)
+
+    def draw_placed(self, placed: list[tuple[Hashable, pygame.Surface, pygame.Rect]],
+                    dirty_rects: list[pygame.Rect] = ()):
+        # placed are (key, image, screen rect) in drawing order, e.g. from a render list rather than sprites.  The key
+        # identifies the same item from one draw to the next, as the sprite does
+        clip_rect = self._clip_rect
+        previous = self._drawn
+        drawn = {}
+        dirty = []
+        for key, image, screen_rect in placed:
+            rect = screen_rect.clip(clip_rect)
+            last = previous.pop(key, None)
+            if last is None:
+                if rect:
+                    dirty.append(rect)
+            elif last[1] is not image or last[0] != rect:
+                if last[0]:
+                    dirty.append(last[0])
+                if rect:
+                    dirty.append(rect)
+            drawn[key] = (rect, image, screen_rect)
+        for rect, _, _ in previous.values():
+            if rect:
+                dirty.append(rect)
+        self._drawn = drawn
+
+        regions = _merge(dirty)
+        dirty_area = sum(region.width * region.height for region in regions)
+        surface = self._surface
+        if self._redraw_all or dirty_area > self._full_screen_threshold * clip_rect.width * clip_rect.height:
+            self._redraw_all = False
+            surface.set_clip(clip_rect)
+            surface.blit(self._background, clip_rect, clip_rect)
+            surface.blits([(image, screen_rect) for _, image, screen_rect in placed], False)
+            surface.set_clip(None)
+            pygame.display.flip()
+            self._rects_pushed = 1
+            self._pixels_pushed = surface.get_width() * surface.get_height()
+            return
+
+        if regions:
+            drawn_images = [(image, screen_rect) for _, image, screen_rect in drawn.values()]
+            drawn_rects = [rect for rect, _, _ in drawn.values()]
+            for region in regions:
+                surface.set_clip(region)
+                surface.blit(self._background, region, region)
+                surface.blits([drawn_images[index] for index in region.collidelistall(drawn_rects)], False)
+            surface.set_clip(None)
+        regions.extend(dirty_rects)
+        if regions:
+            pygame.display.update(regions)
+        self._rects_pushed = len(regions)
+        self._pixels_pushed = sum(region.width * region.height for region in regions)
+
+
+def _merge(rects: list[pygame.Rect]) -> list[pygame.Rect]:
+    # union overlapping rects until none overlap
+    merged = []
+    for rect in rects:
+        rect = rect.copy()
+        index = rect.collidelist(merged)
+        while index != -1:
+            rect.union_ip(merged.pop(index))
+            index = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
@@ -0,0 +1,118 @@
+import time
+from typing import Callable
+
+import pygame
+
+from .GameClock import GameClock
+
+# window events that change whether the game is in the background
+_WINDOW_EVENTS = (pygame.WINDOWFOCUSLOST, pygame.WINDOWFOCUSGAINED, pygame.WINDOWMINIMIZED, pygame.WINDOWRESTORED,
+                  pygame.WINDOWHIDDEN, pygame.WINDOWSHOWN, pygame.WINDOWEXPOSED)
+
+
+class FramePacer:
+    # paces the interactive game loop so that an idle or hidden game does not use a core.
+    # menus block on the event queue rather than polling it.  A minimized or hidden window pauses the game until it is
+    # shown, as does losing focus unless pause_in_background is off, in which case the game runs at the background rate.
+    # with adaptive on, the render rate drops to the next even divisor of the target rate when frames cost more than
+    # the budget, so frames are paced evenly rather than missing the target every few frames, and rises again
+    # when the cost falls well under the budget of the higher rate
+    WAIT_TIMEOUT = 500  # ms, longest time blocked on the event queue in menus
+    BACKGROUND_RATE = 10  # frames/s while unfocused and not paused
+    MINIMUM_RATE = 15  # frames/s, the adaptive rate never drops below
+    BUDGET_FRACTION = 0.8  # of the frame time that the frame cost may use before the rate drops
+    RECOVERY_FRACTION = 0.5  # of the higher rate's frame time that the frame cost must be under before the rate rises
+    COST_SMOOTHING = 0.1  # weight of the latest frame in the frame cost average
+
+    def __init__(self, render_rate: int, adaptive: bool = False, pause_in_background: bool = True):
+        self._render_rate = render_rate
+        self._adaptive = adaptive
+        self._pause_in_background = pause_in_background
+        self._divisor = 1  # the rate is the render rate / divisor
+        self._frame_cost = 0.0  # ms, average time spent on a frame excluding the wait for the next
+        self._frame_start = None
+        self._focused = True
+        self._minimized = False
+        self._exposed = False
+
+    @property
+    def rate(self) -> int:
+        # frames/s that the next frame is paced to
+        if not self._focused:
+            return min(FramePacer.BACKGROUND_RATE, self._render_rate)
+        return round(self._render_rate / self._divisor)
+
+    @property
+    def frame_cost(self) -> float:
+        return self._frame_cost
+
+    @property
+    def paused(self) -> bool:
+        return self._minimized or (not self._focused and self._pause_in_background)
+
+    def take_exposed(self) -> bool:
+        # True once after the window has been exposed, when the whole window must be redrawn
+        exposed = self._exposed
+        self._exposed = False
+        return exposed
+
+    def tick(self, clock: GameClock) -> int:
+        # wait for the next frame, or until the game is in the foreground when paused, and return its delta time.
+        # time spent paused is excluded from the game time.  A quit while paused is left on the event queue
+        now = time.perf_counter()
+        if self._frame_start is not None:
+            self._frame_cost += ((now - self._frame_start) * 1000 - self._frame_cost) * FramePacer.COST_SMOOTHING
+            if self._adaptive:
+                self._adapt()
+        self._handle_window_events(pygame.event.get(eventtype=_WINDOW_EVENTS))
+        if self.paused:
+            self._wait_for_foreground()
+            clock.restart()
+        delta_time = clock.tick(self.rate)
+        self._frame_start = time.perf_counter()
+        return delta_time
+
+    def wait_for_key(self, key: int, exposed: Callable[[], None]) -> bool:
+        # block until key is released.  Returns False on quit.  exposed is called to redraw the whole window
+        while True:
+            event = pygame.event.wait(FramePacer.WAIT_TIMEOUT)
+            if event.type == pygame.QUIT:
+                return False
+            if event.type == pygame.KEYUP and event.key == key:
+                self._frame_start = None  # the wait is not part of a frame
+                return True
+            self._handle_window_events([event])
+            if self.take_exposed():
+                exposed()
+
+    def _wait_for_foreground(self):
+        while self.paused:
+            event = pygame.event.wait()
+            if event.type == pygame.QUIT:
+                pygame.event.post(event)
+                break
+            self._handle_window_events([event])
+        self._frame_start = None
+
+    def _handle_window_events(self, events: list[pygame.event.Event]):
+        for event in events:
+            if event.type == pygame.WINDOWFOCUSLOST:
+                self._focused = False
+            elif event.type == pygame.WINDOWFOCUSGAINED:
+                self._focused = True
+            elif event.type in (pygame.WINDOWMINIMIZED, pygame.WINDOWHIDDEN):
+                self._minimized = True
+            elif event.type in (pygame.WINDOWRESTORED, pygame.WINDOWSHOWN):
+                self._minimized = False
+                self._exposed = True
+            elif event.type == pygame.WINDOWEXPOSED:
+                self._exposed = True
+
+    def _adapt(self):
+        rate = self._render_rate / self._divisor
+        if (self._frame_cost > (1000 / rate) * FramePacer.BUDGET_FRACTION
+                and self._render_rate / (self._divisor + 1) >= FramePacer.MINIMUM_RATE):
+            self._divisor += 1
+        elif (self._divisor > 1
+              and self._frame_cost < (1000 / (self._render_rate / (self._divisor - 1))) * FramePacer.RECOVERY_FRACTION):
+            self._divisor -= 1
@@ -0,0 +1,123 @@
+import csv
+import json
+import time
+from array import array
+
+
+class FrameProfiler:
+    # per-phase frame timings and entity counts for the last `capacity` frames, kept in preallocated ring buffers.
+    # when disabled the recording methods are replaced by a no-op, so the calls can stay in the game loop
+    PHASES = ('input', 'generation', 'update', 'collision', 'state', 'hud', 'draw')
+    COUNTS = ('asteroids', 'bullets', 'sprites', 'dirty_rects', 'dirty_pixels')
+    PERCENTILES = (50, 90, 99)
+    DEFAULT_CAPACITY = 600  # frames = 10s at 60 frames/s
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, enabled: bool = True):
+        self._capacity = capacity
+        self._enabled = enabled
+        self._timings = {phase: array('q', bytes(8 * capacity)) for phase in FrameProfiler.PHASES}  # ns
+        self._totals = array('q', bytes(8 * capacity))  # ns
+        self._counts = {name: array('q', bytes(8 * capacity)) for name in FrameProfiler.COUNTS}
+        self._index = 0  # ring buffer slot of the current frame
+        self._frames = 0  # frames recorded, including those overwritten
+        self._frame_start = 0
+        self._phase_start = 0
+        self._in_frame = False
+        if not enabled:
+            self.begin_frame = self.end_phase = self.count = self.end_frame = _no_op
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    @property
+    def in_frame(self) -> bool:
+        # between begin_frame and end_frame.  Phases and counts are only recorded in a frame.  Never when disabled
+        return self._in_frame
+
+    @property
+    def frames(self) -> int:
+        return self._frames
+
+    def begin_frame(self):
+        for values in self._timings.values():
+            values[self._index] = 0
+        self._frame_start = self._phase_start = time.perf_counter_ns()
+        self._in_frame = True
+
+    def end_phase(self, phase: str):
+        # phases can run more than once per frame, e.g. several physics steps, so the timings are summed
+        now = time.perf_counter_ns()
+        self._timings[phase][self._index] += now - self._phase_start
+        self._phase_start = now
+
+    def count(self, name: str, value: int):
+        self._counts[name][self._index] = value
+
+    def end_frame(self):
+        self._totals[self._index] = time.perf_counter_ns() - self._frame_start
+        self._in_frame = False
+        self._frames += 1
+        self._index = self._frames % self._capacity
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        # percentiles, mean and max per phase in ms, and per count, over the frames in the ring buffer
+        recorded = min(self._frames, self._capacity)
+        summary = {}
+        for name, values in [*self._timings.items(), ('frame', self._totals)]:
+            summary[name] = _statistics(values[:recorded], 1e-6)
+        for name, values in self._counts.items():
+            summary[name] = _statistics(values[:recorded], 1)
+        return summary
+
+    def rows(self) -> list[dict[str, int]]:
+        # the recorded frames, oldest first.  Timings are in ns
+        recorded = min(self._frames, self._capacity)
+        first_frame = self._frames - recorded
+        rows = []
+        for frame in range(first_frame, self._frames):
+            index = frame % self._capacity
+            row = {'frame': frame}
+            for phase, values in self._timings.items():
+                row[phase] = values[index]
+            row['total'] = self._totals[index]
+            for name, values in self._counts.items():
+                row[name] = values[index]
+            rows.append(row)
+        return rows
+
+    def overlay_lines(self) -> list[str]:
+        summary = self.summary()
+        lines = [f'{"phase":<10} {"p50":>6} {"p99":>6} {"max":>6} ms']
+        for name in (*FrameProfiler.PHASES, 'frame'):
+            stats = summary[name]
+            lines.append(f'{name:<10} {stats["p50"]:>6.2f} {stats["p99"]:>6.2f} {stats["max"]:>6.2f}')
+        lines.append(' '.join(f'{name}: {int(summary[name]["max"])}' for name in FrameProfiler.COUNTS))
+        return lines
+
+    def export(self, path: str):
+        # json exports the summary and the frames, any other extension exports the frames as csv
+        rows = self.rows()
+        if path.endswith('.json'):
+            with open(path, 'w') as file:
+                json.dump({'summary': self.summary(), 'frames': rows}, file, indent=1)
+        else:
+            with open(path, 'w', newline='') as file:
+                writer = csv.DictWriter(file, fieldnames=['frame', *FrameProfiler.PHASES, 'total',
+                                                          *FrameProfiler.COUNTS])
+                writer.writeheader()
+                writer.writerows(rows)
+
+
+def _no_op(*args):
+    pass
+
+
+def _statistics(values: array, scale: float) -> dict[str, float]:
+    if len(values) == 0:
+        return {'mean': 0.0, 'max': 0.0, **{f'p{percentile}': 0.0 for percentile in FrameProfiler.PERCENTILES}}
+    ordered = sorted(values)
+    statistics = {'mean': (sum(ordered) / len(ordered)) * scale, 'max': ordered[-1] * scale}
+    for percentile in FrameProfiler.PERCENTILES:
+        statistics[f'p{percentile}'] = ordered[round((percentile / 100) * (len(ordered) - 1))] * scale
+    return statistics
@@ -0,0 +1,48 @@
+import pygame
+
+
+class GameClock:
+    # wall clock time, as used by the interactive game.  Game time is the sum of the ticks, so that it can be
+    # reproduced from the recorded delta times
+    def __init__(self):
+        self._clock = pygame.time.Clock()
+        self._ticks = 0
+
+    def tick(self, framerate: int = 0) -> int:
+        delta_time = self._clock.tick(framerate)
+        self._ticks += delta_time
+        return delta_time
+
+    def restart(self):
+        # exclude the time since the previous tick from game time, e.g. time spent waiting on the player
+        self._clock.tick()
+
+    def get_ticks(self) -> int:
+        return self._ticks
+
+    def set_ticks(self, ticks: int):
+        # move game time, e.g. rewinding to a saved game state
+        self._ticks = ticks
+
+
+class SimulationClock(GameClock):
+    # simulated time advanced by a fixed delta time per tick.  The frame rate is ignored so the simulation
+    # runs as fast as the host allows, and is repeatable because no wall clock time is read
+    def __init__(self, delta_time: int):
+        super().__init__()
+        self._delta_time = delta_time
+
+    @property
+    def delta_time(self) -> int:
+        return self._delta_time
+
+    def tick(self, framerate: int = 0) -> int:
+        return self.advance(self._delta_time)
+
+    def advance(self, delta_time: int) -> int:
+        # advance by a given delta time, e.g. when replaying recorded frames
+        self._ticks += delta_time
+        return delta_time
+
+    def restart(self):
+        pass
@@ -0,0 +1,247 @@
+import collections
+import struct
+import zlib
+
+from .Asteroid import Asteroid, AsteroidFragment, AsteroidPrimary
+from .AsteroidGenerator import AsteroidGenerator
+from .CollisionManager import CollisionManager
+from .GameClock import GameClock
+from .Position import Position
+from .SpaceCraft import SpaceCraft
+from .Velocity import Velocity
+
+# state layout, little endian:
+#   header: magic, version, game time (ms)
+#   random: the generator's Mersenne Twister state words and position, whether a gauss value is held, the value
+#   generator: level, level generation period, asteroids generated in the level, destroyed in the level, destroyed in
+#              total, previous generation time, time to the next generation
+#   spacecraft: x, y, horizontal, vertical, rotation, held key mask, automatic fire start time, previous automatic
+#               fire time, game over
+#   counts: destroyed primary asteroids that still have fragments, asteroids, bullets
+#   then the destroyed primaries, the asteroids in generator order, and the bullets in spacecraft order.  Fragments
+#   refer to their primary by its place among the destroyed primaries
+# the order of the asteroids and bullets is kept as collisions are resolved in that order.  Previous positions are not
+# saved, as every update starts by moving the position to the previous position
+_MAGIC = b'SFGS'
+_VERSION = 1
+_HEADER = struct.Struct('<4sHq')
+_RANDOM = struct.Struct('<625IBd')
+_GENERATOR = struct.Struct('<HdIIIqd')
+_SPACE_CRAFT = struct.Struct('<5dBqqB')
+_COUNTS = struct.Struct('<HHH')
+_ASTEROID = struct.Struct('<BHHH5d')  # flags, diameter, primary, fragment count, x, y, horizontal, vertical, direction
+_BULLET = struct.Struct('<5d')  # x, y, horizontal, vertical, direction
+
+_ACTIVE = 0x01
+_FRAGMENT = 0x02
+_RANDOM_VERSION = 3  # of random.Random.getstate()
+
+
+def capture_state(clock: GameClock, space_craft: SpaceCraft, asteroid_generator: AsteroidGenerator,
+                  collision_manager: CollisionManager) -> bytes:
+    # the state of a single player game, from which it continues exactly
+    _, words, gauss_next = asteroid_generator.random.getstate()
+    position = space_craft.position
+    velocity = space_craft.velocity
+    asteroids = asteroid_generator.asteroids
+    bullets = space_craft.bullets
+    # a primary asteroid is destroyed when it fragments, so the primaries of the fragments are never registered
+    primaries = {}
+    for asteroid in asteroids:
+        if isinstance(asteroid, AsteroidFragment) and asteroid.primary_asteroid not in primaries:
+            primaries[asteroid.primary_asteroid] = len(primaries)
+    state = bytearray(_HEADER.pack(_MAGIC, _VERSION, clock.get_ticks()))
+    state += _RANDOM.pack(*words, gauss_next is not None, gauss_next or 0.0)
+    state += _GENERATOR.pack(*asteroid_generator.counters)
+    state += _SPACE_CRAFT.pack(position.x, position.y, velocity.horizontal, velocity.vertical, space_craft.rotation,
+                               *space_craft.controls, collision_manager.game_over)
+    state += _COUNTS.pack(len(primaries), len(asteroids), len(bullets))
+    for primary in primaries:
+        state += _pack_asteroid(primary, 0, 0, primary.fragment_count)
+    for asteroid in asteroids:
+        if isinstance(asteroid, AsteroidFragment):
+            state += _pack_asteroid(asteroid, _FRAGMENT, primaries[asteroid.primary_asteroid], 0)
+        else:
+            state += _pack_asteroid(asteroid, 0, 0, asteroid.fragment_count)
+    for bullet in bullets:
+        state += _BULLET.pack(bullet.position.x, bullet.position.y, bullet.velocity.horizontal,
+                              bullet.velocity.vertical, bullet.direction)
+    return bytes(state)
+
+
+def restore_state(state: bytes, clock: GameClock, space_craft: SpaceCraft, asteroid_generator: AsteroidGenerator,
+                  collision_manager: CollisionManager):
+    # replaces the asteroids and bullets with those of the state.  Released fragments and bullets are reused from
+    # their pools, and every image is shared, so nothing is rasterized.  Raises struct.error or ValueError, with the
+    # game unchanged, when the state is not a whole game state
+    magic, version, ticks = _HEADER.unpack_from(state)
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError(f'not a version {_VERSION} game state')
+    offset = _HEADER.size
+    *words, has_gauss, gauss_next = _RANDOM.unpack_from(state, offset)
+    offset += _RANDOM.size
+    counters = _GENERATOR.unpack_from(state, offset)
+    offset += _GENERATOR.size
+    x, y, horizontal, vertical, rotation, *controls, game_over = _SPACE_CRAFT.unpack_from(state, offset)
+    offset += _SPACE_CRAFT.size
+    primary_count, asteroid_count, bullet_count = _COUNTS.unpack_from(state, offset)
+    offset += _COUNTS.size
+    # checked before anything is changed, so that a truncated state leaves the game as it was
+    if len(state) != offset + ((primary_count + asteroid_count) * _ASTEROID.size) + (bullet_count * _BULLET.size):
+        raise ValueError('the game state is truncated')
+
+    asteroid_generator.random.setstate((_RANDOM_VERSION, tuple(words), gauss_next if has_gauss else None))
+    clock.set_ticks(ticks)
+    asteroid_generator.set_counters(*counters)
+    space_craft.set_motion(x, y, horizontal, vertical, rotation)
+    space_craft.set_controls(*controls)
+    collision_manager.set_game_over(game_over)
+
+    asteroid_generator.clear()
+    primaries = []
+    for _ in range(primary_count):
+        primary = _restore_asteroid(asteroid_generator, state, offset, primaries, False)
+        offset += _ASTEROID.size
+        primaries.append(primary)
+    for _ in range(asteroid_count):
+        _restore_asteroid(asteroid_generator, state, offset, primaries, True)
+        offset += _ASTEROID.size
+    for bullet in list(space_craft.bullets):
+        space_craft.remove_bullet(bullet)
+    for _ in range(bullet_count):
+        x, y, horizontal, vertical, direction = _BULLET.unpack_from(state, offset)
+        offset += _BULLET.size
+        space_craft.restore_bullet(Position(x, y), Velocity(horizontal, vertical), direction)
+
+
+def _pack_asteroid(asteroid: Asteroid, flags: int, primary: int, fragment_count: int) -> bytes:
+    # fragments refer to their primary, primaries count their fragments
+    position = asteroid.position
+    velocity = asteroid.velocity
+    if asteroid.active:
+        flags |= _ACTIVE
+    return _ASTEROID.pack(flags, round(asteroid.radius * 2), primary, fragment_count, position.x, position.y,
+                          velocity.horizontal, velocity.vertical, asteroid.direction)
+
+
+def _restore_asteroid(asteroid_generator: AsteroidGenerator, state: bytes, offset: int,
+                      primaries: list[AsteroidPrimary], registered: bool) -> Asteroid:
+    flags, diameter, primary, fragment_count, x, y, horizontal, vertical, direction = _ASTEROID.unpack_from(state,
+                                                                                                         offset)
+    asteroid = asteroid_generator.restore_asteroid(Position(x, y), Velocity(horizontal, vertical), direction,
+                                                   diameter, flags & _ACTIVE != 0,
+                                                   primaries[primary] if flags & _FRAGMENT else None, registered)
+    if not flags & _FRAGMENT:
+        asteroid.set_fragment_count(fragment_count)
+    return asteroid
+
+
+class _Entry:
+    # a state held in the history buffer
+    __slots__ = ('offset', 'length', 'keyframe', 'since_keyframe', 'held')
+
+    def __init__(self, offset: int, length: int, keyframe: '_Entry | None', since_keyframe: int):
+        self.offset = offset
+        self.length = length  # bytes in the buffer
+        self.keyframe = keyframe  # None for a keyframe
+        self.since_keyframe = since_keyframe  # states
+        self.held = True  # False once dropped
+
+
+class StateHistory:
+    # the recent states of a game, for rewinding.  States are kept in one buffer allocated up front, so the memory is
+    # fixed however long the game, and the oldest states are dropped once the buffer is full or holds max_states.
+    # every KEYFRAME_PERIOD states one is kept whole, as a keyframe, and those between are kept as the compressed xor
+    # of the state with the keyframe.  Little changes between nearby states besides the low bytes of the moving
+    # positions, so the xor is mostly zero bytes and compresses well
+    KEYFRAME_PERIOD = 30  # states
+    DEFAULT_CAPACITY = 4 * 1024 * 1024  # bytes
+    COMPRESSION_LEVEL = 1  # the fastest
+
+    def __init__(self, max_states: int, capacity: int = DEFAULT_CAPACITY):
+        self._max_states = max_states
+        self._buffer = bytearray(capacity)
+        self._entries = collections.deque()  # oldest first.  The oldest is always a keyframe
+        self._head = 0  # offset of the next state in the buffer
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def capacity(self) -> int:
+        return len(self._buffer)
+
+    @property
+    def used(self) -> int:
+        # bytes of the buffer holding states
+        return sum(entry.length for entry in self._entries)
+
+    def clear(self):
+        while self._entries:
+            self._entries.pop().held = False
+        self._head = 0
+
+    def push(self, state: bytes):
+        newest = self._entries[-1] if self._entries else None
+        if newest is not None and newest.since_keyframe < StateHistory.KEYFRAME_PERIOD - 1:
+            keyframe = newest if newest.keyframe is None else newest.keyframe
+            delta = zlib.compress(_xor(state, self._read(keyframe)), StateHistory.COMPRESSION_LEVEL)
+            entry = self._store(delta, keyframe, newest.since_keyframe + 1)
+            if keyframe.held:
+                return
+            # the keyframe was dropped to make room, so the buffer holds less than a keyframe period
+            self._entries.pop().held = False
+            self._head = entry.offset
+        self._store(state, None, 0)
+
+    def pop(self) -> bytes | None:
+        # the newest state, which is removed.  None when the history is empty
+        if not self._entries:
+            return None
+        entry = self._entries.pop()
+        entry.held = False
+        self._head = entry.offset
+        data = self._read(entry)
+        if entry.keyframe is None:
+            return data
+        return _xor(zlib.decompress(data), self._read(entry.keyframe))
+
+    def _read(self, entry: _Entry) -> bytes:
+        return bytes(self._buffer[entry.offset:entry.offset + entry.length])
+
+    def _store(self, data: bytes, keyframe: _Entry | None, since_keyframe: int) -> _Entry:
+        length = len(data)
+        if length > len(self._buffer):
+            raise ValueError(f'a {length} byte state does not fit in a {len(self._buffer)} byte history')
+        entries = self._entries
+        start = self._head
+        if start + length > len(self._buffer):
+            # states are not split across the end of the buffer.  Those after the head are the oldest, and are
+            # dropped with the unused end
+            while entries and entries[0].offset >= start:
+                self._drop_oldest()
+            start = 0
+        end = start + length
+        while entries and entries[0].offset < end and entries[0].offset + entries[0].length > start:
+            self._drop_oldest()
+        while len(entries) >= self._max_states:
+            self._drop_oldest()
+        self._buffer[start:end] = data
+        entry = _Entry(start, length, keyframe, since_keyframe)
+        entries.append(entry)
+        self._head = end
+        return entry
+
+    def _drop_oldest(self):
+        # with the states that are deltas of a dropped keyframe
+        entries = self._entries
+        entries.popleft().held = False
+        while entries and entries[0].keyframe is not None and not entries[0].keyframe.held:
+            entries.popleft().held = False
+
+
+def _xor(data: bytes, keyframe: bytes) -> bytes:
+    # the length of the data.  The keyframe is cut or zero padded to match
+    size = len(data)
+    key = keyframe[:size].ljust(size, b'\0')
+    return (int.from_bytes(data, 'little') ^ int.from_bytes(key, 'little')).to_bytes(size, 'little')
@@ -6,21 +6,83 @@ from .HudData import HudData
 class Hud(pygame.sprite.Sprite):
     BACKGROUND_COLOUR = (185, 185, 185)
     TEXT_COLOUR = (0, 0, 0)
+    FONT_SIZE = 24
+    TEXT_CACHE_SIZE = 256  # rendered strings kept for reuse, e.g. counters cycling through the same values
+    OVERLAY_COLOUR = (255, 255, 0)
+    OVERLAY_POSITION = (10, 10)
 
-    def __init__(self, display_rect: pygame.Rect, draw_group: pygame.sprite.Group, data: HudData):
+    # the hud lives for the whole session.  Each field is only re-rendered when its text changes, and the hud only
+    # needs to be drawn when a field has changed
+    def __init__(self, display_rect: pygame.Rect, font: pygame.font.Font = None):
         super().__init__()
         self.image = pygame.Surface((display_rect.width, display_rect.height))
         self.rect = display_rect
         self.image.fill(Hud.BACKGROUND_COLOUR)
-        self.add(draw_group)
-
-        self._font = pygame.font.Font(None, 24)
-        text = f'Level: {data.level}'
-        self.image.blit(self._font.render(text, True, Hud.TEXT_COLOUR, Hud.BACKGROUND_COLOUR),
-                        (10, 10))
-        text = f'Asteroids: {data.asteroids_generated_in_level} / {data.asteroids_destroyed_in_level} / {data.asteroids_destroyed_total}'
-        self.image.blit(self._font.render(text, True, Hud.TEXT_COLOUR, Hud.BACKGROUND_COLOUR),
-                        (150, 10))
-        self.image.blit(self._font.render(data.message, True, Hud.TEXT_COLOUR, Hud.BACKGROUND_COLOUR),
-                        (350, 10))
 
+        self._font = font if font is not None else pygame.font.Font(None, Hud.FONT_SIZE)
+        self._text_cache = {}  # text -> rendered surface
+        self._fields = {}  # field name -> (text, rect of the rendered text in the hud image)
+        self._dirty = True
+        self._overlay = None  # optional diagnostics sprite drawn over the space, e.g. the frame profiler
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty
+
+    @property
+    def overlay(self) -> pygame.sprite.Sprite | None:
+        return self._overlay
+
+    def update(self, data: HudData):
+        self._update_field('level', f'Level: {data.level}', (10, 10))
+        self._update_field(
+            'asteroids',
+            f'Asteroids: {data.asteroids_generated_in_level} / {data.asteroids_destroyed_in_level} / {data.asteroids_destroyed_total}',
+            (150, 10))
+        self._update_field('message', data.message, (350, 10))
+
+    def draw(self, surface: pygame.Surface) -> pygame.Rect | None:
+        # returns the dirty rect, or None when the content has not changed since it was last drawn
+        if not self._dirty:
+            return None
+        self._dirty = False
+        return surface.blit(self.image, self.rect)
+
+    def take_image(self) -> pygame.Surface | None:
+        # a copy of the image, or None when the content has not changed since it was last drawn or taken, e.g. to
+        # draw on another thread while this one goes on updating the hud
+        if not self._dirty:
+            return None
+        self._dirty = False
+        return self.image.copy()
+
+    def update_overlay(self, lines: list[str]):
+        # the overlay is a sprite so that it is composited with the space sprites and redrawn when they overlap it
+        rendered_lines = [self._font.render(line, True, Hud.OVERLAY_COLOUR) for line in lines]
+        line_height = self._font.get_linesize()
+        image = pygame.Surface((max(line.get_width() for line in rendered_lines), line_height * len(rendered_lines)))
+        for index, line in enumerate(rendered_lines):
+            image.blit(line, (0, index * line_height))
+        if self._overlay is None:
+            self._overlay = pygame.sprite.Sprite()
+        self._overlay.image = image
+        self._overlay.rect = image.get_rect(topleft=Hud.OVERLAY_POSITION)
+
+    def _update_field(self, name: str, text: str, position: tuple[int, int]):
+        field = self._fields.get(name)
+        if field is not None:
+            if field[0] == text:
+                return
+            self.image.fill(Hud.BACKGROUND_COLOUR, field[1])
+        rect = self.image.blit(self._render_text(text), position)
+        self._fields[name] = (text, rect)
+        self._dirty = True
+
+    def _render_text(self, text: str) -> pygame.Surface:
+        rendered = self._text_cache.get(text)
+        if rendered is None:
+            if len(self._text_cache) >= Hud.TEXT_CACHE_SIZE:
+                self._text_cache.clear()
+            rendered = self._font.render(text, True, Hud.TEXT_COLOUR, Hud.BACKGROUND_COLOUR)
+            self._text_cache[text] = rendered
+        return rendered
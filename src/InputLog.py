@@ -0,0 +1,112 @@
+import struct
+
+import pygame
+
+# the keys that SpaceCraft responds to.  A key's index is its bit in the key state mask
+TRACKED_KEYS = (pygame.K_UP, pygame.K_DOWN, pygame.K_LEFT, pygame.K_RIGHT, pygame.K_x)
+_KEY_INDICES = {key: index for index, key in enumerate(TRACKED_KEYS)}
+
+# log layout, little endian:
+#   header: magic, version, seed
+#   frame: delta time (ms), key state mask, event count, then one byte per event: bit 7 set for KEYDOWN,
+#          bits 0-6 the index of the key in TRACKED_KEYS
+_MAGIC = b'SFIL'
+_VERSION = 2
+_HEADER = struct.Struct('<4sHq')
+_FRAME = struct.Struct('<IBB')  # a windowed frame after a stall, e.g. a system suspend, can last over 65s
+_KEYDOWN_FLAG = 0x80
+
+
+def encode_key_events(key_events: list[pygame.event.Event]) -> bytes:
+    # one byte per event on a tracked key, as in the log.  Also used by the network protocol
+    encoded_events = bytearray()
+    for event in key_events:
+        index = _KEY_INDICES.get(event.key)
+        if index is not None:
+            encoded_events.append(index | (_KEYDOWN_FLAG if event.type == pygame.KEYDOWN else 0))
+    return bytes(encoded_events)
+
+
+def decode_key_events(encoded_events: bytes) -> list[pygame.event.Event]:
+    key_events = []
+    for encoded_event in encoded_events:
+        event_type = pygame.KEYDOWN if encoded_event & _KEYDOWN_FLAG else pygame.KEYUP
+        key_events.append(pygame.event.Event(event_type, key=TRACKED_KEYS[encoded_event & ~_KEYDOWN_FLAG]))
+    return key_events
+
+
+class KeyState:
+    # the pressed state of the tracked keys, indexed by key like the result of pygame.key.get_pressed()
+    __slots__ = ('_mask',)
+
+    def __init__(self, mask: int):
+        self._mask = mask
+
+    @staticmethod
+    def from_pressed(key_inputs) -> 'KeyState':
+        mask = 0
+        for index, key in enumerate(TRACKED_KEYS):
+            if key_inputs[key]:
+                mask |= 1 << index
+        return KeyState(mask)
+
+    @staticmethod
+    def from_keys(keys: list[int]) -> 'KeyState':
+        # the state with only the given tracked keys pressed
+        mask = 0
+        for key in keys:
+            mask |= 1 << _KEY_INDICES[key]
+        return KeyState(mask)
+
+    @property
+    def mask(self) -> int:
+        return self._mask
+
+    def __getitem__(self, key: int) -> bool:
+        index = _KEY_INDICES.get(key)
+        return index is not None and (self._mask >> index) & 1 == 1
+
+
+class InputRecorder:
+    # writes everything the simulation consumes per frame, so that the game can be replayed exactly
+    def __init__(self, path: str, seed: int):
+        self._file = open(path, 'wb')
+        self._file.write(_HEADER.pack(_MAGIC, _VERSION, seed))
+        self._frames = 0
+
+    @property
+    def frames(self) -> int:
+        return self._frames
+
+    def record(self, delta_time: int, key_events: list[pygame.event.Event], key_state: KeyState):
+        encoded_events = encode_key_events(key_events)
+        self._file.write(_FRAME.pack(delta_time, key_state.mask, len(encoded_events)))
+        self._file.write(encoded_events)
+        self._frames += 1
+
+    def close(self):
+        self._file.close()
+
+
+class InputReplay:
+    # reads a log written by InputRecorder.  Iterating yields (delta time, key events, key state) per frame
+    def __init__(self, path: str):
+        with open(path, 'rb') as file:
+            self._data = file.read()
+        magic, version, self._seed = _HEADER.unpack_from(self._data)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f'{path} is not a version {_VERSION} input log')
+
+    @property
+    def seed(self) -> int:
+        return self._seed
+
+    def __iter__(self):
+        data = self._data
+        offset = _HEADER.size
+        while offset < len(data):
+            delta_time, mask, event_count = _FRAME.unpack_from(data, offset)
+            offset += _FRAME.size
+            key_events = decode_key_events(data[offset:offset + event_count])
+            offset += event_count
+            yield delta_time, key_events, KeyState(mask)
@@ -0,0 +1,312 @@
+import math
+import os
+import socket
+import struct
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+import pygame
+
+from . import NetworkProtocol as protocol
+from .AssetBundle import AssetBundle
+from .Asteroid import Asteroid
+from .Bot import Bot
+from .Camera import Camera
+from .Compositor import Compositor
+from .GameClock import SimulationClock
+from .Hud import Hud
+from .HudData import HudData
+from .InputLog import KeyState, decode_key_events, encode_key_events
+from .Position import Position
+from .ProjectileGroup import ProjectileGroup
+from .SpaceCraft import SpaceCraft, SpaceCraftSprite
+from .SpaceCraftBullet import SpaceCraftBullet
+from .SpaceFrenzyEngine import SpaceFrenzyEngine
+
+
+@dataclass
+class ClientReport:
+    player: int
+    frames: int
+    snapshots: int  # decoded
+    bytes_sent: int
+    bytes_received: int
+    corrections: int  # snapshots that moved the predicted spacecraft by more than a pixel
+    mean_correction: float  # pixels, over every snapshot
+
+    def lines(self) -> list[str]:
+        return [f'client {self.player}: {self.frames} frames, {self.snapshots} snapshots, '
+                f'{self.bytes_received / 1024:.1f} KiB received, {self.bytes_sent / 1024:.1f} KiB sent, '
+                f'{self.corrections} corrections, mean prediction error {self.mean_correction:.2f} px']
+
+
+class _RemoteSprite(pygame.sprite.Sprite):
+    # an asteroid or bullet as known from the snapshots, drawn where it is extrapolated to be
+    def __init__(self, image: pygame.Surface):
+        super().__init__()
+        self.image = image
+        self.rect = image.get_rect()
+        self.position = Position(0, 0)
+
+
+class NetworkClient:
+    # a player of a network game.  The spacecraft is predicted: the player's input is simulated as soon as it is
+    # read, and sent to the server with the inputs that the server has not yet acknowledged, in case of loss.
+    # each snapshot corrects the spacecraft to the server's state for the newest input the server has simulated,
+    # then the later inputs are simulated again on top.  Everything else is drawn from the snapshots, extrapolated
+    # to the current tick
+    INPUT_REDUNDANCY = 4  # unacknowledged inputs resent with each input
+    CONNECT_ATTEMPTS = 10
+    CONNECT_TIMEOUT = 0.5  # s per attempt
+    CORRECTION_THRESHOLD = 1  # pixels of prediction error counted as a correction
+
+    def __init__(self, main_dir: str, server_address: tuple[str, int], headless: bool = False):
+        self.main_dir = main_dir
+        # resolved once, as replies come from the server's numeric address, e.g. 127.0.0.1 rather than localhost
+        host, port = server_address
+        self._server_name = f'{host}:{port}'
+        self._server_address = socket.getaddrinfo(host, port, socket.AF_INET, socket.SOCK_DGRAM)[0][4]
+        self._headless = headless
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._decoder = protocol.SnapshotDecoder()
+        self._player = 0
+        self._delta_time = 0
+        self._arena_rect = None
+        self._space_rect = None
+        self._display_surface = None
+        self._assets = None
+        self._hud = None
+        self._compositor = None
+        self._camera = None
+        self._draw_group = None
+        self._space_craft = None
+        self._ship_sprites = {}  # player -> sprite of another player's spacecraft
+        self._asteroid_sprites = {}  # entity id -> sprite
+        self._bullet_sprites = {}
+        self._snapshot = None  # newest
+        self._snapshot_frame = 0  # frame on which the newest snapshot arrived
+        self._inputs = []  # (sequence, key state mask, encoded key events) not yet simulated by the server
+        self._sequence = 0
+        self._frames = 0
+        self._snapshots = 0
+        self._bytes_sent = 0
+        self._bytes_received = 0
+        self._corrections = 0
+        self._correction_total = 0.0
+        self._disconnected = False
+
+    @property
+    def asteroids(self) -> list[_RemoteSprite]:
+        # where the asteroids are thought to be, so a Bot can play through the client
+        return list(self._asteroid_sprites.values())
+
+    def run(self, max_frames: int = None, bot: Bot = None) -> ClientReport:
+        # until the window is closed, the server ends the game or max_frames have been played.  The input comes from
+        # the bot when given, otherwise from the keyboard
+        self._connect()
+        self._init_display()
+        clock = SimulationClock(self._delta_time)
+        self._space_craft = SpaceCraft(self.main_dir, self._display_surface, self._arena_rect, self._draw_group,
+                                       ProjectileGroup(), clock, self._assets.spacecraft)
+        next_frame = time.perf_counter()
+        try:
+            while not self._disconnected and (max_frames is None or self._frames < max_frames):
+                delay = next_frame - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                next_frame += self._delta_time / 1000
+                if not self._headless and pygame.event.get(eventtype=pygame.QUIT):
+                    break
+                clock.tick()
+                self._frames += 1
+                if self._space_craft is None:
+                    key_events, key_state = [], KeyState(0)  # destroyed, watching the others play
+                elif bot is not None:
+                    key_events, key_state = bot.control(self._space_craft, self)
+                else:
+                    key_events = pygame.event.get(eventtype=[pygame.KEYUP, pygame.KEYDOWN], pump=False)
+                    key_state = KeyState.from_pressed(pygame.key.get_pressed())
+                self._sequence += 1
+                self._inputs.append((self._sequence, key_state.mask, encode_key_events(key_events)))
+                self._predict(key_events, key_state)
+                self._send(protocol.encode_input(self._decoder.newest_tick,
+                                                 self._inputs[-NetworkClient.INPUT_REDUNDANCY:]))
+                self._receive()
+                self._place_sprites()
+                if not self._headless:
+                    self._draw()
+        finally:
+            if not self._disconnected:
+                self._send(protocol.encode_disconnect())
+            self._socket.close()
+            pygame.quit()
+        return ClientReport(self._player, self._frames, self._snapshots, self._bytes_sent, self._bytes_received,
+                            self._corrections, self._correction_total / self._snapshots if self._snapshots else 0.0)
+
+    def _connect(self):
+        self._socket.settimeout(NetworkClient.CONNECT_TIMEOUT)
+        for _ in range(NetworkClient.CONNECT_ATTEMPTS):
+            self._send(protocol.encode_connect())
+            try:
+                while True:
+                    packet, address = self._socket.recvfrom(65536)
+                    if address == self._server_address and protocol.packet_type(packet) == protocol.WELCOME:
+                        self._player, self._delta_time, arena_size = protocol.decode_welcome(packet)
+                        self._arena_rect = pygame.Rect((0, 0), arena_size)
+                        self._socket.setblocking(False)
+                        return
+            except socket.timeout:
+                continue
+        raise ConnectionError(f'no answer from {self._server_name}')
+
+    def _init_display(self):
+        surface_flags = pygame.SCALED
+        if self._headless:
+            os.environ['SDL_VIDEODRIVER'] = 'dummy'
+            surface_flags = 0
+        pygame.display.init()
+        pygame.font.init()
+        self._space_rect = pygame.Rect(0, 0, SpaceFrenzyEngine.SCREEN_WIDTH, SpaceFrenzyEngine.SPACE_HEIGHT)
+        hud_rect = pygame.Rect(0, SpaceFrenzyEngine.SPACE_HEIGHT, SpaceFrenzyEngine.SCREEN_WIDTH,
+                               SpaceFrenzyEngine.HUD_HEIGHT)
+        self._display_surface = pygame.display.set_mode(size=(self._space_rect.width,
+                                                               self._space_rect.height + hud_rect.height),
+                                                        flags=surface_flags)
+        pygame.display.set_caption(f'Space Frenzy - player {self._player}')
+        self._assets = AssetBundle(self.main_dir)
+        background = pygame.Surface(self._display_surface.get_size())
+        background.fill((0, 0, 0))
+        self._hud = Hud(hud_rect, self._assets.font)
+        self._compositor = Compositor(self._display_surface, background, self._space_rect)
+        if not self._space_rect.contains(self._arena_rect):
+            self._camera = Camera(self._space_rect.size, self._arena_rect)
+        self._draw_group = pygame.sprite.OrderedUpdates()
+
+    def _send(self, packet: bytes):
+        try:
+            self._socket.sendto(packet, self._server_address)
+        except (BlockingIOError, ConnectionError):
+            return  # dropped, as any datagram can be
+        self._bytes_sent += len(packet)
+
+    def _receive(self):
+        snapshot = None
+        while True:
+            try:
+                packet, address = self._socket.recvfrom(65536)
+            except (BlockingIOError, InterruptedError):
+                break
+            except ConnectionResetError:
+                continue  # windows reports an unreachable server on the next receive
+            if address != self._server_address:
+                continue
+            self._bytes_received += len(packet)
+            packet_type = protocol.packet_type(packet)
+            if packet_type == protocol.DISCONNECT:
+                self._disconnected = True
+            elif packet_type == protocol.SNAPSHOT:
+                try:
+                    decoded = self._decoder.decode(packet)
+                except struct.error:
+                    continue  # malformed, e.g. truncated
+                if decoded is not None:
+                    snapshot = decoded
+                    self._snapshots += 1
+        if snapshot is not None:
+            self._snapshot = snapshot
+            self._snapshot_frame = self._frames
+            self._reconcile(snapshot)
+
+    def _predict(self, key_events: list[pygame.event.Event], key_state: KeyState):
+        if self._space_craft is None:
+            return
+        self._space_craft.update(self._delta_time, key_events, key_state)
+        # bullets are drawn from the snapshots
+        for bullet in list(self._space_craft.bullets):
+            self._space_craft.remove_bullet(bullet)
+
+    def _reconcile(self, snapshot: protocol.Snapshot):
+        self._inputs = [pending for pending in self._inputs if pending[0] > snapshot.input_sequence]
+        ships = {ship.player: ship for ship in snapshot.ships}
+        ship = ships.get(self._player)
+        if self._space_craft is not None and ship is not None:
+            if ship.flags & protocol.SHIP_DESTROYED:
+                self._space_craft.remove()
+                self._space_craft = None
+            else:
+                predicted = self._space_craft.position
+                predicted_x, predicted_y = predicted.x, predicted.y
+                self._space_craft.set_motion(protocol.dequantize_position(ship.x),
+                                             protocol.dequantize_position(ship.y),
+                                             protocol.dequantize_velocity(ship.horizontal),
+                                             protocol.dequantize_velocity(ship.vertical),
+                                             protocol.dequantize_rotation(ship.rotation))
+                for _, mask, encoded_events in self._inputs:
+                    self._predict(decode_key_events(encoded_events), KeyState(mask))
+                error = math.hypot(predicted.x - predicted_x, predicted.y - predicted_y)
+                self._correction_total += error
+                if error > NetworkClient.CORRECTION_THRESHOLD:
+                    self._corrections += 1
+
+        # the other players' spacecraft
+        for player in [player for player in self._ship_sprites if player not in ships
+                       or ships[player].flags & protocol.SHIP_DESTROYED]:
+            self._ship_sprites.pop(player).kill()
+        for player, ship in ships.items():
+            if player == self._player or ship.flags & protocol.SHIP_DESTROYED:
+                continue
+            sprite = self._ship_sprites.get(player)
+            if sprite is None:
+                sprite = SpaceCraftSprite(self._assets.spacecraft)
+                sprite.add(self._draw_group)
+                self._ship_sprites[player] = sprite
+            sprite.rotation = protocol.dequantize_rotation(ship.rotation)
+            sprite.set_position(protocol.dequantize_position(ship.x), protocol.dequantize_position(ship.y))
+
+        _sync_sprites(self._asteroid_sprites, snapshot.asteroids, self._draw_group,
+                      lambda entity: Asteroid.get_image(entity[5]))
+        _sync_sprites(self._bullet_sprites, snapshot.bullets, self._draw_group,
+                      lambda entity: SpaceCraftBullet.get_image())
+
+    def _place_sprites(self):
+        # extrapolate from the newest snapshot to the current frame
+        snapshot = self._snapshot
+        if snapshot is None:
+            return
+        tick = snapshot.tick + (self._frames - self._snapshot_frame)
+        for sprites, entities in ((self._asteroid_sprites, snapshot.asteroids),
+                                  (self._bullet_sprites, snapshot.bullets)):
+            for entity_id, sprite in sprites.items():
+                x, y = protocol.extrapolate(entities[entity_id], tick, self._delta_time)
+                sprite.position.x = protocol.dequantize_position(x)
+                sprite.position.y = protocol.dequantize_position(y)
+                sprite.rect.center = (sprite.position.x, sprite.position.y)
+
+    def _draw(self):
+        snapshot = self._snapshot
+        message = f'Player {self._player}' if self._space_craft is not None else 'Destroyed, watching'
+        if snapshot is not None:
+            self._hud.update(HudData(snapshot.level, 0, 0, snapshot.asteroids_destroyed, 0, message))
+        hud_rect = self._hud.draw(self._display_surface)
+        sprites = self._draw_group.sprites()
+        offset = (0, 0)
+        if self._camera is not None:
+            if self._space_craft is not None:
+                self._camera.follow(self._space_craft.position)
+            sprites = self._camera.visible(sprites)
+            offset = self._camera.offset
+        self._compositor.draw(sprites, [hud_rect] if hud_rect is not None else [], offset)
+
+
+def _sync_sprites(sprites: dict[int, _RemoteSprite], entities: dict[int, protocol.Entity],
+                  draw_group: pygame.sprite.Group, image: Callable[[protocol.Entity], pygame.Surface]):
+    # add and remove sprites to match the entities.  image gives the image of a new entity
+    for entity_id in [entity_id for entity_id in sprites if entity_id not in entities]:
+        sprites.pop(entity_id).kill()
+    for entity_id, entity in entities.items():
+        sprite = sprites.get(entity_id)
+        if sprite is None:
+            sprite = _RemoteSprite(image(entity))
+            sprite.add(draw_group)
+            sprites[entity_id] = sprite
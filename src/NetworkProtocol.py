@@ -0,0 +1,273 @@
+import struct
+from dataclasses import dataclass
+
+# datagrams, little endian.  Each starts with its packet type
+#   connect:    type, magic, version
+#   welcome:    type, player, tick delta time (ms), arena width, height
+#   input:      type, tick of the newest snapshot received, sequence of the newest input, input count, then the inputs
+#               newest first: key state mask, event count, then the events encoded as in the input log
+#   snapshot:   type, tick, baseline tick (0 for none), sequence of the player's newest input that has been simulated,
+#               level, asteroids destroyed, ship count, then the ships, then for asteroids and bullets in turn the
+#               changed count and changed entities, then the removed count and removed ids
+#   disconnect: type
+# positions, velocities and rotations are quantized.  Snapshots are delta encoded against the newest snapshot that
+# the client has acknowledged.  Asteroids and bullets move in straight lines between bounces, so an entity is only
+# sent when it is new, its velocity has changed or it has drifted from its position extrapolated from the baseline
+DEFAULT_PORT = 47210
+
+CONNECT = 1
+WELCOME = 2
+INPUT = 3
+SNAPSHOT = 4
+DISCONNECT = 5
+
+_MAGIC = b'SFNP'
+_VERSION = 1
+_TYPE = struct.Struct('<B')
+_CONNECT = struct.Struct('<B4sH')
+_WELCOME = struct.Struct('<BBHHH')
+_INPUT = struct.Struct('<BIIB')
+_INPUT_FRAME = struct.Struct('<BB')
+_SNAPSHOT = struct.Struct('<BIIIBHB')
+_SHIP = struct.Struct('<BBHHhhH')  # player, flags, x, y, horizontal, vertical, rotation
+_ASTEROID = struct.Struct('<IHHhhB')  # id, x, y, horizontal, vertical, diameter
+_BULLET = struct.Struct('<IHHhh')  # id, x, y, horizontal, vertical
+_COUNT = struct.Struct('<H')
+_ID = struct.Struct('<I')
+
+SHIP_DESTROYED = 0x01
+
+POSITION_SCALE = 4  # quanta/pixel
+POSITION_OFFSET = 256  # pixels, entities enter from outside the arena
+# pixels, the widest or tallest arena whose positions can be quantized with the offset on either side
+MAXIMUM_ARENA_SIZE = (0xFFFF // POSITION_SCALE) - (2 * POSITION_OFFSET)
+VELOCITY_SCALE = 8  # quanta/(pixel/s), up to 4095 pixels/s
+ROTATION_SCALE = 65536 / 360  # quanta/degree
+DRIFT_TOLERANCE = 2  # position quanta an entity can drift from its extrapolation before it is sent again
+HISTORY = 64  # snapshots kept for delta encoding, about 1s at 60 ticks/s.  Older acknowledgements get a full snapshot
+
+# entity record, as known by both the server and the client: x, y, horizontal, vertical, tick of the values, diameter
+Entity = tuple[int, int, int, int, int, int]
+
+
+def quantize_position(value: float) -> int:
+    return min(max(round((value + POSITION_OFFSET) * POSITION_SCALE), 0), 0xFFFF)
+
+
+def dequantize_position(value: int) -> float:
+    return (value / POSITION_SCALE) - POSITION_OFFSET
+
+
+def quantize_velocity(value: float) -> int:
+    return min(max(round(value * VELOCITY_SCALE), -0x8000), 0x7FFF)
+
+
+def dequantize_velocity(value: int) -> float:
+    return value / VELOCITY_SCALE
+
+
+def quantize_rotation(value: float) -> int:
+    return round(value * ROTATION_SCALE) & 0xFFFF
+
+
+def dequantize_rotation(value: int) -> float:
+    # +/-180 as used by the spacecraft
+    rotation = value / ROTATION_SCALE
+    return rotation - 360 if rotation > 180 else rotation
+
+
+def extrapolate(entity: Entity, tick: int, delta_time: int) -> tuple[int, int]:
+    # quantized position of the entity at the tick, moving in a straight line.  The vertical velocity is +ve up
+    x, y, horizontal, vertical, entity_tick, _ = entity
+    elapsed = (tick - entity_tick) * delta_time / 1000  # s
+    return (x + round(horizontal * elapsed * POSITION_SCALE / VELOCITY_SCALE),
+            y - round(vertical * elapsed * POSITION_SCALE / VELOCITY_SCALE))
+
+
+def packet_type(packet: bytes) -> int | None:
+    return _TYPE.unpack_from(packet)[0] if packet else None
+
+
+def encode_connect() -> bytes:
+    return _CONNECT.pack(CONNECT, _MAGIC, _VERSION)
+
+
+def is_valid_connect(packet: bytes) -> bool:
+    if len(packet) != _CONNECT.size:
+        return False
+    _, magic, version = _CONNECT.unpack(packet)
+    return magic == _MAGIC and version == _VERSION
+
+
+def encode_welcome(player: int, delta_time: int, arena_size: tuple[int, int]) -> bytes:
+    return _WELCOME.pack(WELCOME, player, delta_time, *arena_size)
+
+
+def decode_welcome(packet: bytes) -> tuple[int, int, tuple[int, int]]:
+    # player, delta time, arena size
+    _, player, delta_time, width, height = _WELCOME.unpack(packet)
+    return player, delta_time, (width, height)
+
+
+def encode_disconnect() -> bytes:
+    return _TYPE.pack(DISCONNECT)
+
+
+def encode_input(ack: int, inputs: list[tuple[int, int, bytes]]) -> bytes:
+    # inputs are (sequence, key state mask, encoded key events), oldest first
+    packet = bytearray(_INPUT.pack(INPUT, ack, inputs[-1][0] if inputs else 0, len(inputs)))
+    for _, mask, encoded_events in reversed(inputs):
+        packet += _INPUT_FRAME.pack(mask, len(encoded_events))
+        packet += encoded_events
+    return bytes(packet)
+
+
+def decode_input(packet: bytes) -> tuple[int, list[tuple[int, int, bytes]]]:
+    # ack, then the inputs (sequence, key state mask, encoded key events) oldest first
+    _, ack, sequence, count = _INPUT.unpack_from(packet)
+    offset = _INPUT.size
+    inputs = []
+    for index in range(count):
+        mask, event_count = _INPUT_FRAME.unpack_from(packet, offset)
+        offset += _INPUT_FRAME.size
+        inputs.append((sequence - index, mask, packet[offset:offset + event_count]))
+        offset += event_count
+    inputs.reverse()
+    return ack, inputs
+
+
+@dataclass
+class Ship:
+    player: int
+    flags: int
+    x: int
+    y: int
+    horizontal: int
+    vertical: int
+    rotation: int
+
+
+@dataclass
+class Snapshot:
+    tick: int
+    input_sequence: int
+    level: int
+    asteroids_destroyed: int
+    ships: list[Ship]
+    asteroids: dict[int, Entity]  # id -> entity
+    bullets: dict[int, Entity]
+
+
+class SnapshotEncoder:
+    # the server side of one client's snapshot stream.  Keeps what the client knows as of each snapshot sent, so
+    # that each snapshot is encoded against the newest one the client has acknowledged
+    def __init__(self, delta_time: int):
+        self._delta_time = delta_time
+        self._sent = {}  # tick -> (asteroids, bullets) as the client knows them
+        self._full_snapshots = 0
+
+    @property
+    def full_snapshots(self) -> int:
+        # snapshots sent without a baseline
+        return self._full_snapshots
+
+    def encode(self, tick: int, ack: int, input_sequence: int, level: int, asteroids_destroyed: int,
+               ships: list[Ship], asteroids: dict[int, Entity], bullets: dict[int, Entity]) -> bytes:
+        # asteroids and bullets are the entities as of this tick, id -> entity
+        baseline = self._sent.get(ack)
+        if baseline is None:
+            ack = 0
+            baseline = ({}, {})
+            self._full_snapshots += 1
+        packet = bytearray(_SNAPSHOT.pack(SNAPSHOT, tick, ack, input_sequence, min(level, 0xFF),
+                                          min(asteroids_destroyed, 0xFFFF), len(ships)))
+        for ship in ships:
+            packet += _SHIP.pack(ship.player, ship.flags, ship.x, ship.y, ship.horizontal, ship.vertical,
+                                 ship.rotation)
+        known_asteroids = self._encode_entities(packet, tick, asteroids, baseline[0], _ASTEROID)
+        known_bullets = self._encode_entities(packet, tick, bullets, baseline[1], _BULLET)
+        self._sent[tick] = (known_asteroids, known_bullets)
+        self._sent.pop(tick - HISTORY, None)
+        return bytes(packet)
+
+    def _encode_entities(self, packet: bytearray, tick: int, entities: dict[int, Entity], baseline: dict[int, Entity],
+                         entity_struct: struct.Struct) -> dict[int, Entity]:
+        known = {}
+        changed = []
+        for entity_id, entity in entities.items():
+            base = baseline.get(entity_id)
+            if base is not None and base[2:4] == entity[2:4] and base[5] == entity[5]:
+                x, y = extrapolate(base, tick, self._delta_time)
+                if abs(x - entity[0]) <= DRIFT_TOLERANCE and abs(y - entity[1]) <= DRIFT_TOLERANCE:
+                    known[entity_id] = base
+                    continue
+            known[entity_id] = entity
+            changed.append((entity_id, entity))
+        packet += _COUNT.pack(len(changed))
+        for entity_id, (x, y, horizontal, vertical, _, diameter) in changed:
+            if entity_struct is _ASTEROID:
+                packet += _ASTEROID.pack(entity_id, x, y, horizontal, vertical, diameter)
+            else:
+                packet += _BULLET.pack(entity_id, x, y, horizontal, vertical)
+        removed = [entity_id for entity_id in baseline if entity_id not in entities]
+        packet += _COUNT.pack(len(removed))
+        for entity_id in removed:
+            packet += _ID.pack(entity_id)
+        return known
+
+
+class SnapshotDecoder:
+    # the client side.  Keeps the state decoded from recent snapshots as the baselines of later ones
+    def __init__(self):
+        self._received = {}  # tick -> (asteroids, bullets)
+        self._newest_tick = 0
+
+    @property
+    def newest_tick(self) -> int:
+        # of the newest snapshot decoded, which is acknowledged to the server
+        return self._newest_tick
+
+    def decode(self, packet: bytes) -> Snapshot | None:
+        # None when the snapshot is older than the newest, or its baseline is no longer known
+        _, tick, baseline_tick, input_sequence, level, asteroids_destroyed, ship_count = _SNAPSHOT.unpack_from(packet)
+        if tick <= self._newest_tick:
+            return None
+        if baseline_tick == 0:
+            baseline = ({}, {})
+        else:
+            baseline = self._received.get(baseline_tick)
+            if baseline is None:
+                return None
+        offset = _SNAPSHOT.size
+        ships = []
+        for _ in range(ship_count):
+            ships.append(Ship(*_SHIP.unpack_from(packet, offset)))
+            offset += _SHIP.size
+        asteroids, offset = _decode_entities(packet, offset, tick, baseline[0], _ASTEROID)
+        bullets, offset = _decode_entities(packet, offset, tick, baseline[1], _BULLET)
+        self._received[tick] = (asteroids, bullets)
+        for old_tick in [old_tick for old_tick in self._received if old_tick <= tick - HISTORY]:
+            del self._received[old_tick]
+        self._newest_tick = tick
+        return Snapshot(tick, input_sequence, level, asteroids_destroyed, ships, asteroids, bullets)
+
+
+def _decode_entities(packet: bytes, offset: int, tick: int, baseline: dict[int, Entity],
+                     entity_struct: struct.Struct) -> tuple[dict[int, Entity], int]:
+    entities = dict(baseline)
+    count, = _COUNT.unpack_from(packet, offset)
+    offset += _COUNT.size
+    for _ in range(count):
+        if entity_struct is _ASTEROID:
+            entity_id, x, y, horizontal, vertical, diameter = _ASTEROID.unpack_from(packet, offset)
+        else:
+            entity_id, x, y, horizontal, vertical = _BULLET.unpack_from(packet, offset)
+            diameter = 0
+        offset += entity_struct.size
+        entities[entity_id] = (x, y, horizontal, vertical, tick, diameter)
+    count, = _COUNT.unpack_from(packet, offset)
+    offset += _COUNT.size
+    for _ in range(count):
+        entities.pop(_ID.unpack_from(packet, offset)[0], None)
+        offset += _ID.size
+    return entities, offset
@@ -0,0 +1,311 @@
+import os
+import random
+import socket
+import struct
+import time
+from array import array
+from dataclasses import dataclass, field
+
+import pygame
+
+from . import NetworkProtocol as protocol
+from .AsteroidGenerator import AsteroidGenerator
+from .CollisionManager import CollisionManager
+from .GameClock import SimulationClock
+from .InputLog import KeyState, decode_key_events
+from .Position import Position
+from .ProjectileGroup import ProjectileGroup
+from .NetworkProtocol import DEFAULT_PORT
+from .SpaceCraft import SpaceCraft
+from .SpaceFrenzyEngine import SpaceFrenzyEngine
+from .Velocity import Velocity
+
+
+@dataclass
+class _Player:
+    number: int
+    address: tuple[str, int]
+    space_craft: SpaceCraft | None
+    encoder: protocol.SnapshotEncoder
+    inputs: list[tuple[int, int, bytes]] = field(default_factory=list)  # received, not yet simulated, oldest first
+    received_sequence: int = 0  # newest input received
+    simulated_sequence: int = 0  # newest input simulated
+    key_state: KeyState = field(default_factory=lambda: KeyState(0))  # held until the next input arrives
+    ack: int = 0  # newest snapshot acknowledged
+    last_heard: float = 0  # perf_counter time
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    snapshots: int = 0
+
+
+@dataclass
+class PlayerReport:
+    player: int
+    snapshots: int
+    full_snapshots: int
+    bytes_sent: int
+    bytes_received: int
+    sent_rate: float  # bytes/s of game time
+    mean_snapshot: float  # bytes
+
+
+@dataclass
+class ServerReport:
+    ticks: int
+    tick_p50: float  # ms of wall time
+    tick_p99: float
+    tick_max: float
+    encode_mean: float  # ms per tick spent encoding and sending snapshots
+    players: list[PlayerReport]
+
+    def lines(self) -> list[str]:
+        lines = [f'ticks: {self.ticks}  tick p50 {self.tick_p50:.3f} ms  p99 {self.tick_p99:.3f} ms  '
+                 f'max {self.tick_max:.3f} ms  encoding {self.encode_mean:.3f} ms/tick']
+        for player in self.players:
+            lines.append(f'player {player.player}: {player.snapshots} snapshots ({player.full_snapshots} full), '
+                         f'mean {player.mean_snapshot:.0f} bytes, {player.sent_rate / 1024:.1f} KiB/s sent, '
+                         f'{player.bytes_received} bytes received')
+        return lines
+
+
+class NetworkServer:
+    # authoritative headless game shared by the players of network clients.  Each tick the server simulates the next
+    # input of every player, then sends every player a snapshot delta encoded against the newest snapshot the player
+    # has acknowledged.  Players join and leave at any time.  A destroyed player's spacecraft is removed and the
+    # player watches on.  Ticks are paced to the delta time in wall time
+    MAXIMUM_PLAYERS = 8
+    CLIENT_TIMEOUT = 5  # s without a packet from a client before the player is dropped
+    SPAWN_SPACING = 60  # pixels between the starting positions of the players
+    INPUT_BUFFER = 3  # inputs queued beyond this are simulated in the same tick to catch up with the client
+
+    def __init__(self, main_dir: str, port: int = DEFAULT_PORT, host: str = '', seed: int = None,
+                 delta_time: int = 16,
+                 arena_size: tuple[int, int] = (SpaceFrenzyEngine.SCREEN_WIDTH, SpaceFrenzyEngine.SPACE_HEIGHT)):
+        self.main_dir = main_dir
+        self._delta_time = delta_time
+        if max(arena_size) > protocol.MAXIMUM_ARENA_SIZE:
+            raise ValueError(f'a network arena is at most {protocol.MAXIMUM_ARENA_SIZE} pixels wide and high')
+        self._arena_rect = pygame.Rect((0, 0), arena_size)
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.bind((host, port))
+        self._socket.setblocking(False)
+        self._seed = seed if seed is not None else random.randrange(2 ** 63)
+        self._players = {}  # address -> player
+        self._reports = []  # of players that have left
+        self._tick = 0
+        self._tick_costs = array('q')  # ns
+        self._encode_cost = 0  # ns
+        self._display_surface = None
+        self._clock = None
+        self._draw_group = None
+        self._update_group = None
+        self._asteroid_generator = None
+        self._collision_manager = None
+        self._asteroid_ids = {}  # asteroid handle -> entity id
+        self._bullet_ids = {}  # (player, bullet handle) -> entity id
+        self._next_id = 1
+
+    @property
+    def port(self) -> int:
+        # the bound port, e.g. when bound to port 0 for any free port
+        return self._socket.getsockname()[1]
+
+    def run(self, max_ticks: int = None) -> ServerReport:
+        # until max_ticks have been simulated, or once every player has left
+        os.environ['SDL_VIDEODRIVER'] = 'dummy'
+        pygame.display.init()
+        # images are converted to the display format when loaded, even though nothing is drawn
+        self._display_surface = pygame.display.set_mode((1, 1))
+        self._clock = SimulationClock(self._delta_time)
+        self._draw_group = pygame.sprite.Group()
+        self._update_group = ProjectileGroup()
+        self._asteroid_generator = AsteroidGenerator(self._display_surface, self._arena_rect, self._draw_group,
+                                                     self._update_group, self._clock, random.Random(self._seed))
+        joined = False
+        next_tick = time.perf_counter()
+        try:
+            while max_ticks is None or self._tick < max_ticks:
+                delay = next_tick - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                next_tick += self._delta_time / 1000
+                self._receive()
+                if not self._players:
+                    if joined:
+                        break
+                    continue
+                joined = True
+                start = time.perf_counter_ns()
+                self._step()
+                encode_start = time.perf_counter_ns()
+                self._send_snapshots()
+                end = time.perf_counter_ns()
+                self._encode_cost += end - encode_start
+                self._tick_costs.append(end - start)
+        finally:
+            for player in list(self._players.values()):
+                self._socket.sendto(protocol.encode_disconnect(), player.address)
+                self._remove_player(player)
+            self._socket.close()
+            pygame.quit()
+        return self._report()
+
+    def _receive(self):
+        now = time.perf_counter()
+        while True:
+            try:
+                packet, address = self._socket.recvfrom(65536)
+            except (BlockingIOError, InterruptedError):
+                break
+            except ConnectionResetError:
+                continue  # windows reports an unreachable client on the next receive
+            player = self._players.get(address)
+            packet_type = protocol.packet_type(packet)
+            try:
+                if packet_type == protocol.CONNECT and protocol.is_valid_connect(packet):
+                    if player is None:
+                        player = self._add_player(address)
+                    if player is not None:
+                        self._socket.sendto(protocol.encode_welcome(player.number, self._delta_time,
+                                                                    self._arena_rect.size), address)
+                elif player is not None and packet_type == protocol.INPUT:
+                    ack, inputs = protocol.decode_input(packet)
+                    player.ack = max(player.ack, ack)
+                    # inputs are resent until simulated, so only keep the new ones
+                    for received_input in inputs:
+                        if received_input[0] > player.received_sequence:
+                            player.inputs.append(received_input)
+                            player.received_sequence = received_input[0]
+                elif player is not None and packet_type == protocol.DISCONNECT:
+                    self._remove_player(player)
+                    continue
+            except struct.error:
+                continue  # malformed, e.g. truncated, packets are dropped
+            if player is not None:
+                player.last_heard = now
+                player.bytes_received += len(packet)
+        for player in [player for player in self._players.values()
+                       if now - player.last_heard > NetworkServer.CLIENT_TIMEOUT]:
+            self._remove_player(player)
+
+    def _add_player(self, address: tuple[str, int]) -> _Player | None:
+        numbers = {player.number for player in self._players.values()}
+        free = [number for number in range(1, NetworkServer.MAXIMUM_PLAYERS + 1) if number not in numbers]
+        if not free:
+            return None
+        space_craft = SpaceCraft(self.main_dir, self._display_surface, self._arena_rect, self._draw_group,
+                                 self._update_group, self._clock)
+        # spread the players either side of the center
+        offset = (free[0] // 2) * NetworkServer.SPAWN_SPACING * (1 if free[0] % 2 == 0 else -1)
+        space_craft.set_position(self._arena_rect.centerx + offset, self._arena_rect.centery)
+        if self._collision_manager is None:
+            self._collision_manager = CollisionManager(space_craft, self._asteroid_generator, self._arena_rect)
+        else:
+            self._collision_manager.add_space_craft(space_craft)
+        player = _Player(free[0], address, space_craft, protocol.SnapshotEncoder(self._delta_time))
+        self._players[address] = player
+        return player
+
+    def _remove_player(self, player: _Player):
+        del self._players[player.address]
+        self._remove_space_craft(player)
+        self._reports.append(self._player_report(player))
+
+    def _remove_space_craft(self, player: _Player):
+        if player.space_craft is not None:
+            self._collision_manager.remove_space_craft(player.space_craft)
+            player.space_craft.remove()
+            player.space_craft = None
+
+    def _step(self):
+        # same order as the engine's game update, with every player's input first
+        self._clock.tick()
+        self._tick += 1
+        for player in self._players.values():
+            # without a new input the keys are held as they were
+            for _ in range(max(1, len(player.inputs) - NetworkServer.INPUT_BUFFER)):
+                key_events = []
+                if player.inputs:
+                    sequence, mask, encoded_events = player.inputs.pop(0)
+                    player.simulated_sequence = sequence
+                    player.key_state = KeyState(mask)
+                    key_events = decode_key_events(encoded_events)
+                if player.space_craft is not None:
+                    player.space_craft.update(self._delta_time, key_events, player.key_state)
+        self._asteroid_generator.update()
+        self._update_group.update(self._delta_time)
+        self._collision_manager.update()
+        for player in self._players.values():
+            if player.space_craft in self._collision_manager.destroyed:
+                self._remove_space_craft(player)
+
+    def _send_snapshots(self):
+        tick = self._tick
+        asteroid_ids = {}
+        asteroids = {}
+        for asteroid in self._asteroid_generator.asteroids:
+            entity_id = self._asteroid_ids.get(asteroid.handle) or self._new_id()
+            asteroid_ids[asteroid.handle] = entity_id
+            asteroids[entity_id] = _entity(asteroid.position, asteroid.velocity, tick, int(asteroid.radius * 2))
+        self._asteroid_ids = asteroid_ids
+
+        ships = []
+        bullet_ids = {}
+        bullets = {}
+        for player in self._players.values():
+            space_craft = player.space_craft
+            if space_craft is None:
+                ships.append(protocol.Ship(player.number, protocol.SHIP_DESTROYED, 0, 0, 0, 0, 0))
+                continue
+            position = space_craft.position
+            velocity = space_craft.velocity
+            ships.append(protocol.Ship(player.number, 0, protocol.quantize_position(position.x),
+                                       protocol.quantize_position(position.y),
+                                       protocol.quantize_velocity(velocity.horizontal),
+                                       protocol.quantize_velocity(velocity.vertical),
+                                       protocol.quantize_rotation(space_craft.rotation)))
+            for bullet in space_craft.bullets:
+                key = (player.number, bullet.handle)
+                entity_id = self._bullet_ids.get(key) or self._new_id()
+                bullet_ids[key] = entity_id
+                bullets[entity_id] = _entity(bullet.position, bullet.velocity, tick, 0)
+        self._bullet_ids = bullet_ids
+
+        for player in self._players.values():
+            packet = player.encoder.encode(tick, player.ack, player.simulated_sequence, self._asteroid_generator.level,
+                                           self._asteroid_generator.asteroids_destroyed_total_count, ships, asteroids,
+                                           bullets)
+            try:
+                self._socket.sendto(packet, player.address)
+            except (BlockingIOError, ConnectionError):
+                continue  # dropped, as any datagram can be
+            player.bytes_sent += len(packet)
+            player.snapshots += 1
+
+    def _new_id(self) -> int:
+        entity_id = self._next_id
+        self._next_id = (self._next_id % 0xFFFFFFFF) + 1  # 0 is never used
+        return entity_id
+
+    def _player_report(self, player: _Player) -> PlayerReport:
+        seconds = (player.snapshots * self._delta_time) / 1000
+        return PlayerReport(player.number, player.snapshots, player.encoder.full_snapshots, player.bytes_sent,
+                            player.bytes_received, player.bytes_sent / seconds if seconds else 0.0,
+                            player.bytes_sent / player.snapshots if player.snapshots else 0.0)
+
+    def _report(self) -> ServerReport:
+        costs = sorted(self._tick_costs)
+        ticks = len(costs)
+
+        def percentile(value: int) -> float:
+            return costs[round((value / 100) * (ticks - 1))] / 1e6 if ticks else 0.0
+
+        return ServerReport(self._tick, percentile(50), percentile(99), costs[-1] / 1e6 if ticks else 0.0,
+                            (self._encode_cost / ticks) / 1e6 if ticks else 0.0,
+                            sorted(self._reports, key=lambda report: report.player))
+
+
+def _entity(position: Position, velocity: Velocity, tick: int, diameter: int) -> protocol.Entity:
+    return (protocol.quantize_position(position.x), protocol.quantize_position(position.y),
+            protocol.quantize_velocity(velocity.horizontal), protocol.quantize_velocity(velocity.vertical), tick,
+            diameter)
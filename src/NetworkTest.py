@@ -0,0 +1,51 @@
+import multiprocessing
+import queue
+
+from .Bot import Bot
+from .NetworkClient import ClientReport, NetworkClient
+from .NetworkServer import NetworkServer, ServerReport
+from .SpaceFrenzyEngine import SpaceFrenzyEngine
+
+
+def run_server(main_dir: str, seed: int, arena_size: tuple[int, int], ports: multiprocessing.Queue,
+               reports: multiprocessing.Queue):
+    server = NetworkServer(main_dir, port=0, host='127.0.0.1', seed=seed, arena_size=arena_size)
+    ports.put(server.port)
+    reports.put(server.run())
+
+
+def run_client(main_dir: str, port: int, frames: int, reports: multiprocessing.Queue):
+    reports.put(NetworkClient(main_dir, ('127.0.0.1', port), headless=True).run(frames, Bot()))
+
+
+def _get(reports: multiprocessing.Queue, processes: list[multiprocessing.Process]):
+    # the next report, or an error when the processes that put the reports have all ended without one, e.g. on an
+    # exception
+    while True:
+        try:
+            return reports.get(timeout=1)
+        except queue.Empty:
+            if not any(process.is_alive() for process in processes):
+                raise RuntimeError('a network test process ended without a report')
+
+
+def run_network_test(main_dir: str, clients: int, frames: int, seed: int = None,
+                     arena_size: tuple[int, int] = (SpaceFrenzyEngine.SCREEN_WIDTH, SpaceFrenzyEngine.SPACE_HEIGHT)
+                     ) -> tuple[ServerReport, list[ClientReport]]:
+    # a server and bot driven headless clients, each in its own process, on localhost.  The server ends the game
+    # once every client has played its frames and left
+    ports = multiprocessing.Queue()
+    server_reports = multiprocessing.Queue()
+    client_reports = multiprocessing.Queue()
+    server = multiprocessing.Process(target=run_server, args=(main_dir, seed, arena_size, ports, server_reports))
+    server.start()
+    port = _get(ports, [server])
+    players = [multiprocessing.Process(target=run_client, args=(main_dir, port, frames, client_reports))
+               for _ in range(clients)]
+    for player in players:
+        player.start()
+    results = sorted((_get(client_reports, players) for _ in players), key=lambda report: report.player)
+    server_report = _get(server_reports, [server])
+    for process in (*players, server):
+        process.join()
+    return server_report, results
@@ -0,0 +1,54 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class PoolStats:
+    created: int  # instances constructed by the pool
+    hits: int  # acquires served by a released instance
+    misses: int  # acquires that had to construct a new instance
+    in_use: int
+    peak_in_use: int
+    free: int
+
+    @property
+    def hit_rate(self) -> float:
+        acquired = self.hits + self.misses
+        return self.hits / acquired if acquired > 0 else 0.0
+
+
+class ObjectPool:
+    # reusable instances of a class.  acquire takes the constructor arguments and either resets a released instance
+    # with them, using its reset method, or constructs a new instance.  At most max_size released instances are kept
+    def __init__(self, cls: type, max_size: int):
+        self._cls = cls
+        self._max_size = max_size
+        self._free = []
+        self._created = 0
+        self._hits = 0
+        self._misses = 0
+        self._in_use = 0
+        self._peak_in_use = 0
+
+    @property
+    def stats(self) -> PoolStats:
+        return PoolStats(self._created, self._hits, self._misses, self._in_use, self._peak_in_use, len(self._free))
+
+    def acquire(self, *args):
+        if self._free:
+            instance = self._free.pop()
+            instance.reset(*args)
+            self._hits += 1
+        else:
+            instance = self._cls(*args)
+            self._created += 1
+            self._misses += 1
+        self._in_use += 1
+        if self._in_use > self._peak_in_use:
+            self._peak_in_use = self._in_use
+        return instance
+
+    def release(self, instance):
+        # the caller must drop every other reference to the instance, e.g. kill() a sprite, before releasing it
+        self._in_use -= 1
+        if len(self._free) < self._max_size:
+            self._free.append(instance)
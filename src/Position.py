@@ -0,0 +1,13 @@
+class Position:
+    # screen position of a sprite's center, in pixels.  Mutable, and small as it is held by every moving sprite
+    __slots__ = ('x', 'y')
+
+    def __init__(self, x: float, y: float):
+        self.x = x
+        self.y = y
+
+    def __repr__(self) -> str:
+        return f'Position({self.x}, {self.y})'
+
+    def copy(self) -> 'Position':
+        return Position(self.x, self.y)
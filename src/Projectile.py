@@ -1,20 +1,63 @@
 import pygame
 
+from .Position import Position
+from .ProjectileGroup import ProjectileGroup
+from .Velocity import Velocity
+
 
 class Projectile(pygame.sprite.Sprite):
-    def __init__(self, position: dict[str, float], velocity: dict[str, float], direction: float):
+    def __init__(self, position: Position, velocity: Velocity, direction: float):
         super().__init__()
-        self._position = position
-        self._velocity = velocity
-        self._direction = direction
+        self._set_motion(position, velocity, direction)
         self.rect = pygame.Rect(0, 0, 0, 0)  # dummy Rect.  Must be overridden
 
     @property
-    def position(self) -> dict[str, float]:
+    def position(self) -> Position:
         return self._position
 
+    @property
+    def previous_position(self) -> tuple[float, float]:
+        # the position before the last update, x, y
+        return self._previous_position
+
+    @previous_position.setter
+    def previous_position(self, value: tuple[float, float]):
+        self._previous_position = value
+
+    @property
+    def velocity(self) -> Velocity:
+        return self._velocity
+
+    @property
+    def direction(self) -> float:
+        return self._direction
+
+    def set_velocity(self, horizontal: float, vertical: float):
+        self._velocity.horizontal = horizontal
+        self._velocity.vertical = vertical
+        # groups that hold their own copy of the velocity, i.e. VectorPhysicsGroup
+        for group in self.groups():
+            if isinstance(group, ProjectileGroup):
+                group.set_velocity(self, horizontal, vertical)
+
     def update(self, delta_time: int):
-        self._position['x'] += self._velocity['horizontal'] * (delta_time / 1000)
-        self._position['y'] += -self._velocity['vertical'] * (delta_time / 1000)
-        self.rect.centerx = self._position['x']
-        self.rect.centery = self._position['y']
+        position = self._position
+        velocity = self._velocity
+        self._previous_position = (position.x, position.y)
+        position.x += velocity.horizontal * (delta_time / 1000)
+        position.y += -velocity.vertical * (delta_time / 1000)
+        self.rect.centerx = position.x
+        self.rect.centery = position.y
+
+    def interpolate(self, alpha: float):
+        # draw between the previous and current physics step.  The rect is reset from the position on update
+        previous_x, previous_y = self._previous_position
+        self.rect.centerx = previous_x + ((self._position.x - previous_x) * alpha)
+        self.rect.centery = previous_y + ((self._position.y - previous_y) * alpha)
+
+    def _set_motion(self, position: Position, velocity: Velocity, direction: float):
+        # also used to reset pooled instances
+        self._position = position
+        self._velocity = velocity
+        self._direction = direction
+        self._previous_position = (position.x, position.y)
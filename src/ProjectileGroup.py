@@ -0,0 +1,55 @@
+import pygame
+
+
+class ProjectileGroup(pygame.sprite.Group):
+    # the update group.  Projectiles are updated per sprite, and can be drawn between physics steps.
+    # with a focus rect, e.g. around the camera view of a large arena, projectiles outside it are updated once every
+    # FAR_UPDATE_PERIOD updates with the time since their last update.  Far projectiles are spread across the updates
+    # so that each update does a similar amount of work
+    FAR_UPDATE_PERIOD = 4  # updates
+
+    def __init__(self, *sprites: pygame.sprite.Sprite):
+        self._focus_rect = None
+        self._updates = 0
+        self._next_phase = 0
+        self._phases = {}  # sprite -> update on which it is updated when far, modulo the period
+        self._pending_time = {}  # sprite -> ms since it was last updated
+        super().__init__(*sprites)
+
+    def set_focus(self, rect: pygame.Rect | None):
+        # None updates every projectile every time
+        self._focus_rect = rect
+
+    def set_velocity(self, sprite: pygame.sprite.Sprite, horizontal: float, vertical: float):
+        # the sprite holds its own velocity
+        pass
+
+    def add_internal(self, sprite: pygame.sprite.Sprite, layer=None):
+        super().add_internal(sprite, layer)
+        self._phases[sprite] = self._next_phase
+        self._next_phase = (self._next_phase + 1) % ProjectileGroup.FAR_UPDATE_PERIOD
+
+    def remove_internal(self, sprite: pygame.sprite.Sprite):
+        super().remove_internal(sprite)
+        del self._phases[sprite]
+        self._pending_time.pop(sprite, None)
+
+    def update(self, delta_time: int):
+        focus_rect = self._focus_rect
+        if focus_rect is None:
+            super().update(delta_time)
+            return
+        phase = self._updates % ProjectileGroup.FAR_UPDATE_PERIOD
+        self._updates += 1
+        phases = self._phases
+        pending_time = self._pending_time
+        for sprite in self.sprites():
+            if phases[sprite] == phase or focus_rect.colliderect(sprite.rect):
+                sprite.update(pending_time.pop(sprite, 0) + delta_time)
+            else:
+                pending_time[sprite] = pending_time.get(sprite, 0) + delta_time
+
+    def interpolate(self, alpha: float):
+        # alpha is the fraction of a physics step elapsed since the last step
+        for sprite in self.sprites():
+            sprite.interpolate(alpha)
@@ -0,0 +1,161 @@
+import threading
+from dataclasses import dataclass, replace
+from typing import Callable
+
+import pygame
+
+from .Compositor import Compositor
+from .InputLog import KeyState
+
+
+@dataclass(frozen=True)
+class RenderList:
+    # everything drawn in a frame.  Built by the simulation thread and never changed once published, so the render
+    # thread reads it without a lock.  Sprites are (key, image id, x, y) in drawing order: the key identifies the
+    # sprite from one frame to the next, the image id is its index in the image table, and x, y is the top left in
+    # screen coordinates
+    sprites: tuple[tuple[int, int, int, int], ...]
+    overlays: tuple[tuple[pygame.Surface, tuple[int, int]], ...]  # image and top left, drawn over the sprites
+    hud_image: pygame.Surface | None  # a copy of the hud when it has changed, otherwise None
+
+
+class ImageTable:
+    # ids of the shared sprite images, i.e. the rotated spacecraft, the asteroid of each diameter and the bullet.
+    # images are only ever added, so an id in a published render list always refers to the same image.  Ids are
+    # only added by the simulation thread
+    def __init__(self):
+        self._ids = {}  # image -> id
+        self._images = []  # id -> image
+        self._sizes = []  # id -> size of the image
+
+    def __len__(self) -> int:
+        return len(self._images)
+
+    def id(self, image: pygame.Surface) -> int:
+        image_id = self._ids.get(image)
+        if image_id is None:
+            image_id = len(self._images)
+            # the image is in the lists before its id is published
+            self._images.append(image)
+            self._sizes.append(image.get_size())
+            self._ids[image] = image_id
+        return image_id
+
+    def image(self, image_id: int) -> pygame.Surface:
+        return self._images[image_id]
+
+    def size(self, image_id: int) -> tuple[int, int]:
+        return self._sizes[image_id]
+
+
+class RenderPipeline:
+    # simulates each frame on a worker thread while the main thread draws the frame before.  The main thread renders
+    # as pygame handles events and presents the display on the thread that opened the window.
+    # the render list being drawn and the one being built are the two buffers, swapped by publishing.
+    # neither thread waits on the other: input submitted before the worker takes it is merged into one frame, with
+    # the delta times summed, and a render list replaced before it is drawn is dropped.  On a multi-core machine the
+    # drawing is hidden behind the simulation wherever pygame releases the GIL in SDL, e.g. presenting the display
+    def __init__(self, surface: pygame.Surface, compositor: Compositor, hud_rect: pygame.Rect,
+                 simulate: Callable[[int, list[pygame.event.Event], KeyState, bool], None]):
+        # simulate is called on the worker with the delta time, key events, key state and whether to rewind.  It
+        # publishes the frame's render list
+        self._surface = surface
+        self._compositor = compositor
+        self._hud_rect = hud_rect
+        self._simulate = simulate
+        self._images = ImageTable()
+        self._condition = threading.Condition()
+        self._input = None  # (delta time, key events, key state, rewind) not yet taken by the worker
+        self._stopping = False
+        self._published = None  # newest render list not yet drawn
+        self._published_lock = threading.Lock()
+        self._error = None  # raised by the simulation, raised again on the main thread
+        self._thread = None
+        self._frames_simulated = 0
+        self._frames_drawn = 0
+
+    @property
+    def images(self) -> ImageTable:
+        return self._images
+
+    @property
+    def active(self) -> bool:
+        # the worker is running, so frames are published rather than drawn
+        return self._thread is not None
+
+    @property
+    def frames_simulated(self) -> int:
+        return self._frames_simulated
+
+    @property
+    def frames_drawn(self) -> int:
+        return self._frames_drawn
+
+    def start(self):
+        self._input = None
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name='simulation', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        # once the frame being simulated is done.  Input not yet taken is dropped
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        self._thread.join()
+        self._thread = None
+
+    def submit(self, delta_time: int, key_events: list[pygame.event.Event], key_state: KeyState, rewind: bool):
+        with self._condition:
+            if self._input is None:
+                self._input = (delta_time, list(key_events), key_state, rewind)
+            else:
+                # the worker is behind, so the frames are simulated as one.  The newest key state wins
+                pending_delta_time, pending_key_events, _, _ = self._input
+                self._input = (pending_delta_time + delta_time, pending_key_events + key_events, key_state, rewind)
+            self._condition.notify()
+
+    def publish(self, render_list: RenderList):
+        # called by the simulation
+        with self._published_lock:
+            dropped = self._published
+            if dropped is not None and dropped.hud_image is not None and render_list.hud_image is None:
+                # the hud is only copied when it changes, so keep the change
+                render_list = replace(render_list, hud_image=dropped.hud_image)
+            self._published = render_list
+
+    def draw(self) -> bool:
+        # draw the newest render list, if one has been published since the last draw.  An error raised by the
+        # simulation is raised here
+        with self._published_lock:
+            render_list, self._published = self._published, None
+        if self._error is not None:
+            raise self._error
+        if render_list is None:
+            return False
+        dirty_rects = []
+        if render_list.hud_image is not None:
+            dirty_rects.append(self._surface.blit(render_list.hud_image, self._hud_rect))
+        images = self._images
+        placed = [(key, images.image(image_id), pygame.Rect((x, y), images.size(image_id)))
+                  for key, image_id, x, y in render_list.sprites]
+        placed.extend((image, image, pygame.Rect(position, image.get_size()))
+                      for image, position in render_list.overlays)
+        self._compositor.draw_placed(placed, dirty_rects)
+        self._frames_drawn += 1
+        return True
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._input is None and not self._stopping:
+                    self._condition.wait()
+                if self._stopping:
+                    return
+                frame_input, self._input = self._input, None
+            try:
+                self._simulate(*frame_input)
+            except Exception as error:
+                self._error = error
+                return
+            self._frames_simulated += 1
@@ -0,0 +1,59 @@
+import pygame
+
+
+class RotationTable:
+    # rotated copies of an image at every quantized angle, built once so that turning is a table lookup rather
+    # than a software rotate.  Angles are degrees clockwise, as used by the spacecraft.
+    # the collision mask of each rotated image is built with it, so pixel accurate collision never builds a mask
+    ROTATION_STEP = 1  # degrees
+    _tables = {}  # (path, step) -> table, shared by every sprite in the process
+
+    def __init__(self, image: pygame.Surface, step: float = ROTATION_STEP, images: list[pygame.Surface] = None):
+        # images are the already rotated images, e.g. read from a cache, otherwise they are rotated from the image
+        self._original_image = image
+        self._step = step
+        self._count = round(360 / step)
+        if images is None:
+            images = [pygame.transform.rotate(image, -index * step) for index in range(self._count)]
+        self._images = images
+        # rotated images grow to fit the rotated corners.  Keep the sizes so the rect can be resized in place
+        self._sizes = [rotated.get_size() for rotated in self._images]
+        self._masks = [pygame.mask.from_surface(rotated) for rotated in self._images]
+
+    @staticmethod
+    def from_file(path: str, step: float = ROTATION_STEP) -> 'RotationTable':
+        table = RotationTable._tables.get((path, step))
+        if table is None:
+            image = pygame.image.load(path)
+            image.set_colorkey((0, 0, 0))
+            table = RotationTable.register(path, RotationTable(image.convert(), step))
+        return table
+
+    @staticmethod
+    def register(path: str, table: 'RotationTable') -> 'RotationTable':
+        # share a table built elsewhere as the table of the image file
+        RotationTable._tables[(path, table.step)] = table
+        return table
+
+    @property
+    def original_image(self) -> pygame.Surface:
+        return self._original_image
+
+    @property
+    def step(self) -> float:
+        return self._step
+
+    def __len__(self) -> int:
+        return self._count
+
+    def index(self, angle: float) -> int:
+        return round(angle / self._step) % self._count
+
+    def image(self, index: int) -> pygame.Surface:
+        return self._images[index]
+
+    def size(self, index: int) -> tuple[int, int]:
+        return self._sizes[index]
+
+    def mask(self, index: int) -> pygame.mask.Mask:
+        return self._masks[index]
@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class SimulationResult:
+    seed: int | None
+    frames: int
+    simulation_time: int  # ms
+    level: int
+    asteroids_destroyed_total: int
+    game_over: bool
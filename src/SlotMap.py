@@ -0,0 +1,63 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Handle:
+    index: int  # slot
+    generation: int  # generation of the slot when the item was inserted
+
+
+class SlotMap:
+    # items keyed by stable handles with O(1) insert, remove and lookup.  Items are kept densely packed for
+    # iteration, a removed item's place is filled by the last item, so iteration order is not insertion order.
+    # a slot's generation is incremented when its item is removed, so a handle to a removed item never refers to
+    # a later item reusing the slot.  Items must not be inserted or removed while iterating
+    def __init__(self):
+        self._items = []  # dense index -> item
+        self._handles = []  # dense index -> handle of the item
+        self._dense_indices = []  # slot -> dense index of its item
+        self._generations = []  # slot -> current generation
+        self._free_slots = []
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __contains__(self, handle: Handle) -> bool:
+        return handle.index < len(self._generations) and self._generations[handle.index] == handle.generation
+
+    def insert(self, item) -> Handle:
+        if self._free_slots:
+            slot = self._free_slots.pop()
+        else:
+            slot = len(self._generations)
+            self._generations.append(0)
+            self._dense_indices.append(0)
+        handle = Handle(slot, self._generations[slot])
+        self._dense_indices[slot] = len(self._items)
+        self._items.append(item)
+        self._handles.append(handle)
+        return handle
+
+    def get(self, handle: Handle):
+        # the item, or None if it has been removed
+        if handle not in self:
+            return None
+        return self._items[self._dense_indices[handle.index]]
+
+    def remove(self, handle: Handle):
+        if handle not in self:
+            raise KeyError(handle)
+        dense_index = self._dense_indices[handle.index]
+        item = self._items[dense_index]
+        last_item = self._items.pop()
+        last_handle = self._handles.pop()
+        if dense_index < len(self._items):
+            self._items[dense_index] = last_item
+            self._handles[dense_index] = last_handle
+            self._dense_indices[last_handle.index] = dense_index
+        self._generations[handle.index] += 1
+        self._free_slots.append(handle.index)
+        return item
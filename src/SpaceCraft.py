@@ -1,36 +1,39 @@
 import math
 import os
 import pygame
+from .GameClock import GameClock
+from .ObjectPool import ObjectPool
+from .Position import Position
+from .RotationTable import RotationTable
+from .SlotMap import SlotMap
 from .SpaceCraftBullet import SpaceCraftBullet
+from .Velocity import Velocity
 
 
 class SpaceCraftSprite(pygame.sprite.Sprite):
-    CLIP_VERTICAL_OFFSET = 3
-
-    def __init__(self, main_dir: str, file_name: str):
+    def __init__(self, rotation_table: RotationTable):
         super().__init__()
-        self._position = {'x': 0, 'y': 0}
+        self._position = Position(0, 0)
         self._rotation = 0
-        img = pygame.image.load(os.path.join(main_dir, 'assets', file_name))
-        img.set_colorkey((0, 0, 0))
-        self.original_image = img.convert()
-        self.image = self.original_image
+        # the rotation table is shared by the main and wrapped sprites
+        self._rotation_table = rotation_table
+        self._rotation_index = 0
+        self.original_image = rotation_table.original_image
+        self.image = rotation_table.image(self._rotation_index)
         self.rect = self.image.get_rect()
-        # collision rectangle is 3 pixels from top (gun + 1) and 1 pixel from bottom
-        # todo: rotate collision rectangle or replace with circle (preferred)
-        self._collision_rect = pygame.Rect(0, 0, self.rect.width, self.rect.height - 4)
+        # pixel accurate collision mask of the rotated image, taken from the table with the image
+        self.mask = rotation_table.mask(self._rotation_index)
 
     @property
-    def position(self) -> dict[str, float]:
+    def position(self) -> Position:
         return self._position
 
-    @position.setter
-    def position(self, value: dict[str, float]):
-        self._position = value
-        self.rect.centerx = self._position['x']
-        self.rect.centery = self._position['y']
-        self._collision_rect.centerx = self._position['x']
-        self._collision_rect.centery = self._position['y'] + SpaceCraftSprite.CLIP_VERTICAL_OFFSET
+    def set_position(self, x: float, y: float):
+        # the position is updated in place, each sprite has its own
+        self._position.x = x
+        self._position.y = y
+        self.rect.centerx = x
+        self.rect.centery = y
 
     @property
     def rotation(self) -> float:
@@ -39,14 +42,15 @@ class SpaceCraftSprite(pygame.sprite.Sprite):
     @rotation.setter
     def rotation(self, value: float):
         self._rotation = value
-        self.image = pygame.transform.rotate(self.original_image, -self._rotation)
-        self.rect = self.image.get_rect()
-        self.rect.centerx = self._position['x']
-        self.rect.centery = self._position['y']
-
-    @property
-    def collision_rect(self) -> pygame.Rect:
-        return self._collision_rect
+        rotation_index = self._rotation_table.index(value)
+        if rotation_index == self._rotation_index:
+            return  # same quantized angle, so the image and rect are unchanged
+        self._rotation_index = rotation_index
+        self.image = self._rotation_table.image(rotation_index)
+        self.mask = self._rotation_table.mask(rotation_index)
+        self.rect.size = self._rotation_table.size(rotation_index)
+        self.rect.centerx = self._position.x
+        self.rect.centery = self._position.y
 
 
 class SpaceCraft:
@@ -54,9 +58,12 @@ class SpaceCraft:
     ROTATION_RATE = 0.180  # degrees/ms = 180 degrees/s
     AUTOMATIC_FIRE_PERIOD = 0.500  # ms => 2 bullets/s
     AUTOMATIC_FIRE_THRESHOLD = 1000  # ms = 1s
+    BULLET_POOL_SIZE = 128  # released bullets kept for reuse
+    HELD_KEYS = ('up', 'down', 'left', 'right')  # bit order of the held key mask
 
     def __init__(self, main_dir: str, display_surface: pygame.Surface, display_rect: pygame.Rect,
-                 draw_group: pygame.sprite.Group, update_group: pygame.sprite.Group):
+                 draw_group: pygame.sprite.Group, update_group: pygame.sprite.Group, clock: GameClock = None,
+                 rotation_table: RotationTable = None):
         self._keys_pressed = {
             'up': False,
             'down': False,
@@ -64,49 +71,125 @@ class SpaceCraft:
             'right': False
         }
         # note: velocity component axis are +ve up and right.  Surface axis is +ve down and right
-        self._velocity = {'horizontal': 0, 'vertical': 0}  # pixels/ms
+        self._velocity = Velocity(0, 0)  # pixels/s
         self._rotation = 0  # degrees clockwise from vertical up, +/-180
         self._wrapped = False
         self._automatic_fire_mode = False
         self._automatic_fire_start_time = 0
         self._automatic_fire_prev_fire_time = 0
-        self._bullets = []
+        self._bullets = SlotMap()
+        self._clock = clock if clock is not None else GameClock()
+        self._bullet_pool = ObjectPool(SpaceCraftBullet, SpaceCraft.BULLET_POOL_SIZE)
 
         self._display_surface = display_surface
         self._display_rect = display_rect
-        self._main_sprite = SpaceCraftSprite(main_dir, 'spacecraft.png')
-        self._wrapped_sprite = SpaceCraftSprite(main_dir, 'spacecraft.png')
-        self._main_sprite.position = {'x': self._display_rect.width / 2, 'y': self._display_rect.height / 2}
+        if rotation_table is None:
+            rotation_table = RotationTable.from_file(os.path.join(main_dir, 'assets', 'spacecraft.png'))
+        self._main_sprite = SpaceCraftSprite(rotation_table)
+        self._wrapped_sprite = SpaceCraftSprite(rotation_table)
+        self._main_sprite.set_position(self._display_rect.width / 2, self._display_rect.height / 2)
+        self._previous_position = (self._main_sprite.position.x, self._main_sprite.position.y)
         self._draw_group = draw_group
         self._update_group = update_group
         self._main_sprite.add(draw_group)
 
     @property
-    def collision_rects(self) -> list[pygame.Rect]:
+    def position(self) -> Position:
+        return self._main_sprite.position
+
+    @property
+    def velocity(self) -> Velocity:
+        return self._velocity
+
+    @property
+    def rotation(self) -> float:
+        # degrees clockwise from vertical up, +/-180
+        return self._rotation
+
+    @property
+    def collision_sprites(self) -> list[SpaceCraftSprite]:
+        # the parts of the sprites off screen cannot collide as active asteroids and bullets are on screen
         if self._wrapped:
-            return [
-                self._main_sprite.collision_rect.clip(self._display_rect),
-                self._wrapped_sprite.collision_rect.clip(self._display_rect)
-            ]
-        return [self._main_sprite.collision_rect]
+            return [self._main_sprite, self._wrapped_sprite]
+        return [self._main_sprite]
 
     @property
-    def bullets(self) -> list[SpaceCraftBullet]:
+    def bullets(self) -> SlotMap:
+        # not a copy, so bullets must not be removed while iterating
         return self._bullets
 
+    @property
+    def bullet_pool(self) -> ObjectPool:
+        return self._bullet_pool
+
+    @property
+    def controls(self) -> tuple[int, int, int]:
+        # the control state carried between updates: the held key mask, the automatic fire start time and the
+        # previous automatic fire time.  Held keys take priority over their opposites, so this is saved with a
+        # game state for the game to continue exactly
+        mask = 0
+        for index, name in enumerate(SpaceCraft.HELD_KEYS):
+            if self._keys_pressed[name]:
+                mask |= 1 << index
+        return mask, self._automatic_fire_start_time, self._automatic_fire_prev_fire_time
+
+    def set_controls(self, mask: int, automatic_fire_start_time: int, automatic_fire_prev_fire_time: int):
+        for index, name in enumerate(SpaceCraft.HELD_KEYS):
+            self._keys_pressed[name] = (mask >> index) & 1 == 1
+        self._automatic_fire_start_time = automatic_fire_start_time
+        self._automatic_fire_prev_fire_time = automatic_fire_prev_fire_time
+
+    def set_position(self, x: float, y: float):
+        # move the spacecraft without it travelling there, e.g. to place it for a benchmark
+        self._main_sprite.set_position(x, y)
+        self._previous_position = (x, y)
+
+    def set_motion(self, x: float, y: float, horizontal: float, vertical: float, rotation: float):
+        # move the spacecraft to a state computed elsewhere, e.g. correcting a predicted spacecraft to the server's
+        self._velocity.horizontal = horizontal
+        self._velocity.vertical = vertical
+        self._rotation = rotation
+        self._main_sprite.rotation = rotation
+        self.set_position(x, y)
+        self._check_wrapped()
+
+    def remove(self):
+        # take the spacecraft and its bullets out of the game, e.g. when a network player is destroyed or leaves
+        self._main_sprite.kill()
+        self._wrapped_sprite.kill()
+        for bullet in list(self._bullets):
+            self.remove_bullet(bullet)
+
+    def restore_bullet(self, position: Position, velocity: Velocity, direction: float) -> SpaceCraftBullet:
+        # add a saved bullet.  The velocity is the bullet's own, not the spacecraft's when it was fired
+        bullet = self._bullet_pool.acquire(position, velocity.copy(), direction)
+        bullet.velocity.horizontal = velocity.horizontal  # firing added the bullet speed
+        bullet.velocity.vertical = velocity.vertical
+        bullet.handle = self._bullets.insert(bullet)
+        bullet.add(self._draw_group, self._update_group)
+        return bullet
+
+    def remove_bullet(self, bullet: SpaceCraftBullet):
+        self._bullets.remove(bullet.handle)
+        bullet.handle = None
+        bullet.kill()
+        self._bullet_pool.release(bullet)
+
     # todo: abstract out keystrokes to an InputController (KeyHandler) and a CommandController (SpaceCraftCommand)
     # KeyHandler will direct keystrokes to the appropriate CommandController
     # SpaceCraftCommand will take those keystrokes and call accelerate/rotate/etc on the SpaceCraft
-    def update(self, delta_time: int, key_events: list[pygame.event.Event]):
-        self._process_keys(key_events)
+    def update(self, delta_time: int, key_events: list[pygame.event.Event], key_inputs=None):
+        # key_inputs is the pressed state of the keys, indexed by key.  Read from pygame when not given
+        if key_inputs is None:
+            key_inputs = pygame.key.get_pressed()
+        self._process_keys(key_events, key_inputs)
         self._update_rotation(delta_time)
         self._update_velocity(delta_time)
         self._update_position(delta_time)
         self._check_wrapped()
         self._fire_gun()
 
-    def _process_keys(self, key_events: list[pygame.event.Event]):
-        key_inputs = pygame.key.get_pressed()
+    def _process_keys(self, key_events: list[pygame.event.Event], key_inputs):
         if not self._keys_pressed['up'] and not self._keys_pressed['down']:
             self._keys_pressed['up'] = key_inputs[pygame.K_UP] and not key_inputs[pygame.K_DOWN]
             self._keys_pressed['down'] = not key_inputs[pygame.K_UP] and key_inputs[pygame.K_DOWN]
@@ -140,13 +223,13 @@ class SpaceCraft:
         for event in key_events:
             if event.type == pygame.KEYDOWN and event.key == pygame.K_x:
                 self._keys_pressed['fire'] = True  # manual fire based on key press
-                self._automatic_fire_start_time = pygame.time.get_ticks()  # automatic fire based on time
+                self._automatic_fire_start_time = self._clock.get_ticks()  # automatic fire based on time
             elif event.type == pygame.KEYUP and event.key == pygame.K_x:
                 self._automatic_fire_start_time = 0
 
         self._automatic_fire_mode = False
         if (self._automatic_fire_start_time > 0
-                and (pygame.time.get_ticks() - self._automatic_fire_start_time) > SpaceCraft.AUTOMATIC_FIRE_THRESHOLD):
+                and (self._clock.get_ticks() - self._automatic_fire_start_time) > SpaceCraft.AUTOMATIC_FIRE_THRESHOLD):
             self._automatic_fire_mode = True
 
     def _update_rotation(self, delta_time: int):
@@ -169,25 +252,34 @@ class SpaceCraft:
 
     def _update_velocity(self, delta_time: int):
         if self._keys_pressed['up']:
-            self._velocity['vertical'] += SpaceCraft.ACCELERATION * delta_time * math.cos(math.radians(self._rotation))
-            self._velocity['horizontal'] += SpaceCraft.ACCELERATION * delta_time * math.sin(
+            self._velocity.vertical += SpaceCraft.ACCELERATION * delta_time * math.cos(math.radians(self._rotation))
+            self._velocity.horizontal += SpaceCraft.ACCELERATION * delta_time * math.sin(
                 math.radians(self._rotation))
 
         if self._keys_pressed['down']:
-            self._velocity['vertical'] -= SpaceCraft.ACCELERATION * delta_time * math.cos(math.radians(self._rotation))
-            self._velocity['horizontal'] -= SpaceCraft.ACCELERATION * delta_time * math.sin(
+            self._velocity.vertical -= SpaceCraft.ACCELERATION * delta_time * math.cos(math.radians(self._rotation))
+            self._velocity.horizontal -= SpaceCraft.ACCELERATION * delta_time * math.sin(
                 math.radians(self._rotation))
         # todo: if speed exceeds (4 * screen height) pixels/s then show warning that approaching 80% speed of light,
         # relativistic effects weakening structural integrity, failure imminent.
         # When speed = (5 * screen height) pixels/s then spacecraft implodes
 
+    def interpolate(self, alpha: float):
+        # draw the main sprite between the previous and current physics step.  Not when it has just been swapped
+        # with the wrapped sprite, as it would be drawn crossing the screen
+        previous_x, previous_y = self._previous_position
+        position = self._main_sprite.position
+        if (abs(position.x - previous_x) < self._display_rect.width / 2
+                and abs(position.y - previous_y) < self._display_rect.height / 2):
+            self._main_sprite.rect.centerx = previous_x + ((position.x - previous_x) * alpha)
+            self._main_sprite.rect.centery = previous_y + ((position.y - previous_y) * alpha)
+
     def _update_position(self, delta_time: int):
-        # drawing issues if not copied
-        new_position = self._main_sprite.position.copy()
-        new_position['x'] += self._velocity['horizontal'] * (delta_time / 1000)
+        position = self._main_sprite.position
+        self._previous_position = (position.x, position.y)
         # vertical screen axis is +ve downwards => -ve displacement
-        new_position['y'] += -self._velocity['vertical'] * (delta_time / 1000)
-        self._main_sprite.position = new_position
+        self._main_sprite.set_position(position.x + (self._velocity.horizontal * (delta_time / 1000)),
+                                       position.y + (-self._velocity.vertical * (delta_time / 1000)))
 
     def _check_wrapped(self):
         self._wrapped = False
@@ -201,20 +293,20 @@ class SpaceCraft:
             self._wrapped = True
             self._wrapped_sprite.rotation = self._rotation
 
-            # drawing issues if not copied
-            wrapped_sprite_position = self._main_sprite.position.copy()
+            wrapped_x = self._main_sprite.position.x
+            wrapped_y = self._main_sprite.position.y
 
             if self._main_sprite.rect.left < 0:
-                wrapped_sprite_position['x'] += display_width
+                wrapped_x += display_width
             elif self._main_sprite.rect.right > display_width:
-                wrapped_sprite_position['x'] -= display_width
+                wrapped_x -= display_width
 
             if self._main_sprite.rect.top < 0:
-                wrapped_sprite_position['y'] += display_height
+                wrapped_y += display_height
             elif self._main_sprite.rect.bottom > display_height:
-                wrapped_sprite_position['y'] -= display_height
+                wrapped_y -= display_height
 
-            self._wrapped_sprite.position = wrapped_sprite_position
+            self._wrapped_sprite.set_position(wrapped_x, wrapped_y)
 
             # if the wrapped sprite is fully on screen then swap the main sprite in its place
             # else show it
@@ -222,7 +314,7 @@ class SpaceCraft:
                     and self._wrapped_sprite.rect.right <= display_width
                     and self._wrapped_sprite.rect.top >= 0
                     and self._wrapped_sprite.rect.bottom <= display_height):
-                self._main_sprite.position = wrapped_sprite_position
+                self._main_sprite.set_position(wrapped_x, wrapped_y)
                 self._wrapped_sprite.kill()
             else:
                 self._wrapped_sprite.add(self._draw_group)
@@ -234,9 +326,9 @@ class SpaceCraft:
             self._create_bullet()
 
         # if (self._automatic_fire_mode and
-        #         (pygame.time.get_ticks() - self._automatic_fire_prev_fire_time) > SpaceCraft.AUTOMATIC_FIRE_PERIOD):
+        #         (self._clock.get_ticks() - self._automatic_fire_prev_fire_time) > SpaceCraft.AUTOMATIC_FIRE_PERIOD):
         #     self._create_bullet()
-        #     self._automatic_fire_prev_fire_time = pygame.time.get_ticks()
+        #     self._automatic_fire_prev_fire_time = self._clock.get_ticks()
 
     def _create_bullet(self):
         # get bullet position.
@@ -245,21 +337,19 @@ class SpaceCraft:
         # if it doesn't then the wrapped sprite must have its gun point in the screen
         firing_sprite = self._main_sprite
         gun_point = self._get_gun_point(self._main_sprite)
-        if not self._display_rect.collidepoint(gun_point['x'], gun_point['y']):
+        if not self._display_rect.collidepoint(gun_point.x, gun_point.y):
             firing_sprite = self._wrapped_sprite
-        # recalculate the starting center point of the bullet as an extension of the sprite
-        bullet_center = self._get_gun_point(firing_sprite, SpaceCraftBullet.DIAMETER)
+        # recalculate the starting center point of the bullet as an extension of the sprite.  Leave a bullet diameter
+        # gap from the gun point so that the rounded bullet rect never overlaps the rotated spacecraft mask
+        bullet_center = self._get_gun_point(firing_sprite, 2 * SpaceCraftBullet.DIAMETER)
 
-        bullet = SpaceCraftBullet(bullet_center, self._velocity.copy(), self._rotation)
-        self._bullets.append(bullet)
+        bullet = self._bullet_pool.acquire(bullet_center, self._velocity.copy(), self._rotation)
+        bullet.handle = self._bullets.insert(bullet)
         bullet.add(self._draw_group, self._update_group)
 
-    def _get_gun_point(self, sprite: SpaceCraftSprite, offset: int = 0) -> dict[str, float]:
+    def _get_gun_point(self, sprite: SpaceCraftSprite, offset: int = 0) -> Position:
         # the gun point is the top center of the sprite when in its original position.
         # calculate its rotated position
         gun_center_displacement = (sprite.original_image.get_rect().height + offset) / 2
-        gun_point = {
-            'x': sprite.position['x'] + (gun_center_displacement * math.sin(math.radians(self._rotation))),
-            'y': sprite.position['y'] - (gun_center_displacement * math.cos(math.radians(self._rotation)))
-        }
-        return gun_point
+        return Position(sprite.position.x + (gun_center_displacement * math.sin(math.radians(self._rotation))),
+                        sprite.position.y - (gun_center_displacement * math.cos(math.radians(self._rotation))))
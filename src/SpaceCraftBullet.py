@@ -1,20 +1,46 @@
 import math
 import pygame
+from .Position import Position
 from .Projectile import Projectile
+from .Velocity import Velocity
 
 
 class SpaceCraftBullet(Projectile):
     DIAMETER = 2
     SPEED = 250  # pixels/s
+    _image = None  # shared by every bullet
+    _mask = None
 
-    def __init__(self, position: dict[str, float], initial_velocity: dict[str, float], direction: float):
+    def __init__(self, position: Position, initial_velocity: Velocity, direction: float):
         super().__init__(position, initial_velocity, direction)
-        self._velocity['horizontal'] += SpaceCraftBullet.SPEED * math.sin(math.radians(self._direction))
-        self._velocity['vertical'] += SpaceCraftBullet.SPEED * math.cos(math.radians(self._direction))
-        surface = pygame.Surface((SpaceCraftBullet.DIAMETER, SpaceCraftBullet.DIAMETER))
-        surface.set_colorkey((0, 0, 0))
-        surface.fill([255, 0, 0])
-        self.image = surface
+        self.handle = None  # set by the spacecraft while the bullet is registered
+        self.image = SpaceCraftBullet.get_image()
         self.rect = self.image.get_rect()
-        self.rect.centerx = self._position['x']
-        self.rect.centery = self._position['y']
+        self.mask = SpaceCraftBullet.get_mask()
+        self._fire()
+
+    @staticmethod
+    def get_image() -> pygame.Surface:
+        if SpaceCraftBullet._image is None:
+            surface = pygame.Surface((SpaceCraftBullet.DIAMETER, SpaceCraftBullet.DIAMETER))
+            surface.set_colorkey((0, 0, 0))
+            surface.fill([255, 0, 0])
+            SpaceCraftBullet._image = surface
+        return SpaceCraftBullet._image
+
+    @staticmethod
+    def get_mask() -> pygame.mask.Mask:
+        if SpaceCraftBullet._mask is None:
+            SpaceCraftBullet._mask = pygame.mask.Mask((SpaceCraftBullet.DIAMETER, SpaceCraftBullet.DIAMETER), fill=True)
+        return SpaceCraftBullet._mask
+
+    def reset(self, position: Position, initial_velocity: Velocity, direction: float):
+        # reuse a pooled bullet, same arguments as the constructor
+        self._set_motion(position, initial_velocity, direction)
+        self._fire()
+
+    def _fire(self):
+        self._velocity.horizontal += SpaceCraftBullet.SPEED * math.sin(math.radians(self._direction))
+        self._velocity.vertical += SpaceCraftBullet.SPEED * math.cos(math.radians(self._direction))
+        self.rect.centerx = self._position.x
+        self.rect.centery = self._position.y
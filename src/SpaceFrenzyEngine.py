@@ -1,90 +1,451 @@
+import os
+import random
+import struct
+import time
+
 import pygame
 
+from .AssetBundle import AssetBundle
 from .AsteroidGenerator import AsteroidGenerator
+from .Bot import Bot
+from .Camera import Camera
 from .CollisionManager import CollisionManager
+from .Compositor import Compositor
+from .FramePacer import FramePacer
+from .FrameProfiler import FrameProfiler
+from .GameClock import GameClock, SimulationClock
+from .GameState import StateHistory, capture_state, restore_state
 from .Hud import Hud
+from .ProjectileGroup import ProjectileGroup
+from .RenderPipeline import RenderList, RenderPipeline
+from .InputLog import InputRecorder, InputReplay, KeyState
+from .SimulationResult import SimulationResult
 from .SpaceCraft import SpaceCraft
 from .HudData import HudData
+from .VectorPhysicsGroup import VectorPhysicsGroup
 
 
 class SpaceFrenzyEngine:
     SCREEN_WIDTH = 800
     SPACE_HEIGHT = 600
     HUD_HEIGHT = 35
+    FRAME_RATE = 60  # frames/s
+    SIMULATION_DELTA_TIME = 16  # ms, the fixed delta time used when running headless
+    PROFILER_OVERLAY_PERIOD = 30  # frames between profiler overlay refreshes
+    MAXIMUM_CATCH_UP_STEPS = 5  # physics steps per frame, beyond which simulated time is dropped
+    FOCUS_MARGIN = 200  # pixels around the camera view within which projectiles are updated every step
 
-    def __init__(self, main_dir: str):
+    def __init__(self, main_dir: str, headless: bool = False, seed: int = None, delta_time: int = None,
+                 vector_physics: bool = False, profile: bool = False, profile_overlay: bool = False,
+                 profile_export: str = None, profile_capacity: int = FrameProfiler.DEFAULT_CAPACITY,
+                 record: str = None, physics_rate: int = None, render_rate: int = FRAME_RATE,
+                 maximum_catch_up_steps: int = MAXIMUM_CATCH_UP_STEPS, asteroid_collisions: bool = True,
+                 asset_cache: str = None, startup_time: float = None, adaptive_render_rate: bool = False,
+                 pause_in_background: bool = True, arena_size: tuple[int, int] = None, rewind_seconds: int = None,
+                 save_state: str = None, pipelined: bool = False):
         self.main_dir = main_dir
+        # headless runs have no window, use simulated time and are not limited to the frame rate
+        self._headless = headless
+        self._seed = seed
+        self._delta_time = delta_time
+        if self._headless and self._delta_time is None:
+            self._delta_time = SpaceFrenzyEngine.SIMULATION_DELTA_TIME
+        # integrate all projectiles in one batched numpy step rather than per sprite
+        self._vector_physics = vector_physics
+        # the profiler is always called from the game loop, and costs next to nothing when disabled
+        self._profiler = FrameProfiler(profile_capacity, profile or profile_overlay or profile_export is not None)
+        self._profile_overlay = profile_overlay
+        self._profile_export = profile_export
+        # path of the input log.  Subsequent games are recorded with a numbered suffix
+        self._record = record
+        self._recorder = None
+        self._games = 0
+        self._game_seed = None
+        # with a physics rate the simulation runs in fixed steps independent of the render rate, and sprites are drawn
+        # interpolated between steps.  Otherwise the simulation steps once per frame using the frame's delta time
+        self._physics_step = 1000 / physics_rate if physics_rate is not None else None  # ms
+        self._render_rate = render_rate
+        # the interactive game blocks on events in menus, pauses in the background and can lower the render rate
+        # when frames cost too much.  Headless and simulated games are not paced
+        self._pacer = FramePacer(render_rate, adaptive_render_rate, pause_in_background)
+        self._maximum_catch_up_steps = maximum_catch_up_steps
+        self._accumulator = 0  # ms of simulated time not yet stepped
+        self._pending_key_events = []  # key events received in frames without a physics step
+        self._asteroid_collisions = asteroid_collisions  # asteroids bounce off each other
+        # width, height of an arena larger than the screen, viewed through a camera that follows the spacecraft.
+        # otherwise the arena is the space on screen
+        self._arena_size = arena_size
+        # path of the packed asset cache, written on the first run and read on later runs
+        self._asset_cache = asset_cache
+        # with the perf_counter time the process started, the time to each startup milestone is printed once the
+        # first frame has been drawn
+        self._startup_time = startup_time
+        self._startup_milestones = []
+        # with rewind, the state after each update is kept for the last rewind_seconds, and holding BACKSPACE steps
+        # back through them.  With a save state path, F5 saves the game there and F9 loads it
+        self._history = None
+        if rewind_seconds is not None:
+            self._history = StateHistory(rewind_seconds * (physics_rate or render_rate))
+        # states are kept per update, so rewinding pops the updates of a frame each frame
+        self._rewind_rate = physics_rate / render_rate if physics_rate is not None else 1  # states/frame
+        self._rewind_owed = 0  # states, the fraction of a state carried to the next frame
+        self._save_state = save_state
+        # pipelined, the game is simulated on a worker thread while the main thread draws the previous frame
+        self._pipelined = pipelined
+        self._pipeline = None
+        self._add_startup_milestone('engine')
+        self._assets = None
         self._display_surface = None
         self._background = None
         self._draw_group = None
         self._update_group = None
         self._space_rect = None
+        self._arena_rect = None
+        self._camera = None
         self._hud_rect = None
+        self._hud = None
+        self._clock = None
+        self._frame_clock = None  # paces the frames.  The game clock unless pipelined
+        self._space_craft = None
         self._asteroid_generator = None
+        self._collision_manager = None
+
+    @property
+    def profiler(self) -> FrameProfiler:
+        return self._profiler
+
+    @property
+    def space_rect(self) -> pygame.Rect:
+        return self._space_rect
+
+    @property
+    def arena_rect(self) -> pygame.Rect:
+        # the space that the game is played in, the same as the space on screen unless an arena size was given
+        return self._arena_rect
+
+    @property
+    def space_craft(self) -> SpaceCraft:
+        return self._space_craft
+
+    @property
+    def asteroid_generator(self) -> AsteroidGenerator:
+        return self._asteroid_generator
+
+    @property
+    def draw_group(self) -> pygame.sprite.OrderedUpdates:
+        return self._draw_group
+
+    @property
+    def game_over(self) -> bool:
+        return self._collision_manager.game_over
+
+    def capture_state(self) -> bytes:
+        # the state of the game, from which it continues exactly
+        return capture_state(self._clock, self._space_craft, self._asteroid_generator, self._collision_manager)
+
+    def restore_state(self, state: bytes):
+        restore_state(state, self._clock, self._space_craft, self._asteroid_generator, self._collision_manager)
 
     def start(self):
-        pygame.init()
+        self._init_display()
+        if self._pipelined and not self._headless:
+            # only the interactive game is pipelined.  Headless games and replays are stepped by the caller
+            self._pipeline = RenderPipeline(self._display_surface, self._compositor, self._hud_rect,
+                                            self._simulate_frame)
+        while self._restart_game():
+            pass
+        self._shutdown()
+
+    def run_simulation(self, max_frames: int, bot: Bot = None) -> SimulationResult:
+        # run a single game without waiting on the player, until game over or max_frames have been simulated.
+        # the input comes from the bot when given, otherwise from the keyboard
+        self.new_simulation()
+        frames = 0
+        while frames < max_frames and not self._collision_manager.game_over:
+            if bot is not None:
+                key_events, key_state = bot.control(self._space_craft, self._asteroid_generator)
+            else:
+                key_events = pygame.event.get(eventtype=[pygame.KEYUP, pygame.KEYDOWN], pump=False)
+                key_state = KeyState.from_pressed(pygame.key.get_pressed())
+            self.step_simulation(key_events, key_state)
+            frames += 1
+        return self._finish_simulation(frames)
+
+    def new_simulation(self, seed: int = None):
+        # start a game that the caller steps one frame at a time, e.g. an agent's environment.  The display is
+        # initialised by the first game
+        if self._display_surface is None:
+            self._init_display()
+        if seed is not None:
+            self._seed = seed
+        self._new_game()
+
+    def close(self):
+        # end a game started with new_simulation
+        self._shutdown()
+
+    def step_simulation(self, key_events: list[pygame.event.Event], key_state: KeyState) -> bool:
+        # returns True when the game is over
+        dt = self._clock.tick(self._render_rate)
+        self._run_frame(dt, key_events, key_state, 'Simulation running')
+        return self._collision_manager.game_over
+
+    def replay(self, path: str) -> SimulationResult:
+        # replay a recorded game as fast as possible.  Rendered unless the engine is headless
+        replay = InputReplay(path)
+        self._seed = replay.seed
+        self._init_display()
+        self._new_game(SimulationClock(0))
+        frames = 0
+        for delta_time, key_events, key_state in replay:
+            if self._collision_manager.game_over:
+                break
+            self._clock.advance(delta_time)
+            self._run_frame(delta_time, key_events, key_state, 'Replay running')
+            frames += 1
+        return self._finish_simulation(frames)
+
+    def _finish_simulation(self, frames: int) -> SimulationResult:
+        self._shutdown()
+        return SimulationResult(
+            self._game_seed,
+            frames,
+            self._clock.get_ticks(),
+            self._asteroid_generator.level,
+            self._asteroid_generator.asteroids_destroyed_total_count,
+            self._collision_manager.game_over
+        )
+
+    def _init_display(self):
+        surface_flags = pygame.SCALED
+        if self._headless:
+            # the dummy driver still provides a display surface so images can be converted to its format
+            os.environ['SDL_VIDEODRIVER'] = 'dummy'
+            surface_flags = 0
+        # only the subsystems the game uses.  Events come with the display, and there is no sound
+        pygame.display.init()
+        pygame.font.init()
+        self._add_startup_milestone('subsystems')
 
         # cannot subsurface the display surface when HW accelerated, so to be safe use bounding Rects
         screen_rect = pygame.Rect(0, 0, SpaceFrenzyEngine.SCREEN_WIDTH,
                                   SpaceFrenzyEngine.SPACE_HEIGHT + SpaceFrenzyEngine.HUD_HEIGHT)
         self._space_rect = pygame.Rect(0, 0, SpaceFrenzyEngine.SCREEN_WIDTH, SpaceFrenzyEngine.SPACE_HEIGHT)
+        if self._arena_size is not None:
+            self._arena_rect = pygame.Rect((0, 0), self._arena_size)
+            self._camera = Camera(self._space_rect.size, self._arena_rect)
+        else:
+            self._arena_rect = self._space_rect
         self._hud_rect = pygame.Rect(0, SpaceFrenzyEngine.SPACE_HEIGHT, SpaceFrenzyEngine.SCREEN_WIDTH,
                                      SpaceFrenzyEngine.HUD_HEIGHT)
-        surface_flags = pygame.SCALED
         self._display_surface = pygame.display.set_mode(size=screen_rect.size, flags=surface_flags)
+        self._add_startup_milestone('display')
+        # load and render every image up front so that generating asteroids and fragments never rasterizes
+        self._assets = AssetBundle(self.main_dir, self._asset_cache)
+        self._add_startup_milestone('assets')
         self._background = pygame.Surface(screen_rect.size)
         self._background.fill((0, 0, 0))
-        self._update_group = pygame.sprite.Group()
+        self._hud = Hud(self._hud_rect, self._assets.font)
+        self._compositor = Compositor(self._display_surface, self._background, self._space_rect)
+        if self._vector_physics:
+            self._update_group = VectorPhysicsGroup(self._arena_rect)
+        else:
+            self._update_group = ProjectileGroup()
         # draw_group = pygame.sprite.RenderClear()
         self._draw_group = pygame.sprite.OrderedUpdates()
 
-        while self._restart_game():
-            pass
-        pygame.quit()
-
-    def _restart_game(self) -> bool:
+    def _new_game(self, clock: GameClock = None):
         # todo: make sure all object references are cleared i.e. empty lists inside objects.  is this required?
         self._update_group.empty()
         self._draw_group.empty()
-        space_craft = SpaceCraft(self.main_dir, self._display_surface, self._space_rect,
-                                 self._draw_group, self._update_group)
-        self._asteroid_generator = AsteroidGenerator(self._display_surface, self._space_rect, self._draw_group,
-                                                     self._update_group)
-        collision_manager = CollisionManager(space_craft, self._asteroid_generator, self._space_rect)
+        if clock is not None:
+            self._clock = clock
+        elif self._delta_time is not None:
+            self._clock = SimulationClock(self._delta_time)
+        else:
+            self._clock = GameClock()
+        self._frame_clock = self._clock
+        if self._pipeline is not None:
+            # the simulation thread advances game time by the delta time of each frame it is given
+            self._clock = SimulationClock(0)
+        # always seed explicitly so that any game can be reproduced from its seed
+        self._game_seed = self._seed if self._seed is not None else random.randrange(2 ** 63)
+        self._games += 1
+        self._accumulator = 0
+        self._pending_key_events = []
+        if self._history is not None:
+            self._history.clear()
+        if self._record is not None:
+            self._start_recording()
+        self._space_craft = SpaceCraft(self.main_dir, self._display_surface, self._arena_rect,
+                                       self._draw_group, self._update_group, self._clock, self._assets.spacecraft)
+        self._asteroid_generator = AsteroidGenerator(self._display_surface, self._arena_rect, self._draw_group,
+                                                     self._update_group, self._clock, random.Random(self._game_seed))
+        self._collision_manager = CollisionManager(self._space_craft, self._asteroid_generator, self._arena_rect,
+                                                   self._asteroid_collisions)
+
+    def _start_recording(self):
+        if self._recorder is not None:
+            self._recorder.close()
+        path = self._record
+        if self._games > 1:
+            root, extension = os.path.splitext(self._record)
+            path = f'{root}-{self._games}{extension}'
+        self._recorder = InputRecorder(path, self._game_seed)
+
+    def _shutdown(self):
+        if self._recorder is not None:
+            self._recorder.close()
+            self._recorder = None
+        if self._profile_export is not None:
+            self._profiler.export(self._profile_export)
+        pygame.quit()
+
+    def _run_frame(self, dt: int, key_events: list[pygame.event.Event], key_state: KeyState, message: str):
+        self._profiler.begin_frame()
+        if self._recorder is not None:
+            self._recorder.record(dt, key_events, key_state)
+        if self._physics_step is None:
+            self._update_game(dt, key_events, key_state)
+        else:
+            self._step_game(dt, key_events, key_state)
+        if not self._headless:
+            self._update_hud(message)
+            if self._physics_step is not None:
+                self._interpolate(self._accumulator / self._physics_step)
+            self._draw()
+        self._profiler.end_frame()
+        if self._startup_time is not None:
+            # headless frames are not drawn
+            self._report_startup()
+
+    def _step_game(self, dt: int, key_events: list[pygame.event.Event], key_state: KeyState):
+        # fixed timestep.  Key events are handled by the first step, or held until a frame has a step
+        self._pending_key_events.extend(key_events)
+        self._accumulator += dt
+        steps = 0
+        while self._accumulator >= self._physics_step and not self._collision_manager.game_over:
+            if steps == self._maximum_catch_up_steps:
+                # too far behind, e.g. after a stall.  Drop the time rather than spiral trying to catch up
+                self._accumulator = self._accumulator % self._physics_step
+                break
+            self._update_game(self._physics_step, self._pending_key_events, key_state)
+            self._pending_key_events = []
+            self._accumulator -= self._physics_step
+            steps += 1
+
+    def _interpolate(self, alpha: float):
+        self._update_group.interpolate(alpha)
+        self._space_craft.interpolate(alpha)
+
+    def _update_game(self, dt: int, key_events: list[pygame.event.Event], key_state: KeyState):
+        profiler = self._profiler
+        self._space_craft.update(dt, key_events, key_state)
+        profiler.end_phase('input')
+        self._asteroid_generator.update()
+        profiler.end_phase('generation')
+        if self._camera is not None:
+            # projectiles far from the view are updated at a reduced rate, and only collide with each other
+            self._camera.follow(self._space_craft.position)
+            focus_rect = self._camera.view.inflate(SpaceFrenzyEngine.FOCUS_MARGIN * 2,
+                                                   SpaceFrenzyEngine.FOCUS_MARGIN * 2)
+            self._update_group.set_focus(focus_rect)
+            self._collision_manager.set_focus(focus_rect)
+        self._update_group.update(dt)
+        profiler.end_phase('update')
+        self._collision_manager.update()
+        profiler.end_phase('collision')
+        if self._history is not None:
+            self._history.push(self.capture_state())
+        profiler.end_phase('state')
+        if profiler.enabled:
+            profiler.count('asteroids', self._asteroid_generator.asteroid_count)
+            profiler.count('bullets', len(self._space_craft.bullets))
+            profiler.count('sprites', len(self._draw_group))
+
+    def _restart_game(self) -> bool:
+        self._new_game()
 
         if not self._wait_on_keyup(pygame.K_SPACE, 'Arrow keys to move, X to fire.  Press SPACE to start'):
             return False
+        self._frame_clock.restart()  # exclude the time spent waiting on the player
 
-        clock = pygame.time.Clock()
         quit_game = False
         running = True
+        if self._pipeline is not None:
+            self._pipeline.start()
         while running:
-            dt = clock.tick(60)
-            space_craft.update(dt, pygame.event.get(eventtype=[pygame.KEYUP, pygame.KEYDOWN], pump=False))
-            self._asteroid_generator.update()
-            self._update_group.update(dt)
-            collision_manager.update()
-            hud_data = HudData(
-                self._asteroid_generator.level,
-                self._asteroid_generator.asteroid_level_count,
-                self._asteroid_generator.asteroids_destroyed_level_count,
-                self._asteroid_generator.asteroids_destroyed_total_count,
-                self._asteroid_generator.time_to_next_generation,
-                'Arrow keys to move, X to fire'
-            )
-            # add the hud to the draw group last so that it draws over any out-of-space_rect objects
-            Hud(self._hud_rect, self._draw_group, hud_data)
-            self._draw()
+            dt = self._pacer.tick(self._frame_clock)
+            if self._pacer.take_exposed():
+                self._compositor.invalidate()
+            key_events = pygame.event.get(eventtype=[pygame.KEYUP, pygame.KEYDOWN], pump=False)
+            pressed = pygame.key.get_pressed()
+            rewind = self._history is not None and pressed[pygame.K_BACKSPACE]
+            if self._pipeline is not None:
+                self._pipeline.submit(dt, key_events, KeyState.from_pressed(pressed), rewind)
+                self._pipeline.draw()
+            else:
+                self._play_frame(dt, key_events, KeyState.from_pressed(pressed), rewind)
             quit_game = len(pygame.event.get(eventtype=pygame.QUIT)) > 0
-            running = not quit_game and not collision_manager.game_over
+            running = not quit_game and not self._collision_manager.game_over
+        if self._pipeline is not None:
+            self._pipeline.stop()
+            self._pipeline.draw()  # the last frame simulated
 
-        if collision_manager.game_over:
+        if self._collision_manager.game_over:
             quit_game = not self._wait_on_keyup(pygame.K_SPACE, 'GAME OVER!  Press SPACE to reset')
 
         return not quit_game
 
-    def _wait_on_keyup(self, key: int, message: str) -> bool:
+    def _play_frame(self, dt: int, key_events: list[pygame.event.Event], key_state: KeyState, rewind: bool):
+        self._handle_save_keys(key_events)
+        if rewind:
+            self._rewind_frame()
+        else:
+            self._run_frame(dt, key_events, key_state, 'Arrow keys to move, X to fire')
+
+    def _simulate_frame(self, dt: int, key_events: list[pygame.event.Event], key_state: KeyState, rewind: bool):
+        # on the pipeline's simulation thread
+        self._clock.advance(dt)
+        self._play_frame(dt, key_events, key_state, rewind)
+
+    def _handle_save_keys(self, key_events: list[pygame.event.Event]):
+        if self._save_state is None:
+            return
+        for event in key_events:
+            if event.type != pygame.KEYDOWN:
+                continue
+            if event.key == pygame.K_F5:
+                with open(self._save_state, 'wb') as file:
+                    file.write(self.capture_state())
+            elif event.key == pygame.K_F9 and os.path.exists(self._save_state):
+                with open(self._save_state, 'rb') as file:
+                    state = file.read()
+                try:
+                    self.restore_state(state)
+                except (struct.error, ValueError):
+                    # not a whole game state, e.g. truncated or another file.  The game carries on as it was
+                    continue
+                self._accumulator = 0
+
+    def _rewind_frame(self):
+        # back by the updates of a frame each frame, so the game rewinds at about the speed it was played.  The newest
+        # state is the current one, so the first frame holds still
+        self._rewind_owed += self._rewind_rate
+        state = None
+        rewound = len(self._history) > 0
+        while self._rewind_owed >= 1 and rewound:
+            self._rewind_owed -= 1
+            popped = self._history.pop()
+            rewound = popped is not None
+            state = popped or state
+        if state is not None:
+            self.restore_state(state)
+            self._accumulator = 0
+        self._update_hud('Rewinding' if rewound else 'Rewound as far as possible')
+        self._draw()
+
+    def _update_hud(self, message: str):
         hud_data = HudData(
             self._asteroid_generator.level,
             self._asteroid_generator.asteroid_level_count,
@@ -93,20 +454,72 @@ class SpaceFrenzyEngine:
             self._asteroid_generator.time_to_next_generation,
             message
         )
-        Hud(self._hud_rect, self._draw_group, hud_data)
+        self._hud.update(hud_data)
+        if self._profile_overlay and self._profiler.frames % SpaceFrenzyEngine.PROFILER_OVERLAY_PERIOD == 0:
+            self._hud.update_overlay(self._profiler.overlay_lines())
+        # also called between frames, e.g. waiting on the player or rewinding, which are not profiled
+        if self._profiler.in_frame:
+            self._profiler.end_phase('hud')
+
+    def _wait_on_keyup(self, key: int, message: str) -> bool:
+        self._update_hud(message)
         self._draw()
-        quit_game = False
-        can_continue = False
-        while not (can_continue or quit_game):
-            for event in pygame.event.get(eventtype=[pygame.KEYUP], pump=False):
-                if event.key == key:
-                    can_continue = True
-            if len(pygame.event.get(eventtype=pygame.QUIT)) > 0:
-                quit_game = True
+        return self._pacer.wait_for_key(key, self._redraw)
 
-        return not quit_game
+    def _redraw(self):
+        self._compositor.invalidate()
+        self._draw()
 
     def _draw(self):
-        dirty_rects = self._draw_group.draw(self._display_surface)
-        pygame.display.update(dirty_rects)
-        self._draw_group.clear(self._display_surface, self._background)
+        # sprites are clipped to space so that out-of-space_rect objects never draw over the hud, and only the regions
+        # that changed are redrawn and pushed.  The hud is only drawn when its content changes
+        if self._pipeline is not None and self._pipeline.active:
+            # on the simulation thread, which publishes what to draw to the main thread
+            self._pipeline.publish(self._render_list())
+            if self._profiler.in_frame:
+                self._profiler.end_phase('draw')
+            if self._startup_time is not None:
+                self._report_startup()
+            return
+        hud_rect = self._hud.draw(self._display_surface)
+        sprites = self._draw_group.sprites()
+        overlays = [self._hud.overlay] if self._hud.overlay is not None else []
+        offset = (0, 0)
+        if self._camera is not None:
+            # only the sprites in view are drawn, in screen coordinates
+            sprites = self._camera.visible(sprites)
+            offset = self._camera.offset
+        self._compositor.draw(sprites, [hud_rect] if hud_rect is not None else [], offset, overlays)
+        if self._profiler.in_frame:
+            self._profiler.count('dirty_rects', self._compositor.rects_pushed)
+            self._profiler.count('dirty_pixels', self._compositor.pixels_pushed)
+            self._profiler.end_phase('draw')
+        if self._startup_time is not None:
+            self._report_startup()
+
+    def _render_list(self) -> RenderList:
+        sprites = self._draw_group.sprites()
+        offset_x, offset_y = 0, 0
+        if self._camera is not None:
+            sprites = self._camera.visible(sprites)
+            offset_x, offset_y = self._camera.offset
+        image_id = self._pipeline.images.id
+        overlay = self._hud.overlay
+        return RenderList(
+            tuple((id(sprite), image_id(sprite.image), sprite.rect.x - offset_x, sprite.rect.y - offset_y)
+                  for sprite in sprites),
+            ((overlay.image, overlay.rect.topleft),) if overlay is not None else (),
+            self._hud.take_image()
+        )
+
+    def _add_startup_milestone(self, name: str):
+        if self._startup_time is not None:
+            self._startup_milestones.append((name, time.perf_counter()))
+
+    def _report_startup(self):
+        self._add_startup_milestone('first frame')
+        previous = self._startup_time
+        for name, at in self._startup_milestones:
+            print(f'{name:<12} {(at - self._startup_time) * 1000:>7.1f} ms  (+{(at - previous) * 1000:.1f} ms)')
+            previous = at
+        self._startup_time = None
@@ -0,0 +1,40 @@
+import pygame
+
+
+class SpatialHash:
+    # uniform grid broad phase.  Each item is bucketed in every cell its rect overlaps, so a query only returns
+    # the items sharing a cell with the query rect.  Rects are treated as closed i.e. right and bottom inclusive,
+    # and query results are returned in insertion order so callers see the same order as a linear scan
+    def __init__(self, cell_size: int):
+        self._cell_size = cell_size
+        self._cells = {}
+        self._items = []
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def clear(self):
+        self._cells.clear()
+        self._items.clear()
+
+    def insert(self, item, rect: pygame.Rect):
+        index = len(self._items)
+        self._items.append(item)
+        cell_size = self._cell_size
+        for cell_x in range(rect.left // cell_size, (rect.right // cell_size) + 1):
+            for cell_y in range(rect.top // cell_size, (rect.bottom // cell_size) + 1):
+                cell = self._cells.get((cell_x, cell_y))
+                if cell is None:
+                    self._cells[(cell_x, cell_y)] = [index]
+                else:
+                    cell.append(index)
+
+    def query(self, rect: pygame.Rect) -> list:
+        cell_size = self._cell_size
+        indices = set()
+        for cell_x in range(rect.left // cell_size, (rect.right // cell_size) + 1):
+            for cell_y in range(rect.top // cell_size, (rect.bottom // cell_size) + 1):
+                cell = self._cells.get((cell_x, cell_y))
+                if cell is not None:
+                    indices.update(cell)
+        return [self._items[index] for index in sorted(indices)]
@@ -0,0 +1,38 @@
+from .Asteroid import Asteroid
+
+
+class SweepAndPrune:
+    # sorted axis broad phase for circles.  The asteroids are kept sorted by the left of their bounding circle between
+    # updates.  They move little per update, so the list is nearly sorted and the (adaptive) sort that restores the
+    # order is close to linear.  The sweep then only tests asteroids whose horizontal extents overlap
+    def __init__(self):
+        self._asteroids = []
+
+    def pairs(self, asteroids: list[Asteroid]) -> list[tuple[Asteroid, Asteroid]]:
+        # drop asteroids no longer present, keeping the previous order, then append new ones
+        present = set(asteroids)
+        ordered = [asteroid for asteroid in self._asteroids if asteroid in present]
+        if len(ordered) != len(present):
+            known = set(ordered)
+            ordered.extend(asteroid for asteroid in asteroids if asteroid not in known)
+        self._asteroids = ordered
+
+        ordered.sort(key=lambda asteroid: asteroid.position.x - asteroid.radius)
+        radii = [asteroid.radius for asteroid in ordered]
+        xs = [asteroid.position.x for asteroid in ordered]
+        ys = [asteroid.position.y for asteroid in ordered]
+        lefts = [x - radius for x, radius in zip(xs, radii)]
+
+        # each asteroid is only tested against the following asteroids that start before it ends
+        pairs = []
+        count = len(ordered)
+        for index in range(count):
+            radius = radii[index]
+            right = xs[index] + radius
+            y = ys[index]
+            other_index = index + 1
+            while other_index < count and lefts[other_index] <= right:
+                if abs(ys[other_index] - y) <= radii[other_index] + radius:
+                    pairs.append((ordered[index], ordered[other_index]))
+                other_index += 1
+        return pairs
@@ -0,0 +1,170 @@
+import pygame
+
+try:
+    import numpy
+except ImportError:  # numpy is optional, it is only required by the environment
+    numpy = None
+
+from .InputLog import TRACKED_KEYS, KeyState
+from .SpaceFrenzyEngine import SpaceFrenzyEngine
+
+# action bits, the same as the key state mask so an action is used as the key state directly
+ACTION_UP = 1 << TRACKED_KEYS.index(pygame.K_UP)
+ACTION_DOWN = 1 << TRACKED_KEYS.index(pygame.K_DOWN)
+ACTION_LEFT = 1 << TRACKED_KEYS.index(pygame.K_LEFT)
+ACTION_RIGHT = 1 << TRACKED_KEYS.index(pygame.K_RIGHT)
+ACTION_FIRE = 1 << TRACKED_KEYS.index(pygame.K_x)
+ACTION_COUNT = 1 << len(TRACKED_KEYS)
+
+
+class VectorEnvironment:
+    # gym style reset/step over a number of headless games, stepped together.  An action is a mask of the ACTION
+    # bits, held for the step.  Fire is pressed when its bit is set after a step without it, as with the key.
+    # observations are numpy arrays allocated once and filled in place on every step, so keep a copy of anything
+    # needed after the next step:
+    #   ships: (games, 5) x, y, horizontal velocity, vertical velocity (+ve up), rotation
+    #   asteroids: (games, MAXIMUM_ASTEROIDS, 6) x, y, horizontal velocity, vertical velocity, radius, active
+    #   bullets: (games, MAXIMUM_BULLETS, 4) x, y, horizontal velocity, vertical velocity
+    #   asteroid_counts, bullet_counts: (games,) rows in use.  Rows beyond the count are zero
+    # a game that ends is reset with the next seed in the same step, so its observation is of the new game
+    MAXIMUM_ASTEROIDS = 64  # rows per game, further asteroids are not observed
+    MAXIMUM_BULLETS = 32
+
+    def __init__(self, main_dir: str, games: int, seed: int = None, pixels: bool = False, **engine_options):
+        if numpy is None:
+            raise ImportError('numpy is required for the environment')
+        self._engines = [SpaceFrenzyEngine(main_dir, headless=True, **engine_options) for _ in range(games)]
+        self._seed = seed
+        self._games_started = 0
+        self._key_states = [KeyState(mask) for mask in range(ACTION_COUNT)]
+        self._fire_down = pygame.event.Event(pygame.KEYDOWN, key=pygame.K_x)
+        self._fire_up = pygame.event.Event(pygame.KEYUP, key=pygame.K_x)
+        self._fire_events = ([], [self._fire_down], [self._fire_up])  # indexed by fire pressed - previously pressed
+        self._fired = [False] * games
+        self._destroyed = [0] * games  # asteroids destroyed in the game so far, for the reward
+
+        self._ships = numpy.zeros((games, 5), dtype=numpy.float32)
+        self._asteroids = numpy.zeros((games, VectorEnvironment.MAXIMUM_ASTEROIDS, 6), dtype=numpy.float32)
+        self._bullets = numpy.zeros((games, VectorEnvironment.MAXIMUM_BULLETS, 4), dtype=numpy.float32)
+        self._asteroid_counts = numpy.zeros(games, dtype=numpy.int32)
+        self._bullet_counts = numpy.zeros(games, dtype=numpy.int32)
+        self._rewards = numpy.zeros(games, dtype=numpy.float32)
+        self._dones = numpy.zeros(games, dtype=numpy.bool_)
+        self._observation = {
+            'ships': self._ships,
+            'asteroids': self._asteroids,
+            'bullets': self._bullets,
+            'asteroid_counts': self._asteroid_counts,
+            'bullet_counts': self._bullet_counts,
+        }
+        for index in range(games):
+            self._engines[index].new_simulation(self._next_seed())
+
+        # every game is drawn to its own area of one surface, so one pixel array views all of them
+        self._pixels = pixels
+        self._surface = None
+        self._game_surfaces = None
+        if pixels:
+            width, height = self._engines[0].space_rect.size
+            self._surface = pygame.Surface((width, height * games)).convert()
+            self._game_surfaces = [self._surface.subsurface((0, index * height, width, height))
+                                   for index in range(games)]
+        self._observe_all()
+
+    def __len__(self) -> int:
+        return len(self._engines)
+
+    @property
+    def observation(self) -> dict:
+        return self._observation
+
+    def pixels(self):
+        # (games, width, height, 3) view of the drawn games, without copying.  The view locks the surface, so it
+        # must be deleted before the next step
+        games = len(self._engines)
+        width, height = self._engines[0].space_rect.size
+        view = pygame.surfarray.pixels3d(self._surface)
+        return view.reshape(width, games, height, 3).transpose(1, 0, 2, 3)
+
+    def reset(self, seed: int = None) -> dict:
+        # start every game again.  Games are seeded from seed upwards, or randomly when None
+        if seed is not None:
+            self._seed = seed
+            self._games_started = 0
+        for index, engine in enumerate(self._engines):
+            engine.new_simulation(self._next_seed())
+            self._fired[index] = False
+            self._destroyed[index] = 0
+        self._observe_all()
+        return self._observation
+
+    def step(self, actions) -> tuple[dict, 'numpy.ndarray', 'numpy.ndarray']:
+        # actions is one action mask per game.  Returns the observation, the asteroids destroyed in the step as the
+        # reward, and whether each game ended in the step
+        rewards = self._rewards
+        dones = self._dones
+        for index, engine in enumerate(self._engines):
+            action = int(actions[index])
+            fire = action & ACTION_FIRE != 0
+            done = engine.step_simulation(self._fire_events[fire - self._fired[index]], self._key_states[action])
+            self._fired[index] = fire
+            destroyed = engine.asteroid_generator.asteroids_destroyed_total_count
+            rewards[index] = destroyed - self._destroyed[index]
+            self._destroyed[index] = destroyed
+            dones[index] = done
+            if done:
+                engine.new_simulation(self._next_seed())
+                self._fired[index] = False
+                self._destroyed[index] = 0
+            self._observe(index)
+        return self._observation, rewards, dones
+
+    def close(self):
+        pygame.quit()
+
+    def _next_seed(self) -> int | None:
+        if self._seed is None:
+            return None
+        self._games_started += 1
+        return self._seed + self._games_started - 1
+
+    def _observe_all(self):
+        for index in range(len(self._engines)):
+            self._observe(index)
+
+    def _observe(self, index: int):
+        engine = self._engines[index]
+        space_craft = engine.space_craft
+        position = space_craft.position
+        velocity = space_craft.velocity
+        self._ships[index] = (position.x, position.y, velocity.horizontal, velocity.vertical, space_craft.rotation)
+
+        asteroids = self._asteroids[index]
+        count = 0
+        for asteroid in engine.asteroid_generator.asteroids:
+            if count == VectorEnvironment.MAXIMUM_ASTEROIDS:
+                break
+            position = asteroid.position
+            velocity = asteroid.velocity
+            asteroids[count] = (position.x, position.y, velocity.horizontal, velocity.vertical, asteroid.radius,
+                                asteroid.active)
+            count += 1
+        asteroids[count:self._asteroid_counts[index]] = 0
+        self._asteroid_counts[index] = count
+
+        bullets = self._bullets[index]
+        count = 0
+        for bullet in space_craft.bullets:
+            if count == VectorEnvironment.MAXIMUM_BULLETS:
+                break
+            position = bullet.position
+            velocity = bullet.velocity
+            bullets[count] = (position.x, position.y, velocity.horizontal, velocity.vertical)
+            count += 1
+        bullets[count:self._bullet_counts[index]] = 0
+        self._bullet_counts[index] = count
+
+        if self._pixels:
+            surface = self._game_surfaces[index]
+            surface.fill((0, 0, 0))
+            surface.blits([(sprite.image, sprite.rect) for sprite in engine.draw_group], False)
@@ -0,0 +1,211 @@
+import pygame
+
+try:
+    import numpy
+except ImportError:  # numpy is optional.  Without it the per-sprite update in pygame.sprite.Group is used
+    numpy = None
+
+from .Asteroid import Asteroid
+from .Projectile import Projectile
+from .ProjectileGroup import ProjectileGroup
+
+
+class VectorPhysicsGroup(ProjectileGroup):
+    # drop-in replacement for the update group that holds the state of every projectile in numpy arrays
+    # (structure of arrays) and integrates them all in one batched step per update.
+    # slots are kept densely packed, a removed sprite's slot is filled by the last slot, so every batched operation
+    # works on a single contiguous slice.  The sprite's position, rect and active flag are synced after each step
+    # so collision detection and drawing see the same values as the per-sprite update
+    INITIAL_CAPACITY = 256
+
+    def __init__(self, containing_rect: pygame.Rect, *sprites: pygame.sprite.Sprite):
+        if numpy is None:
+            raise ImportError('numpy is required for the vectorised physics backend')
+        self._containing_rect = containing_rect
+        self._count = 0
+        self._capacity = 0
+        self._positions = None  # x, y
+        self._previous_positions = None  # x, y at the previous step, for interpolation
+        self._velocities = None  # horizontal, vertical.  Note: vertical is +ve up
+        self._sizes = None  # rect width, height
+        self._radii = None
+        self._active = None  # asteroid is fully on screen and reflects off the edges
+        self._reflects = None  # asteroids reflect off the edges, bullets do not
+        self._resize(VectorPhysicsGroup.INITIAL_CAPACITY)
+        self._slot_sprites = []  # slot -> sprite
+        self._slot_positions = []  # slot -> sprite position, cached to keep the sync loop tight
+        self._slot_rects = []  # slot -> sprite rect
+        self._sprite_slots = {}  # sprite -> slot
+        self._other_sprites = []  # sprites that are not projectiles are updated individually
+        super().__init__(*sprites)
+
+    @property
+    def positions(self):
+        return self._positions[:self._count]
+
+    @property
+    def velocities(self):
+        return self._velocities[:self._count]
+
+    @property
+    def radii(self):
+        return self._radii[:self._count]
+
+    @property
+    def active(self):
+        return self._active[:self._count]
+
+    def slot(self, sprite: Projectile) -> int:
+        return self._sprite_slots[sprite]
+
+    def set_velocity(self, sprite: Projectile, horizontal: float, vertical: float):
+        slot = self._sprite_slots.get(sprite)
+        if slot is not None:
+            self._velocities[slot] = (horizontal, vertical)
+
+    def add_internal(self, sprite: pygame.sprite.Sprite, layer=None):
+        super().add_internal(sprite, layer)
+        if not isinstance(sprite, Projectile):
+            self._other_sprites.append(sprite)
+            return
+        if self._count == self._capacity:
+            self._resize(self._capacity * 2)
+        slot = self._count
+        self._count += 1
+        self._slot_sprites.append(sprite)
+        self._slot_positions.append(sprite.position)
+        self._slot_rects.append(sprite.rect)
+        self._sprite_slots[sprite] = slot
+        self._positions[slot] = (sprite.position.x, sprite.position.y)
+        self._previous_positions[slot] = self._positions[slot]
+        self._velocities[slot] = (sprite.velocity.horizontal, sprite.velocity.vertical)
+        self._sizes[slot] = (sprite.rect.width, sprite.rect.height)
+        if isinstance(sprite, Asteroid):
+            self._radii[slot] = sprite.radius
+            self._active[slot] = sprite.active
+            self._reflects[slot] = True
+        else:
+            self._radii[slot] = 0
+            self._active[slot] = False
+            self._reflects[slot] = False
+
+    def remove_internal(self, sprite: pygame.sprite.Sprite):
+        super().remove_internal(sprite)
+        slot = self._sprite_slots.pop(sprite, None)
+        if slot is None:
+            self._other_sprites.remove(sprite)
+            return
+        # fill the slot with the last slot to keep the arrays densely packed
+        last = self._count - 1
+        last_sprite = self._slot_sprites.pop()
+        last_position = self._slot_positions.pop()
+        last_rect = self._slot_rects.pop()
+        if slot != last:
+            self._slot_sprites[slot] = last_sprite
+            self._slot_positions[slot] = last_position
+            self._slot_rects[slot] = last_rect
+            self._sprite_slots[last_sprite] = slot
+            for array in (self._positions, self._previous_positions, self._velocities, self._sizes, self._radii,
+                          self._active, self._reflects):
+                array[slot] = array[last]
+        self._count = last
+
+    def update(self, delta_time: int):
+        for sprite in self._other_sprites:
+            sprite.update(delta_time)
+        count = self._count
+        if count == 0:
+            return
+
+        positions = self._positions[:count]
+        velocities = self._velocities[:count]
+        sizes = self._sizes[:count]
+        active = self._active[:count]
+        reflects = self._reflects[:count]
+
+        # same operation order as Projectile.update so the results are identical
+        self._previous_positions[:count] = positions
+        scale = delta_time / 1000
+        positions[:, 0] += velocities[:, 0] * scale
+        positions[:, 1] += -velocities[:, 1] * scale
+
+        # Rect rounds a float center half away from zero, then offsets by half the (integer) size
+        centers = numpy.trunc(positions + numpy.copysign(0.5, positions)).astype(numpy.int64)
+        lefts = centers[:, 0] - (sizes[:, 0] // 2)
+        tops = centers[:, 1] - (sizes[:, 1] // 2)
+        rights = lefts + sizes[:, 0]
+        bottoms = tops + sizes[:, 1]
+
+        # equivalent to Asteroid.update colliding the rect with the 1 pixel edge rects of the containing rect
+        bounds = self._containing_rect
+        within_horizontal = (lefts < bounds.right) & (rights > bounds.left)
+        within_vertical = (tops < bounds.bottom) & (bottoms > bounds.top)
+        reflecting = reflects & active
+        reflect_vertical = reflecting & within_horizontal & (
+                ((tops < bounds.top + 1) & (bottoms > bounds.top))
+                | ((tops < bounds.bottom + 1) & (bottoms > bounds.bottom)))
+        reflect_horizontal = reflecting & within_vertical & (
+                ((lefts < bounds.left + 1) & (rights > bounds.left))
+                | ((lefts < bounds.right + 1) & (rights > bounds.right)))
+        velocities[reflect_vertical, 1] *= -1
+        velocities[reflect_horizontal, 0] *= -1
+        # equivalent to Asteroid._return_inside, for a step that carried the asteroid past an edge
+        outside = reflecting & ~(within_horizontal & within_vertical)
+        if outside.any():
+            return_horizontal = outside & (((rights <= bounds.left) & (velocities[:, 0] < 0))
+                                           | ((lefts >= bounds.right) & (velocities[:, 0] > 0)))
+            return_vertical = outside & (((bottoms <= bounds.top) & (velocities[:, 1] > 0))
+                                         | ((tops >= bounds.bottom) & (velocities[:, 1] < 0)))
+            velocities[return_horizontal, 0] *= -1
+            velocities[return_vertical, 1] *= -1
+            reflect_horizontal |= return_horizontal
+            reflect_vertical |= return_vertical
+
+        # no reflection on first activation as the trailing edge of the asteroid collides with the edge
+        activating = (reflects & ~active & (lefts >= bounds.left) & (tops >= bounds.top)
+                      & (rights <= bounds.right) & (bottoms <= bounds.bottom))
+        active |= activating
+
+        # sync the sprites
+        slot_sprites = self._slot_sprites
+        for sprite, position, rect, (x, y), topleft in zip(slot_sprites, self._slot_positions, self._slot_rects,
+                                                            positions.tolist(),
+                                                            numpy.column_stack((lefts, tops)).tolist()):
+            sprite.previous_position = (position.x, position.y)
+            position.x = x
+            position.y = y
+            rect.topleft = topleft
+        for slot in numpy.flatnonzero(reflect_vertical | reflect_horizontal).tolist():
+            velocity = slot_sprites[slot].velocity
+            velocity.horizontal, velocity.vertical = velocities[slot].tolist()
+        for slot in numpy.flatnonzero(activating).tolist():
+            slot_sprites[slot].activate()
+
+    def interpolate(self, alpha: float):
+        for sprite in self._other_sprites:
+            sprite.interpolate(alpha)
+        count = self._count
+        if count == 0:
+            return
+        previous_positions = self._previous_positions[:count]
+        positions = previous_positions + ((self._positions[:count] - previous_positions) * alpha)
+        centers = numpy.trunc(positions + numpy.copysign(0.5, positions)).astype(numpy.int64)
+        sizes = self._sizes[:count]
+        for rect, topleft in zip(self._slot_rects, (centers - (sizes // 2)).tolist()):
+            rect.topleft = topleft
+
+    def _resize(self, capacity: int):
+        def grow(array, shape, dtype):
+            resized = numpy.zeros(shape, dtype=dtype)
+            if array is not None:
+                resized[:self._count] = array[:self._count]
+            return resized
+
+        self._positions = grow(self._positions, (capacity, 2), numpy.float64)
+        self._previous_positions = grow(self._previous_positions, (capacity, 2), numpy.float64)
+        self._velocities = grow(self._velocities, (capacity, 2), numpy.float64)
+        self._sizes = grow(self._sizes, (capacity, 2), numpy.int64)
+        self._radii = grow(self._radii, capacity, numpy.float64)
+        self._active = grow(self._active, capacity, numpy.bool_)
+        self._reflects = grow(self._reflects, capacity, numpy.bool_)
+        self._capacity = capacity
@@ -0,0 +1,13 @@
+class Velocity:
+    # pixels/s.  Note: the vertical axis is +ve up, the screen axis is +ve down
+    __slots__ = ('horizontal', 'vertical')
+
+    def __init__(self, horizontal: float, vertical: float):
+        self.horizontal = horizontal
+        self.vertical = vertical
+
+    def __repr__(self) -> str:
+        return f'Velocity({self.horizontal}, {self.vertical})'
+
+    def copy(self) -> 'Velocity':
+        return Velocity(self.horizontal, self.vertical)
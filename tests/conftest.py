@@ -0,0 +1,6 @@
+import os
+import sys
+
+# the game draws to the dummy video driver, so the tests run without a display
+os.environ['SDL_VIDEODRIVER'] = 'dummy'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
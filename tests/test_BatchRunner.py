@@ -0,0 +1,27 @@
+import pytest
+
+from src.BatchRunner import check_parameters, sweep
+
+
+def test_sweep_gives_every_combination():
+    assert sweep({'MINIMUM_SPEED': [100, 150], 'MAXIMUM_LEVEL': [5]}) == [
+        {'MINIMUM_SPEED': 100, 'MAXIMUM_LEVEL': 5}, {'MINIMUM_SPEED': 150, 'MAXIMUM_LEVEL': 5}]
+    assert sweep({}) == [{}]
+
+
+def test_minimum_above_its_maximum_is_rejected():
+    # against the generator default of the other bound
+    with pytest.raises(ValueError):
+        check_parameters({'MINIMUM_DIAMETER': 80})
+    with pytest.raises(ValueError):
+        sweep({'MINIMUM_DIAMETER': [20, 80]})
+    # and against an overridden one
+    with pytest.raises(ValueError):
+        check_parameters({'MINIMUM_SPEED': 200, 'MAXIMUM_SPEED': 100})
+    check_parameters({'MINIMUM_DIAMETER': 80, 'MAXIMUM_DIAMETER': 90})
+    check_parameters({'MINIMUM_SPEED': 200, 'MAXIMUM_SPEED': 200})
+
+
+def test_unknown_parameter_is_rejected():
+    with pytest.raises(ValueError):
+        check_parameters({'SCREEN_WIDTH': 100})
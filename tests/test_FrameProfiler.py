@@ -0,0 +1,32 @@
+from src.FrameProfiler import FrameProfiler
+
+
+def test_in_frame_between_begin_and_end():
+    profiler = FrameProfiler(4)
+    assert not profiler.in_frame
+    profiler.begin_frame()
+    assert profiler.in_frame
+    profiler.end_phase('input')
+    profiler.count('asteroids', 3)
+    profiler.end_frame()
+    assert not profiler.in_frame
+    assert profiler.frames == 1
+    assert profiler.rows()[0]['asteroids'] == 3
+
+
+def test_disabled_profiler_is_never_in_a_frame():
+    profiler = FrameProfiler(4, enabled=False)
+    profiler.begin_frame()
+    assert not profiler.in_frame
+    profiler.end_frame()
+    assert profiler.frames == 0
+
+
+def test_ring_buffer_keeps_the_newest_frames():
+    profiler = FrameProfiler(3)
+    for frame in range(5):
+        profiler.begin_frame()
+        profiler.count('bullets', frame)
+        profiler.end_frame()
+    assert [row['frame'] for row in profiler.rows()] == [2, 3, 4]
+    assert [row['bullets'] for row in profiler.rows()] == [2, 3, 4]
@@ -0,0 +1,120 @@
+import os
+import random
+
+import pygame
+import pytest
+
+from src.Asteroid import AsteroidFragment
+from src.Bot import Bot
+from src.GameState import StateHistory
+from src.InputLog import KeyState
+from src.SpaceFrenzyEngine import SpaceFrenzyEngine
+
+main_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _play(engine: SpaceFrenzyEngine, bot: Bot, frames: int) -> list[tuple[list[pygame.event.Event], KeyState]]:
+    # the input of each frame, so that it can be played again
+    inputs = []
+    for _ in range(frames):
+        inputs.append(bot.control(engine.space_craft, engine.asteroid_generator))
+        engine.step_simulation(*inputs[-1])
+    return inputs
+
+
+@pytest.fixture
+def engine():
+    engine = SpaceFrenzyEngine(main_dir, headless=True)
+    engine.new_simulation(7)
+    engine.asteroid_generator.set_level(5)
+    yield engine
+    engine.close()
+
+
+def test_restored_game_continues_exactly(engine):
+    bot = Bot()
+    _play(engine, bot, 300)
+    state = engine.capture_state()
+    inputs = _play(engine, bot, 300)
+    expected = engine.capture_state()
+    assert any(isinstance(asteroid, AsteroidFragment) for asteroid in engine.asteroid_generator.asteroids)
+    assert engine.space_craft.bullets
+
+    engine.restore_state(state)
+    assert engine.capture_state() == state
+    for key_events, key_state in inputs:
+        engine.step_simulation(key_events, key_state)
+    assert engine.capture_state() == expected
+
+
+def test_truncated_state_is_rejected_and_game_unchanged(engine):
+    _play(engine, Bot(), 120)
+    state = engine.capture_state()
+    with pytest.raises(ValueError):
+        engine.restore_state(state[:-1])
+    with pytest.raises(ValueError):
+        engine.restore_state(b'not a game state' * 10)
+    assert engine.capture_state() == state
+
+
+def _state(value: int, size: int = 64) -> bytes:
+    # a distinct state, mostly unchanged from the next as in a game
+    return value.to_bytes(4, 'little') * 2 + bytes(size - 8)
+
+
+def test_history_pops_in_reverse_push_order():
+    history = StateHistory(100)
+    for value in range(75):
+        history.push(_state(value))
+    assert len(history) == 75
+    for value in reversed(range(75)):
+        assert history.pop() == _state(value)
+    assert history.pop() is None
+
+
+def test_history_keeps_newest_max_states():
+    history = StateHistory(45)
+    for value in range(200):
+        history.push(_state(value))
+    assert len(history) <= 45
+    values = []
+    while (state := history.pop()) is not None:
+        values.append(state)
+    # the oldest kept is always a keyframe, so a little less than max_states may be kept
+    assert values == [_state(value) for value in reversed(range(200 - len(values), 200))]
+    assert len(values) > 45 - StateHistory.KEYFRAME_PERIOD
+
+
+def test_history_wraps_the_buffer():
+    # keyframes of 1000 bytes in a buffer that holds a few keyframe periods, so the buffer wraps many times
+    history = StateHistory(10000, capacity=8000)
+    for value in range(1000):
+        history.push(_state(value, 1000))
+        assert history.used <= history.capacity
+    popped = []
+    while (state := history.pop()) is not None:
+        popped.append(state)
+    assert popped
+    assert popped == [_state(value, 1000) for value in reversed(range(1000 - len(popped), 1000))]
+
+
+def test_history_push_after_pop_across_a_wrap():
+    history = StateHistory(10000, capacity=6000)
+    rng = random.Random(3)
+    values = []
+    for value in range(2000):
+        if values and rng.random() < 0.3:
+            assert history.pop() == _state(values.pop(), 500)
+        else:
+            history.push(_state(value, 500))
+            values.append(value)
+            # states dropped to make room are the oldest
+            values = values[len(values) - len(history):]
+    while values:
+        assert history.pop() == _state(values.pop(), 500)
+    assert history.pop() is None
+
+
+def test_state_larger_than_the_history_is_rejected():
+    history = StateHistory(10, capacity=100)
+    with pytest.raises(ValueError):
+        history.push(bytes(101))
@@ -0,0 +1,71 @@
+import os
+
+import pygame
+import pytest
+
+from src.Bot import Bot
+from src.InputLog import InputRecorder, InputReplay, KeyState, decode_key_events, encode_key_events
+from src.SpaceFrenzyEngine import SpaceFrenzyEngine
+
+main_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _events(key_events: list[pygame.event.Event]) -> list[tuple[int, int]]:
+    return [(event.type, event.key) for event in key_events]
+
+
+def test_record_then_replay_round_trip(tmp_path):
+    path = str(tmp_path / 'game.log')
+    frames = [
+        (16, [], KeyState(0)),
+        (17, [pygame.event.Event(pygame.KEYDOWN, key=pygame.K_x)], KeyState.from_keys([pygame.K_x])),
+        (15, [pygame.event.Event(pygame.KEYUP, key=pygame.K_x), pygame.event.Event(pygame.KEYDOWN, key=pygame.K_UP)],
+         KeyState.from_keys([pygame.K_UP, pygame.K_LEFT])),
+        (250, [], KeyState.from_keys([pygame.K_UP, pygame.K_DOWN, pygame.K_LEFT, pygame.K_RIGHT, pygame.K_x])),
+    ]
+    recorder = InputRecorder(path, 2 ** 62)
+    for frame in frames:
+        recorder.record(*frame)
+    recorder.close()
+    assert recorder.frames == len(frames)
+
+    replay = InputReplay(path)
+    assert replay.seed == 2 ** 62
+    replayed = list(replay)
+    assert len(replayed) == len(frames)
+    for (delta_time, key_events, key_state), (expected_delta_time, expected_events, expected_state) in zip(replayed,
+                                                                                                          frames):
+        assert delta_time == expected_delta_time
+        assert _events(key_events) == _events(expected_events)
+        assert key_state.mask == expected_state.mask
+
+
+def test_long_delta_times_round_trip(tmp_path):
+    # a windowed frame after a stall, e.g. a debugger pause, can be longer than 16 bits of ms
+    path = str(tmp_path / 'game.log')
+    delta_times = [2 ** 16 - 1, 2 ** 16, 2 ** 32 - 1]
+    recorder = InputRecorder(path, 1)
+    for delta_time in delta_times:
+        recorder.record(delta_time, [], KeyState(0))
+    recorder.close()
+    assert [delta_time for delta_time, _, _ in InputReplay(path)] == delta_times
+
+
+def test_untracked_keys_are_not_recorded():
+    key_events = [pygame.event.Event(pygame.KEYDOWN, key=pygame.K_a), pygame.event.Event(pygame.KEYUP, key=pygame.K_x)]
+    assert _events(decode_key_events(encode_key_events(key_events))) == [(pygame.KEYUP, pygame.K_x)]
+    assert not KeyState.from_keys([pygame.K_x])[pygame.K_a]
+
+
+def test_other_files_are_rejected(tmp_path):
+    path = tmp_path / 'other.log'
+    path.write_bytes(b'not an input log')
+    with pytest.raises(ValueError):
+        InputReplay(str(path))
+
+
+def test_replayed_game_matches_recorded_game(tmp_path):
+    path = str(tmp_path / 'game.log')
+    recorded = SpaceFrenzyEngine(main_dir, headless=True, seed=11, record=path).run_simulation(900, Bot())
+    replayed = SpaceFrenzyEngine(main_dir, headless=True).replay(path)
+    assert replayed == recorded
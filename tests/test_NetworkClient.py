@@ -0,0 +1,31 @@
+import os
+import socket
+import threading
+
+from src import NetworkProtocol as protocol
+from src.NetworkClient import NetworkClient
+
+main_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _answer_connect(server: socket.socket):
+    # welcomes the first client, as the server does
+    packet, address = server.recvfrom(65536)
+    if protocol.is_valid_connect(packet):
+        server.sendto(protocol.encode_welcome(3, 16, (1000, 700)), address)
+
+
+def test_connects_by_hostname():
+    server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    server.bind(('127.0.0.1', 0))
+    server.settimeout(5)
+    answer = threading.Thread(target=_answer_connect, args=(server,))
+    answer.start()
+    try:
+        client = NetworkClient(main_dir, ('localhost', server.getsockname()[1]), headless=True)
+        client._connect()
+    finally:
+        answer.join()
+        server.close()
+    assert client._player == 3
+    assert client._arena_rect.size == (1000, 700)
@@ -0,0 +1,146 @@
+import random
+
+from src.NetworkProtocol import DRIFT_TOLERANCE, HISTORY, MAXIMUM_ARENA_SIZE, POSITION_OFFSET, POSITION_SCALE, \
+    SnapshotDecoder, SnapshotEncoder, dequantize_position, extrapolate, quantize_position, quantize_velocity
+
+DELTA_TIME = 16  # ms
+
+
+class _World:
+    # asteroids that move in straight lines, now and then bounce, appear and are destroyed.  Entities as the server
+    # sends them, id -> entity
+    def __init__(self, seed: int):
+        self._random = random.Random(seed)
+        self._motion = {}  # id -> [x, y, horizontal, vertical, diameter]
+        self._next_id = 1
+        for _ in range(40):
+            self._add()
+
+    def _add(self):
+        rng = self._random
+        self._motion[self._next_id] = [rng.uniform(0, 800), rng.uniform(0, 600), rng.uniform(-150, 150),
+                                       rng.uniform(-150, 150), rng.randint(5, 60)]
+        self._next_id += 1
+
+    def step(self):
+        rng = self._random
+        for motion in self._motion.values():
+            motion[0] += motion[2] * DELTA_TIME / 1000
+            motion[1] -= motion[3] * DELTA_TIME / 1000
+            if rng.random() < 0.01:
+                motion[2] = -motion[2]
+        if rng.random() < 0.1:
+            del self._motion[rng.choice(list(self._motion))]
+        if rng.random() < 0.1:
+            self._add()
+
+    def entities(self, tick: int) -> dict:
+        return {entity_id: (quantize_position(x), quantize_position(y), quantize_velocity(horizontal),
+                            quantize_velocity(vertical), tick, diameter)
+                for entity_id, (x, y, horizontal, vertical, diameter) in self._motion.items()}
+
+
+def _encode(encoder: SnapshotEncoder, world: _World, tick: int, ack: int) -> bytes:
+    entities = world.entities(tick)
+    bullets = {entity_id: (*entity[:5], 0) for entity_id, entity in entities.items() if entity_id % 3 == 0}
+    return encoder.encode(tick, ack, tick, 1, 0, [], entities, bullets)
+
+
+def _assert_matches(snapshot, world: _World, tick: int):
+    # every entity is known, with its velocity, and within the drift tolerance of where it is
+    entities = world.entities(tick)
+    assert snapshot.asteroids.keys() == entities.keys()
+    for entity_id, entity in entities.items():
+        known = snapshot.asteroids[entity_id]
+        assert known[2:4] == entity[2:4]
+        assert known[5] == entity[5]
+        x, y = extrapolate(known, tick, DELTA_TIME)
+        assert abs(x - entity[0]) <= DRIFT_TOLERANCE and abs(y - entity[1]) <= DRIFT_TOLERANCE
+    assert snapshot.bullets.keys() == {entity_id for entity_id in entities if entity_id % 3 == 0}
+
+
+def test_round_trip_against_acknowledged_baselines():
+    world = _World(1)
+    encoder = SnapshotEncoder(DELTA_TIME)
+    decoder = SnapshotDecoder()
+    full_size = None
+    for tick in range(1, 300):
+        world.step()
+        packet = _encode(encoder, world, tick, decoder.newest_tick)
+        full_size = full_size or len(packet)
+        snapshot = decoder.decode(packet)
+        assert snapshot.tick == tick
+        _assert_matches(snapshot, world, tick)
+    # only the first snapshot was full, and the deltas are smaller
+    assert encoder.full_snapshots == 1
+    assert len(packet) < full_size
+
+
+def test_lost_snapshots_are_encoded_against_the_last_acknowledged():
+    world = _World(2)
+    encoder = SnapshotEncoder(DELTA_TIME)
+    decoder = SnapshotDecoder()
+    rng = random.Random(2)
+    for tick in range(1, 300):
+        world.step()
+        packet = _encode(encoder, world, tick, decoder.newest_tick)
+        if rng.random() < 0.3:
+            continue  # lost
+        _assert_matches(decoder.decode(packet), world, tick)
+    assert encoder.full_snapshots == 1
+
+
+def test_ack_older_than_history_gets_a_full_snapshot():
+    world = _World(3)
+    encoder = SnapshotEncoder(DELTA_TIME)
+    decoder = SnapshotDecoder()
+    world.step()
+    decoder.decode(_encode(encoder, world, 1, 0))
+    # every snapshot after the first is lost until the acknowledged one has left the history
+    for tick in range(2, HISTORY + 2):
+        world.step()
+        _encode(encoder, world, tick, decoder.newest_tick)
+    assert encoder.full_snapshots == 1
+    world.step()
+    tick = HISTORY + 2
+    snapshot = decoder.decode(_encode(encoder, world, tick, decoder.newest_tick))
+    assert encoder.full_snapshots == 2
+    _assert_matches(snapshot, world, tick)
+
+
+def test_old_and_duplicate_snapshots_are_dropped():
+    world = _World(4)
+    encoder = SnapshotEncoder(DELTA_TIME)
+    decoder = SnapshotDecoder()
+    world.step()
+    first = _encode(encoder, world, 1, 0)
+    world.step()
+    second = _encode(encoder, world, 2, 0)
+    world.step()
+    third = _encode(encoder, world, 3, 0)
+    assert decoder.decode(third) is not None
+    # arriving out of order or twice
+    assert decoder.decode(second) is None
+    assert decoder.decode(third) is None
+    assert decoder.decode(first) is None
+    assert decoder.newest_tick == 3
+    world.step()
+    _assert_matches(decoder.decode(_encode(encoder, world, 4, decoder.newest_tick)), world, 4)
+
+
+def test_snapshot_against_an_unknown_baseline_is_dropped():
+    world = _World(5)
+    encoder = SnapshotEncoder(DELTA_TIME)
+    decoder = SnapshotDecoder()
+    world.step()
+    _encode(encoder, world, 1, 0)  # lost
+    world.step()
+    # acknowledged by a stale ack packet from another decoder, so this decoder does not hold the baseline
+    assert decoder.decode(_encode(encoder, world, 2, 1)) is None
+    world.step()
+    assert decoder.decode(_encode(encoder, world, 3, decoder.newest_tick)) is not None
+
+
+def test_positions_around_the_largest_arena_are_not_clamped():
+    for position in (-POSITION_OFFSET, 0, MAXIMUM_ARENA_SIZE, MAXIMUM_ARENA_SIZE + POSITION_OFFSET):
+        assert abs(dequantize_position(quantize_position(position)) - position) <= 1 / POSITION_SCALE
@@ -0,0 +1,60 @@
+import pygame
+
+from src.Asteroid import AsteroidFragment, AsteroidPrimary
+from src.ObjectPool import ObjectPool
+from src.Position import Position
+from src.SpaceCraftBullet import SpaceCraftBullet
+from src.Velocity import Velocity
+
+_ARENA = pygame.Rect(0, 0, 800, 600)
+
+
+def _motion(projectile) -> tuple:
+    return (projectile.position.x, projectile.position.y, projectile.velocity.horizontal,
+            projectile.velocity.vertical, projectile.direction, projectile.previous_position,
+            tuple(projectile.rect))
+
+
+def test_reused_bullet_is_reset_as_if_new():
+    pool = ObjectPool(SpaceCraftBullet, 4)
+    bullet = pool.acquire(Position(10, 20), Velocity(5, 5), 45)
+    bullet.update(500)
+    pool.release(bullet)
+
+    reused = pool.acquire(Position(300, 400), Velocity(-3, 2), 180)
+    fresh = SpaceCraftBullet(Position(300, 400), Velocity(-3, 2), 180)
+    assert reused is bullet
+    assert _motion(reused) == _motion(fresh)
+
+
+def test_reused_fragment_is_reset_as_if_new():
+    pool = ObjectPool(AsteroidFragment, 4)
+    primary = AsteroidPrimary(Position(100, 100), Velocity(0, 0), 0, 40, _ARENA)
+    fragment = pool.acquire(Position(100, 100), Velocity(30, 10), 90, 12, _ARENA, primary)
+    fragment.update(500)
+    fragment.activate()
+    pool.release(fragment)
+
+    other_primary = AsteroidPrimary(Position(500, 300), Velocity(0, 0), 0, 50, _ARENA)
+    reused = pool.acquire(Position(500, 300), Velocity(-20, 5), 270, 7, _ARENA, other_primary)
+    fresh = AsteroidFragment(Position(500, 300), Velocity(-20, 5), 270, 7, _ARENA, other_primary)
+    assert reused is fragment
+    assert _motion(reused) == _motion(fresh)
+    assert reused.radius == fresh.radius
+    assert reused.active == fresh.active
+    assert reused.image is fresh.image
+    assert reused.primary_asteroid is other_primary
+
+
+def test_stats():
+    pool = ObjectPool(SpaceCraftBullet, 1)
+    bullets = [pool.acquire(Position(0, 0), Velocity(0, 0), 0) for _ in range(3)]
+    for bullet in bullets:
+        pool.release(bullet)
+    # only max_size released instances are kept
+    assert pool.stats.free == 1
+    pool.acquire(Position(0, 0), Velocity(0, 0), 0)
+    pool.acquire(Position(0, 0), Velocity(0, 0), 0)
+    stats = pool.stats
+    assert (stats.created, stats.hits, stats.misses, stats.in_use, stats.peak_in_use, stats.free) == (4, 1, 4, 2, 3, 0)
+    assert stats.hit_rate == 1 / 5
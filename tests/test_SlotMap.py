@@ -0,0 +1,77 @@
+import pytest
+
+from src.SlotMap import Handle, SlotMap
+
+
+def test_get_returns_inserted_items():
+    slot_map = SlotMap()
+    handles = {name: slot_map.insert(name) for name in ('a', 'b', 'c')}
+    assert len(slot_map) == 3
+    for name, handle in handles.items():
+        assert handle in slot_map
+        assert slot_map.get(handle) == name
+
+
+def test_get_of_removed_handle_is_none():
+    slot_map = SlotMap()
+    handle = slot_map.insert('a')
+    other = slot_map.insert('b')
+    assert slot_map.remove(handle) == 'a'
+    assert handle not in slot_map
+    assert slot_map.get(handle) is None
+    assert slot_map.get(other) == 'b'
+    with pytest.raises(KeyError):
+        slot_map.remove(handle)
+
+
+def test_stale_handle_rejected_after_slot_reused():
+    slot_map = SlotMap()
+    stale = slot_map.insert('a')
+    slot_map.remove(stale)
+    reused = slot_map.insert('b')
+    # the slot is reused with a new generation
+    assert reused.index == stale.index
+    assert reused.generation != stale.generation
+    assert stale not in slot_map
+    assert slot_map.get(stale) is None
+    assert slot_map.get(reused) == 'b'
+    with pytest.raises(KeyError):
+        slot_map.remove(stale)
+    assert slot_map.get(reused) == 'b'
+
+
+def test_handle_never_seen_is_rejected():
+    slot_map = SlotMap()
+    slot_map.insert('a')
+    assert Handle(5, 0) not in slot_map
+    assert slot_map.get(Handle(5, 0)) is None
+
+
+def test_iteration_after_removals():
+    slot_map = SlotMap()
+    handles = [slot_map.insert(value) for value in range(6)]
+    slot_map.remove(handles[1])
+    # the removed item's place is filled by the last item
+    assert list(slot_map) == [0, 5, 2, 3, 4]
+    slot_map.remove(handles[5])
+    assert list(slot_map) == [0, 4, 2, 3]
+    slot_map.remove(handles[3])  # the last item
+    assert list(slot_map) == [0, 4, 2]
+    slot_map.insert(6)
+    assert list(slot_map) == [0, 4, 2, 6]
+    # every remaining handle still finds its item after the moves
+    for value in (0, 2, 4):
+        assert slot_map.get(handles[value]) == value
+
+
+def test_remove_everything_then_reinsert():
+    slot_map = SlotMap()
+    handles = [slot_map.insert(value) for value in range(4)]
+    for handle in handles:
+        slot_map.remove(handle)
+    assert len(slot_map) == 0
+    assert list(slot_map) == []
+    new_handles = [slot_map.insert(value) for value in range(10, 14)]
+    assert {handle.index for handle in new_handles} == {handle.index for handle in handles}
+    assert [slot_map.get(handle) for handle in new_handles] == [10, 11, 12, 13]
+    assert all(slot_map.get(handle) is None for handle in handles)
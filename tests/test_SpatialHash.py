@@ -0,0 +1,60 @@
+import random
+
+import pygame
+
+from src.SpatialHash import SpatialHash
+
+
+def _overlapping(rects: list[pygame.Rect], query: pygame.Rect) -> list[int]:
+    # rects are closed, so touching counts as overlapping
+    return [index for index, rect in enumerate(rects)
+            if rect.left <= query.right and query.left <= rect.right
+            and rect.top <= query.bottom and query.top <= rect.bottom]
+
+
+def test_query_finds_items_over_cell_boundaries():
+    spatial_hash = SpatialHash(50)
+    # spans four cells
+    spatial_hash.insert('spanning', pygame.Rect(40, 40, 20, 20))
+    for query in (pygame.Rect(0, 0, 45, 45), pygame.Rect(55, 0, 10, 45), pygame.Rect(0, 55, 45, 10),
+                  pygame.Rect(55, 55, 10, 10)):
+        assert spatial_hash.query(query) == ['spanning']
+    assert spatial_hash.query(pygame.Rect(150, 150, 10, 10)) == []
+
+
+def test_query_at_negative_coordinates():
+    spatial_hash = SpatialHash(50)
+    spatial_hash.insert('negative', pygame.Rect(-60, -10, 20, 20))
+    assert spatial_hash.query(pygame.Rect(-45, -5, 5, 5)) == ['negative']
+    assert spatial_hash.query(pygame.Rect(5, 5, 5, 5)) == []
+
+
+def test_query_returns_each_item_once_in_insertion_order():
+    spatial_hash = SpatialHash(10)
+    for name in ('c', 'a', 'b'):
+        spatial_hash.insert(name, pygame.Rect(0, 0, 35, 35))
+    assert spatial_hash.query(pygame.Rect(0, 0, 40, 40)) == ['c', 'a', 'b']
+
+
+def test_query_includes_every_overlapping_rect():
+    # the broad phase may return extra items, but never misses one that overlaps
+    rng = random.Random(1)
+    spatial_hash = SpatialHash(32)
+    rects = [pygame.Rect(rng.randint(-100, 700), rng.randint(-100, 500), rng.randint(1, 90), rng.randint(1, 90))
+             for _ in range(300)]
+    for index, rect in enumerate(rects):
+        spatial_hash.insert(index, rect)
+    assert len(spatial_hash) == 300
+    for _ in range(200):
+        query = pygame.Rect(rng.randint(-100, 700), rng.randint(-100, 500), rng.randint(1, 120), rng.randint(1, 120))
+        found = spatial_hash.query(query)
+        assert found == sorted(set(found))
+        assert set(_overlapping(rects, query)) <= set(found)
+
+
+def test_clear():
+    spatial_hash = SpatialHash(50)
+    spatial_hash.insert('a', pygame.Rect(0, 0, 10, 10))
+    spatial_hash.clear()
+    assert len(spatial_hash) == 0
+    assert spatial_hash.query(pygame.Rect(0, 0, 10, 10)) == []
@@ -0,0 +1,63 @@
+import random
+
+import pygame
+
+from src.Asteroid import AsteroidPrimary
+from src.Position import Position
+from src.SweepAndPrune import SweepAndPrune
+from src.Velocity import Velocity
+
+_ARENA = pygame.Rect(0, 0, 800, 600)
+
+
+def _asteroid(rng: random.Random) -> AsteroidPrimary:
+    return AsteroidPrimary(Position(rng.uniform(0, 800), rng.uniform(0, 600)), Velocity(0, 0), 0,
+                           rng.randint(4, 60), _ARENA)
+
+
+def _brute_force(asteroids: list[AsteroidPrimary]) -> set[frozenset]:
+    # every pair whose bounding squares overlap, as the sweep reports
+    pairs = set()
+    for index, first in enumerate(asteroids):
+        for second in asteroids[index + 1:]:
+            reach = first.radius + second.radius
+            if (abs(first.position.x - second.position.x) <= reach
+                    and abs(first.position.y - second.position.y) <= reach):
+                pairs.add(frozenset((first, second)))
+    return pairs
+
+
+def _pairs(sweep_and_prune: SweepAndPrune, asteroids: list[AsteroidPrimary]) -> set[frozenset]:
+    pairs = sweep_and_prune.pairs(asteroids)
+    found = {frozenset(pair) for pair in pairs}
+    assert len(found) == len(pairs)  # each pair once
+    return found
+
+
+def test_pairs_match_brute_force():
+    rng = random.Random(1)
+    asteroids = [_asteroid(rng) for _ in range(200)]
+    assert _pairs(SweepAndPrune(), asteroids) == _brute_force(asteroids)
+
+
+def test_pairs_match_brute_force_as_asteroids_move_come_and_go():
+    # the order is kept between updates, so check it stays correct as it goes out of date
+    rng = random.Random(2)
+    asteroids = [_asteroid(rng) for _ in range(100)]
+    sweep_and_prune = SweepAndPrune()
+    for _ in range(50):
+        for asteroid in asteroids:
+            asteroid.position.x += rng.uniform(-20, 20)
+            asteroid.position.y += rng.uniform(-20, 20)
+        for _ in range(rng.randint(0, 5)):
+            asteroids.pop(rng.randrange(len(asteroids)))
+        asteroids.extend(_asteroid(rng) for _ in range(rng.randint(0, 5)))
+        assert _pairs(sweep_and_prune, asteroids) == _brute_force(asteroids)
+
+
+def test_touching_and_separated():
+    first = AsteroidPrimary(Position(100, 100), Velocity(0, 0), 0, 20, _ARENA)
+    touching = AsteroidPrimary(Position(120, 100), Velocity(0, 0), 0, 20, _ARENA)
+    separated = AsteroidPrimary(Position(100, 200), Velocity(0, 0), 0, 20, _ARENA)
+    assert _pairs(SweepAndPrune(), [separated, touching, first]) == {frozenset((first, touching))}
+    assert SweepAndPrune().pairs([]) == []